@@ -1,15 +1,15 @@
-from langchain.retrievers import TimeWeightedVectorStoreRetriever
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from rag.historical_data_loader import load_historical_data
 from config import Config
+from utils.metrics import span, timed
 import random
 import numpy as np
-from langchain_groq import ChatGroq
+from utils.llm_gateway import get_llm_gateway
+from utils.allocation import apply_min_weights, get_allocation_engine, goal_allocation_params
 import os
 
 class ActionRecommender:
-    def __init__(self):
-        self.llm = ChatGroq(temperature=0.5,model_name="llama-3.1-8b-instant", groq_api_key=os.getenv('GROQ_API_KEY'))
+    def __init__(self, price_store=None):
+        self.llm = get_llm_gateway()
+        self.allocator = get_allocation_engine(price_store)  # DataCollector's HistoricalPriceStore, if given
 
     # Keep _interpret_analysis unchanged
     def _interpret_analysis(self, market_data, sentiment_data):
@@ -42,7 +42,8 @@ class ActionRecommender:
             for v in value:
                 MOVEMENT_ECOSYSTEM_APPS.append(v['name'])
         
-        selected_apps = random.sample(MOVEMENT_ECOSYSTEM_APPS, 3)
+        # The catalog can be empty (ecosystem page unavailable on a cold start)
+        selected_apps = random.sample(MOVEMENT_ECOSYSTEM_APPS, min(3, len(MOVEMENT_ECOSYSTEM_APPS)))
         rationales = [
             "shows strong ecosystem alignment with recent protocol upgrades",
             "demonstrates high community engagement and DAO participation",
@@ -53,28 +54,60 @@ class ActionRecommender:
         ]
         return [(app, random.choice(rationales)) for app in selected_apps]
 
-    def _distribute_allocations(self, crypto_recs, movement_recs):
-        """Distribute 100% allocation across all recommendations"""
-        # Generate 6 allocations (3 crypto + 3 apps) summing to 100
-        allocations = np.random.dirichlet(np.ones(6)) * 100
-        allocations = [round(pct, 1) for pct in allocations]
-        
-        # Adjust for rounding precision
-        total = sum(allocations)
-        allocations[-1] += round(100 - total, 1)
-        
+    @staticmethod
+    def _action(rec):
+        """'buy', 'sell' or 'hold' from the LLM's action text (anything else counts as hold)"""
+        action = rec.get('action', '').strip(' *').lower()
+        return next((name for name in ('buy', 'sell') if action.startswith(name)), 'hold')
+
+    def _crypto_weights(self, crypto_recs, user_goal):
+        """
+        Weights (summing to 1, or all 0 if everything is a Sell) for the recommended symbols.
+        Buy and Hold picks are optimized by the allocation engine per the goal; Sell picks get
+        nothing, and every Buy gets at least Config.ALLOCATION_MIN_BUY_WEIGHT.
+        """
+        symbols = [rec['symbol'].upper() for rec in crypto_recs]
+        actions = [self._action(rec) for rec in crypto_recs]
+        kept = [symbol for symbol, action in zip(symbols, actions) if action != 'sell']
+        known = [symbol for symbol in dict.fromkeys(kept) if self.allocator.has_history(symbol)]
+        if known:
+            goal = getattr(user_goal, 'user_goal', user_goal)
+            by_symbol = dict(zip(known, self.allocator.allocate(known, **goal_allocation_params(goal))))
+        else:
+            by_symbol = dict.fromkeys(kept, 1.0)
+        # A symbol recommended twice splits its weight; symbols without history get only the Buy floor
+        weights = [0.0 if action == 'sell' else by_symbol.get(symbol, 0.0) / kept.count(symbol)
+                   for symbol, action in zip(symbols, actions)]
+        return apply_min_weights(weights, [action == 'buy' for action in actions], Config.ALLOCATION_MIN_BUY_WEIGHT)
+
+    def _distribute_allocations(self, crypto_recs, movement_recs, user_goal=''):
+        """Distribute 100% across all recommendations: optimized crypto weights, then an equal ecosystem sleeve"""
+        crypto_weights = self._crypto_weights(crypto_recs, user_goal) if crypto_recs else np.zeros(0)
+        ecosystem_share = Config.ALLOCATION_ECOSYSTEM_SHARE if movement_recs else 0.0
+        if not crypto_weights.sum():
+            # Nothing to hold in crypto (no picks, or only Sells)
+            ecosystem_share = 1.0 if movement_recs else 0.0
+        allocations = list(crypto_weights * (1 - ecosystem_share) * 100)
+        if movement_recs:
+            allocations.extend([ecosystem_share * 100 / len(movement_recs)] * len(movement_recs))
+        allocations = [round(float(pct), 1) for pct in allocations]
+
+        # Adjust for rounding precision, on the largest allocation so a Sell stays at 0
+        if allocations and sum(allocations):
+            largest = allocations.index(max(allocations))
+            allocations[largest] = round(allocations[largest] + 100 - sum(allocations), 1)
+
         # Assign crypto allocations
         for i, rec in enumerate(crypto_recs):
             rec['allocation'] = allocations[i]
-        
+
         # Assign application allocations
         for i, rec in enumerate(movement_recs):
-            rec['allocation'] = allocations[i+3]
-            
+            rec['allocation'] = allocations[i + len(crypto_recs)]
+
         return crypto_recs, movement_recs
 
-    def get_recommendations(self, user_goal, all_analyses):
-        """Main recommendation logic with separated allocation"""
+    def _build_prompt(self, user_goal, all_analyses):
         # Original analysis processing remains unchanged
         analysis_summaries = []
         for analysis in all_analyses:
@@ -111,8 +144,9 @@ Provide recommendations in this format:
 
 Include exactly 3 cryptocurrency recommendations.
 """
-        # Get crypto recommendations without allocations
-        crypto_response = self.llm.invoke(prompt).content
+        return prompt
+
+    def _format_recommendations(self, crypto_response, all_analyses, user_goal=''):
         crypto_recs = []
         for line in crypto_response.split('\n'):
             if ': ' in line and ' - ' in line:
@@ -130,7 +164,7 @@ Include exactly 3 cryptocurrency recommendations.
                         for app, rationale in self._generate_movement_recommendations(applications)][:3]
 
         # Distribute allocations
-        crypto_recs, movement_recs = self._distribute_allocations(crypto_recs, movement_recs)
+        crypto_recs, movement_recs = self._distribute_allocations(crypto_recs, movement_recs, user_goal)
 
         # Format final output
         crypto_str = "Cryptocurrency Recommendations:\n" + "\n".join(
@@ -149,3 +183,25 @@ Include exactly 3 cryptocurrency recommendations.
                 "3. Rebalance when price targets or market conditions change"
         
         return crypto_str + movement_str + notes
+
+
+    @timed('action_recommender.get_recommendations')
+    def get_recommendations(self, user_goal, all_analyses):
+        """Main recommendation logic with separated allocation"""
+        prompt = self._build_prompt(user_goal, all_analyses)
+        # Get crypto recommendations without allocations
+        with span('action_recommender.llm', 'llm'):
+            crypto_response = self.llm.invoke(prompt)
+        return self._format_recommendations(crypto_response, all_analyses, user_goal)
+
+    async def astream_recommendations(self, user_goal, all_analyses):
+        """
+        Streaming variant of get_recommendations. Yields ('token', text) for each LLM chunk
+        as it arrives, then ('recommendations', formatted result) once allocations are set.
+        """
+        prompt = self._build_prompt(user_goal, all_analyses)
+        chunks = []
+        async for chunk in self.llm.astream(prompt):
+            chunks.append(chunk)
+            yield 'token', chunk
+        yield 'recommendations', self._format_recommendations("".join(chunks), all_analyses, user_goal)
@@ -1,108 +1,580 @@
-import openai
+import asyncio
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
 from config import Config
 from utils.cache import Cache
+from utils.http_client import get_async_client
+from utils.price_store import HistoricalPriceStore
+from utils.rollups import RollupStore
+from utils.news_store import NewsStore
+from utils.ecosystem import EcosystemCatalog, parse_projects
+from utils.symbol_registry import SymbolRegistry
+from utils.metrics import record_cache, record_error, timed
+from utils.backoff import UpstreamBackoff
+from utils.singleflight import SingleFlight
 from datetime import datetime, timedelta
 from agents.social_agent import SocialSentimentAnalyst
 import pandas as pd
 import json
-import requests
-from bs4 import BeautifulSoup
 import os
-from langchain_groq import ChatGroq
+
+_NO_FALLBACK = object()
+
+ECOSYSTEM_URL = "https://www.movementnetwork.xyz/ecosystem"
+
+
+def _found(value):
+    return value is not None
+
+
+def _missing(value):
+    return value is None
+
+
+def _is_news(news):
+    # Error strings from fetch_news are not cached; the "no articles" answer is
+    return isinstance(news, list) or news == "No recent news articles found"
+
+
+def _is_sentiment(sentiment):
+    return 'error' not in sentiment and sentiment.get('llm_analysis') != "LLM analysis unavailable"
+
+
+def _llm_failed(sentiment):
+    return sentiment.get('llm_analysis') == "LLM analysis unavailable"
+
+
+def _news_failed(news):
+    # fetch_news reports failures as error strings
+    return not _is_news(news)
+
 
 class DataCollector:
 
     def __init__(self):
         self.cache = Cache()
         self.headers = {'X-CMC_PRO_API_KEY': Config.COINMARKETCAP_API_KEY}
-        self.client = ChatGroq(temperature=0.5,model_name="llama-3.1-8b-instant", groq_api_key=os.getenv('GROQ_API_KEY'))
         self.news_api_key= Config.NEWS_API_KEY
         self.news_api_url = 'https://newsapi.org/v2/everything'
         self.social_analyst = SocialSentimentAnalyst()
-        
+        self.price_store = HistoricalPriceStore()
+        self.rollups = RollupStore(self.price_store)
+        self.news_store = NewsStore()
+        self.news_store.prune()
+        self.ecosystem = EcosystemCatalog()
+        self.registry = SymbolRegistry(with_history=self.price_store.symbols())
+        self.backoff = UpstreamBackoff()
+        self.flight = SingleFlight(self.cache)
+        self._semaphore = asyncio.Semaphore(Config.MAX_CONCURRENCY)
+        self._stats = defaultdict(Counter)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+        self._refresh_tasks = set()
+
+    @property
+    def cache_stats(self):
+        """Read-through hit/miss/stale counts per source"""
+        return {source: dict(counts) for source, counts in self._stats.items()}
+
+    def _lease_ttl(self, source):
+        # How long another worker waits on this one's fetch before fetching itself
+        return 2 * Config.SOURCE_TIMEOUTS.get(source, Config.SOURCE_TIMEOUTS['llm'])
+
+    def _count(self, source, state):
+        self._stats[source][state] += 1
+        record_cache(source, state)
+
+    def _store(self, source, key, value):
+        self.cache.set(key, value, Config.SOURCE_CACHE_TTLS[source], Config.SOURCE_STALE_TTLS[source])
+
+    def _claim_refresh(self, key):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key):
+        with self._refresh_lock:
+            self._refreshing.discard(key)
 
+    def _schedule_refresh(self, key, refresh):
+        """Run `refresh` on the background pool unless one is already in flight for `key`"""
+        if not self._claim_refresh(key):
+            return
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                print(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._release_refresh(key)
+
+        self._refresh_pool.submit(run)
+
+    def _aschedule_refresh(self, key, refresh):
+        """Async counterpart of _schedule_refresh; `refresh` is a coroutine function"""
+        if not self._claim_refresh(key):
+            return
+
+        async def run():
+            try:
+                await refresh()
+            except Exception as e:
+                print(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._release_refresh(key)
+
+        task = asyncio.create_task(run())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def _after_fetch(self, source, key, value, cacheable, failed):
+        if cacheable(value):
+            self._store(source, key, value)
+        if failed(value):
+            self.backoff.failure(source)
+        else:
+            self.backoff.success(source)
+
+    def _cached(self, source, key, fetch, cacheable=_found, fallback=_NO_FALLBACK, failed=_missing):
+        """
+        Read-through lookup: a fresh hit is returned as is, a stale hit is returned at
+        once while `fetch` refreshes it in the background, and only a miss waits on `fetch`.
+        Concurrent misses for the same key share one `fetch`. By default any value but None is
+        cached, and only None (or an exception) counts as an upstream failure.
+
+        While `source` is backing off after failures, stale values are served without a
+        refresh and misses return `fallback` (if given) instead of calling upstream.
+        """
+        data, state = self.cache.lookup(key)
+        self._count(source, state)
+        ready = self.backoff.ready(source)
+
+        def refresh():
+            try:
+                value = fetch()
+            except Exception:
+                self.backoff.failure(source)
+                raise
+            self._after_fetch(source, key, value, cacheable, failed)
+            return value
+
+        if state == 'miss':
+            if not ready and fallback is not _NO_FALLBACK:
+                return fallback
+            return self.flight.call(key, refresh, source)
+        if state == 'stale' and ready:
+            self._schedule_refresh(key, refresh)
+        return data
+
+    async def _acached(self, source, key, fetch, cacheable=_found, fallback=_NO_FALLBACK, failed=_missing):
+        """Async variant of _cached; `fetch` is a coroutine function, shared across workers on a miss"""
+        # SQLite reads and writes (and their pickling) stay off the event loop
+        data, state = await asyncio.to_thread(self.cache.lookup, key)
+        self._count(source, state)
+        ready = self.backoff.ready(source)
+
+        async def refresh():
+            try:
+                value = await fetch()
+            except Exception:
+                self.backoff.failure(source)
+                raise
+            await asyncio.to_thread(self._after_fetch, source, key, value, cacheable, failed)
+            return value
+
+        if state == 'miss':
+            if not ready and fallback is not _NO_FALLBACK:
+                return fallback
+            return await self.flight.do(key, refresh, source, lambda: self.cache.get(key), self._lease_ttl(source))
+        if state == 'stale' and ready:
+            self._aschedule_refresh(key, refresh)
+        return data
+
+    def _news_params(self, query):
+        # Only articles published since the newest one already stored (first fetch: last 7 days)
+        to_date = datetime.utcnow()
+        watermark = self.news_store.watermark(query)
+        from_date = watermark.rstrip('Z') if watermark else (to_date - timedelta(days=7)).strftime('%Y-%m-%d')
+
+        return {
+            'q': query,
+            'from': from_date,
+            'to': to_date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': Config.NEWS_PAGE_SIZE,
+            'apiKey': self.news_api_key
+        }
+
+    @staticmethod
+    def _last_news_page(params, payload, page):
+        """Whether page `page` of a NewsAPI response reached the watermark (or the end of the results)"""
+        articles = payload.get('articles', [])
+        oldest = min((article.get('publishedAt') or '' for article in articles), default='')
+        return len(articles) < params['pageSize'] or page * params['pageSize'] >= payload.get('totalResults', 0) \
+            or oldest.rstrip('Z') <= params['from']
+
+    @staticmethod
+    def _result_cap(response):
+        """Whether NewsAPI refused a page past the plan's result cap (HTTP 426, maximumResultsReached)"""
+        if response.status_code == 426:
+            return True
+        try:
+            return response.status_code >= 400 and response.json().get('code') == 'maximumResultsReached'
+        except ValueError:
+            return False
+
+    def _store_news_page(self, query, params, payload, page, newest):
+        """
+        Store one page of a newest-first fetch; returns (done, newest), `newest` being the
+        first page's newest publishedAt. Until the fetch is done, the query's watermark only
+        moves to the oldest article stored so far, so an interrupted fetch never marks
+        unread articles as stored.
+        """
+        articles = payload.get('articles', [])
+        dates = [article['publishedAt'] for article in articles if article.get('publishedAt')]
+        newest = newest or max(dates, default=None)
+        done = self._last_news_page(params, payload, page)
+        self.news_store.add(query, articles, newest if done else min(dates, default=None))
+        return done, newest
+
+    def _stored_news(self, query):
+        """The last 7 days of articles for a query from the local store, newest first"""
+        articles = self.news_store.recent(query)
+        if not articles:
+            return "No recent news articles found"
+        return articles
+
+    @timed('data_collector.fetch_news', 'news')
     def fetch_news(self, query):
+        """
+        Articles for a query: newer ones are fetched page by page (newest first) until the
+        watermark, at most Config.NEWS_MAX_PAGES pages, and each page is stored as it
+        arrives. The plan's result cap ends the results; a later page failing keeps the
+        pages before it.
+        """
         try:
-            # Calculate date range (last 7 days)
-            to_date = datetime.utcnow()
-            from_date = to_date - timedelta(days=7)
-            
-            params = {
-                'q': query,
-                'from': from_date.strftime('%Y-%m-%d'),
-                'to': to_date.strftime('%Y-%m-%d'),
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'pageSize': 5,  # Get top 5 articles
-                'apiKey': self.news_api_key
-            }
-            
-            response = requests.get(self.news_api_url, params=params)
-            response.raise_for_status()
-            
-            articles = response.json().get('articles', [])
-            
-            if not articles:
-                return "No recent news articles found"
-            
-            formatted_news = []
-            for article in articles:
-                source = article.get('source', {}).get('name', 'Unknown source')
-                published_at = article.get('publishedAt', 'Unknown date')
-                title = article.get('title', 'No title')
-                description = article.get('description', 'No description')
-                url = article.get('url', '#')
-                
-                formatted_news.append({
-                    'source': source,
-                    'published_at': published_at,
-                    'title': title,
-                    'description': description,
-                    'url': url
-                })
-            
-            return formatted_news
-            
+            params = self._news_params(query)
+            newest = None
+            for page in range(1, Config.NEWS_MAX_PAGES + 1):
+                try:
+                    response = requests.get(self.news_api_url, params={**params, 'page': page})
+                    if page > 1 and self._result_cap(response):
+                        self.news_store.add(query, [], newest)
+                        break
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    if page == 1:
+                        raise
+                    print(f"News page {page} for '{query}' failed, keeping the pages before it: {e}")
+                    break
+                done, newest = self._store_news_page(query, params, response.json(), page, newest)
+                if done:
+                    break
+            return self._stored_news(query)
+
         except requests.exceptions.RequestException as e:
+            record_error('data_collector.fetch_news', 'news')
             print(f"News API request failed: {e}")
             return "News service unavailable"
         except Exception as e:
             print(f"Error processing news: {e}")
             return "Error fetching news"
 
-    def get_crypto_data(self, symbol):
+    @timed('data_collector.fetch_news', 'news')
+    async def afetch_news(self, query):
+        """Async variant of fetch_news on the shared HTTP client"""
         try:
-            price_params = {'symbol': symbol, 'convert': 'USD'}
-            price_res = requests.get(
+            params = await asyncio.to_thread(self._news_params, query)
+            newest = None
+            for page in range(1, Config.NEWS_MAX_PAGES + 1):
+                try:
+                    response = await get_async_client().get(
+                        self.news_api_url,
+                        params={**params, 'page': page},
+                        timeout=Config.SOURCE_TIMEOUTS['news']
+                    )
+                    if page > 1 and self._result_cap(response):
+                        await asyncio.to_thread(self.news_store.add, query, [], newest)
+                        break
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    if page == 1:
+                        raise
+                    print(f"News page {page} for '{query}' failed, keeping the pages before it: {e}")
+                    break
+                done, newest = await asyncio.to_thread(
+                    self._store_news_page, query, params, response.json(), page, newest
+                )
+                if done:
+                    break
+            return await asyncio.to_thread(self._stored_news, query)
+
+        except httpx.HTTPError as e:
+            record_error('data_collector.fetch_news', 'news')
+            print(f"News API request failed: {e}")
+            return "News service unavailable"
+        except Exception as e:
+            print(f"Error processing news: {e}")
+            return "Error fetching news"
+
+    def _quote_chunks(self, symbols):
+        """
+        Look up each symbol's cached quote and split the rest into endpoint-sized chunks:
+        misses must be fetched now, stale quotes are served and refreshed in the background.
+        """
+        quotes = {}
+        missing = []
+        stale = []
+        for symbol in dict.fromkeys(symbols):
+            data, state = self.cache.lookup(f'{symbol}_quote')
+            self._count('quote', state)
+            if state == 'miss':
+                if not self.cache.get(f'{symbol}_unquoted'):
+                    missing.append(symbol)
+                continue
+            quotes[symbol] = data
+            if state == 'stale':
+                stale.append(symbol)
+        size = Config.CMC_MAX_SYMBOLS_PER_REQUEST
+        return (
+            quotes,
+            [missing[i:i + size] for i in range(0, len(missing), size)],
+            [stale[i:i + size] for i in range(0, len(stale), size)]
+        )
+
+    def _store_quotes(self, chunk, payload, quotes):
+        """
+        Fill one cache entry per symbol from a batched quotes/latest response. Symbols CMC
+        skipped as invalid (delisted or unknown) are not requested again for a while.
+        """
+        data = payload.get('data', {})
+        for symbol in chunk:
+            quote = data.get(symbol)
+            if quote:
+                quotes[symbol] = quote
+                self._store('quote', f'{symbol}_quote', quote)
+            else:
+                self.cache.set(f'{symbol}_unquoted', True, Config.SOURCE_STALE_TTLS['quote'])
+
+    def _cached_quotes(self, chunk):
+        """The chunk's quotes if every quotable one is cached and fresh, else None"""
+        quotes = {}
+        for symbol in chunk:
+            quote = self.cache.get(f'{symbol}_quote')
+            if quote:
+                quotes[symbol] = quote
+            elif not self.cache.get(f'{symbol}_unquoted'):
+                return None
+        return quotes
+
+    def _fetch_quotes(self, chunk):
+        quotes = {}
+        self._fetch_quote_chunk(chunk, quotes)
+        return quotes
+
+    async def _afetch_quotes(self, chunk):
+        quotes = {}
+        await self._afetch_quote_chunk(chunk, quotes)
+        return quotes
+
+    @timed('data_collector.fetch_quotes', 'quote')
+    def _fetch_quote_chunk(self, chunk, quotes):
+        if not self.backoff.ready('quote'):
+            return
+        try:
+            response = requests.get(
                 Config.PRICE_API_URL,
                 headers=self.headers,
-                params=price_params
+                # skip_invalid: one delisted or unknown symbol must not fail the whole chunk
+                params={'symbol': ','.join(chunk), 'convert': 'USD', 'skip_invalid': 'true'}
+            )
+            response.raise_for_status()
+            self._store_quotes(chunk, response.json(), quotes)
+            self.backoff.success('quote')
+        except Exception as e:
+            record_error('data_collector.fetch_quotes', 'quote')
+            self.backoff.failure('quote')
+            print(f"Quote request failed for {','.join(chunk)}: {e}")
+
+    @timed('data_collector.fetch_quotes', 'quote')
+    async def _afetch_quote_chunk(self, chunk, quotes):
+        if not self.backoff.ready('quote'):
+            return
+        try:
+            response = await get_async_client().get(
+                Config.PRICE_API_URL,
+                headers=self.headers,
+                params={'symbol': ','.join(chunk), 'convert': 'USD', 'skip_invalid': 'true'},
+                timeout=Config.SOURCE_TIMEOUTS['quote']
+            )
+            response.raise_for_status()
+            await asyncio.to_thread(self._store_quotes, chunk, response.json(), quotes)
+            self.backoff.success('quote')
+        except Exception as e:
+            record_error('data_collector.fetch_quotes', 'quote')
+            self.backoff.failure('quote')
+            print(f"Quote request failed for {','.join(chunk)}: {e}")
+
+    def get_quotes_batch(self, symbols):
+        """
+        Fetch latest quotes for many symbols with one quotes/latest call per chunk.
+
+        Returns a dict of symbol -> CMC quote object; symbols the API did not return are absent.
+        Concurrent requests for the same missing chunk share one call.
+        """
+        quotes, missing, stale = self._quote_chunks(symbols)
+        for chunk in stale:
+            self._schedule_refresh(f"{','.join(chunk)}_quote", lambda chunk=chunk: self._fetch_quote_chunk(chunk, {}))
+        for chunk in missing:
+            quotes.update(self.flight.call(f"{','.join(chunk)}_quote", lambda chunk=chunk: self._fetch_quotes(chunk), 'quote'))
+        return quotes
+
+    async def aget_quotes_batch(self, symbols):
+        """Async variant of get_quotes_batch; chunks are requested concurrently"""
+        quotes, missing, stale = await asyncio.to_thread(self._quote_chunks, symbols)
+        for chunk in stale:
+            self._aschedule_refresh(f"{','.join(chunk)}_quote", lambda chunk=chunk: self._afetch_quote_chunk(chunk, {}))
+        fetched = await asyncio.gather(*(
+            self.flight.do(
+                f"{','.join(chunk)}_quote", lambda chunk=chunk: self._afetch_quotes(chunk), 'quote',
+                lambda chunk=chunk: self._cached_quotes(chunk), self._lease_ttl('quote')
             )
-            price_data = price_res.json().get('data', {}).get(symbol, {})
+            for chunk in missing
+        ))
+        for chunk_quotes in fetched:
+            quotes.update(chunk_quotes)
+        return quotes
+
+    @timed('data_collector.load_history', 'history', symbol_arg='symbol')
+    def _load_historical_prices(self, symbol):
+        return self.price_store.get(symbol)
+
+    @timed('data_collector.get_crypto_data', symbol_arg='symbol')
+    def get_crypto_data(self, symbol):
+        try:
+            price_data = self.get_quotes_batch([symbol]).get(symbol, {})
             
             # Example: Fetch historical data via API (adjust based on actual API)
             # historical_prices = pd.read_csv(rf"\backend\historical_data\{symbol.upper()}_historical.csv")
-            historical_prices = pd.read_csv(r"historical_data/{}_historical.csv".format(symbol.upper()))
+            historical_prices = self._load_historical_prices(symbol)
             
-            news = self.fetch_news(f"{symbol} cryptocurrency")
+            query = f"{symbol} cryptocurrency"
+            news = self._cached(
+                'news', f'{query}_news', lambda: self.fetch_news(query), _is_news, "News service unavailable",
+                _news_failed
+            )
+
+            reddit_posts = self._cached(
+                'reddit', f'{symbol}_reddit', lambda: self.social_analyst.fetch_reddit_posts(symbol), fallback=[]
+            )
+            if reddit_posts is None:
+                reddit_posts = []
+            social_sentiment = self._cached(
+                'social_sentiment', f'{symbol}_social_sentiment',
+                lambda: self.social_analyst.analyze_reddit_sentiment(reddit_posts), _is_sentiment,
+                failed=_llm_failed
+            )
+            processed_data = {
+                'symbol': symbol,
+                'current_price': price_data.get('quote', {}).get('USD', {}),
+                'news': news,
+                'historical_prices': historical_prices,
+                'reddit_posts': reddit_posts,
+                'social_sentiment': social_sentiment,
+                'timestamp': datetime.now().isoformat()
+            }
+            return processed_data
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            return None
+
+    async def _bounded(self, source, coro, fallback=None, symbol=''):
+        """
+        Run one upstream call under the shared concurrency limit and its per-source timeout.
+
+        Returns `fallback` if the call times out or fails, so one slow source degrades
+        its own field instead of the whole symbol.
+        """
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(coro, Config.SOURCE_TIMEOUTS.get(source))
+            except asyncio.TimeoutError:
+                print(f"{source} timed out after {Config.SOURCE_TIMEOUTS.get(source)}s")
+            except Exception as e:
+                print(f"{source} request failed: {e}")
+            record_error('upstream', source, symbol)
+            return fallback
+
+    async def _aquote_for(self, symbol, quotes):
+        if quotes is None:
+            quotes = self._bounded('quote', self.aget_quotes_batch([symbol]), {})
+        return (await quotes).get(symbol, {})
+
+    @timed('data_collector.get_crypto_data', symbol_arg='symbol')
+    async def aget_crypto_data(self, symbol, quotes=None):
+        """
+        Async variant of get_crypto_data.
+
+        Quote, historical prices, news and Reddit posts are fetched concurrently; the
+        social sentiment step only waits on the Reddit posts it needs. `quotes` may be a
+        shared awaitable from aget_quotes_batch so many symbols reuse one quote request.
+        """
+        query = f"{symbol} cryptocurrency"
+
+        async def fetch_news():
+            return await self._bounded('news', self.afetch_news(query), "News service unavailable", symbol)
+
+        async def fetch_reddit_posts():
+            return await self._bounded('reddit', self.social_analyst.afetch_reddit_posts(symbol), None, symbol)
+
+        try:
+            price_data, historical_prices, news, reddit_posts = await asyncio.gather(
+                self._aquote_for(symbol, quotes),
+                self._bounded('history', asyncio.to_thread(self._load_historical_prices, symbol), symbol=symbol),
+                self._acached('news', f'{query}_news', fetch_news, _is_news, "News service unavailable", _news_failed),
+                self._acached('reddit', f'{symbol}_reddit', fetch_reddit_posts, fallback=[])
+            )
+            if historical_prices is None:
+                return None
+            if reddit_posts is None:
+                reddit_posts = []
+
+            async def analyze_social():
+                async with self._semaphore:
+                    return await self.social_analyst.aanalyze_reddit_sentiment(reddit_posts)
+
+            social_sentiment = await self._acached(
+                'social_sentiment', f'{symbol}_social_sentiment', analyze_social, _is_sentiment, failed=_llm_failed
+            )
 
-            reddit_posts = self.social_analyst.fetch_reddit_posts(symbol)
             processed_data = {
                 'symbol': symbol,
                 'current_price': price_data.get('quote', {}).get('USD', {}),
                 'news': news,
                 'historical_prices': historical_prices,
                 'reddit_posts': reddit_posts,
-                'social_sentiment': self.social_analyst.analyze_reddit_sentiment(reddit_posts),
+                'social_sentiment': social_sentiment,
                 'timestamp': datetime.now().isoformat()
             }
-            self.cache.set(f'{symbol}_data', processed_data,3600)
             return processed_data
         except Exception as e:
             print(f"Error fetching data for {symbol}: {e}")
             return None
 
+    async def aget_crypto_data_many(self, symbols):
+        """Collect every symbol concurrently; results keep the order of `symbols`"""
+        quotes = asyncio.ensure_future(self._bounded('quote', self.aget_quotes_batch(symbols), {}))
+        return await asyncio.gather(*(self.aget_crypto_data(symbol, quotes) for symbol in symbols))
+
     def _process_historical_data(self, data):
         # Process API response into DataFrame (adjust based on actual API structure)
         df = pd.DataFrame(data['data'])
@@ -110,6 +582,7 @@ class DataCollector:
         df = df.sort_values('timestamp')
         return df
     
+    @timed('data_collector.fetch_html', 'ecosystem')
     def fetch_html(self,url):
         """
         Fetch HTML content from the provided URL.
@@ -122,77 +595,23 @@ class DataCollector:
             print(f"Error fetching {url}: {e}")
             return None
 
-    def fetch_projects(self,url="https://www.movementnetwork.xyz/ecosystem"):
+    @timed('data_collector.fetch_projects', 'ecosystem')
+    def fetch_projects(self,url=ECOSYSTEM_URL):
         """
         Scrape the projects from the Ecosystem page.
 
-        This function locates the container with id 'projects_results' and then iterates over each
-        project (each <div> with class 'grid__item'), extracting the project name, link, description,
+        The container with id 'projects_results' is parsed with lxml (see utils.ecosystem.parse_projects);
+        each project (each <div> with class 'grid__item') yields its name, link, description,
         categories, and languages.
         """
         html = self.fetch_html(url)
         if not html:
             return []
 
-        soup = BeautifulSoup(html, "html.parser")
-        projects = []
-
-        # Locate the main container holding all projects
-        projects_div = soup.find("div", id="projects_results")
-        if not projects_div:
+        projects = parse_projects(html)
+        if projects is None:
             print("Could not find the projects results container.")
-            return projects
-
-        # Each project is within a div with class "grid__item"
-        grid_items = projects_div.find_all("div", class_="grid__item")
-        for item in grid_items:
-            # --- Extract project link from the <picture> tag (if available)
-            project_link = None
-            picture = item.find("picture")
-            if picture:
-                a_tag = picture.find("a")
-                if a_tag and a_tag.get("href"):
-                    project_link = a_tag.get("href")
-
-            # --- Extract project name and description from the content block
-            project_name = None
-            project_description = None
-            content_div = item.find("div", class_="content")
-            if content_div:
-                a_content = content_div.find("a")
-                if a_content:
-                    h3_tag = a_content.find("h3")
-                    if h3_tag:
-                        project_name = h3_tag.get_text(strip=True)
-                    p_tag = a_content.find("p")
-                    if p_tag:
-                        project_description = p_tag.get_text(strip=True)
-                # Fallback in case description isn't inside the <a> tag:
-                if not project_description:
-                    p_tag = content_div.find("p")
-                    if p_tag:
-                        project_description = p_tag.get_text(strip=True)
-
-            # --- Extract tags (categories and languages)
-            project_categories = []
-            project_languages = []
-            tags_ul = item.find("ul", class_="tags")
-            if tags_ul:
-                for li in tags_ul.find_all("li"):
-                    classes = li.get("class", [])
-                    text = li.get_text(strip=True)
-                    if "tag__cat" in classes:
-                        project_categories.append(text)
-                    elif "tag__lang" in classes:
-                        project_languages.append(text)
-
-            projects.append({
-                "name": project_name,
-                "link": project_link,
-                "description": project_description,
-                "categories": project_categories,
-                "languages": project_languages,
-            })
+            return []
         return projects
 
     def group_projects_by_category(self,projects):
@@ -210,23 +629,165 @@ class DataCollector:
         return category_groups
 
     # --- End of your scraping code ---
-    def fetch_application_data(self):
-        cache_key = f"application_data"
-        cached = self.cache.get(cache_key)
-        if cached:
-            print(f"Using cached application data")
-            return cached
-        
-        # Fetch and group the projects
-        projects = self.fetch_projects()
+    def _save_ecosystem(self):
+        self.cache.set('ecosystem_catalog', self.ecosystem.snapshot(), Config.SOURCE_STALE_TTLS['ecosystem'])
+
+    @timed('data_collector.refresh_ecosystem', 'ecosystem')
+    def refresh_ecosystem(self, url=ECOSYSTEM_URL):
+        """
+        Revalidate the ecosystem page with If-None-Match/If-Modified-Since and, when it changed,
+        re-parse it into the catalog. Returns the (added, changed, removed) projects, or None
+        when the page is unchanged or could not be fetched.
+        """
+        headers = {}
+        if self.ecosystem.etag:
+            headers['If-None-Match'] = self.ecosystem.etag
+        if self.ecosystem.last_modified:
+            headers['If-Modified-Since'] = self.ecosystem.last_modified
+
+        try:
+            response = requests.get(url, headers=headers, timeout=Config.SOURCE_TIMEOUTS['ecosystem'])
+            if response.status_code == 304:
+                self.backoff.success('ecosystem')
+                self.ecosystem.checked_at = time.time()
+                self._save_ecosystem()
+                return None
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            record_error('data_collector.refresh_ecosystem', 'ecosystem')
+            self.backoff.failure('ecosystem')
+            print(f"Error fetching {url}: {e}")
+            return None
+
+        projects = parse_projects(response.text)
         if not projects:
+            self.backoff.failure('ecosystem')
             print("No projects found. Please verify the page structure.")
-        grouped_projects = self.group_projects_by_category(projects)
-
-        # Convert the grouped projects dictionary into a JSON-formatted string.
-        # This will serve as the context for our AI agent.
-        available_projects_str = json.dumps(grouped_projects, indent=2)
-        self.cache.set(cache_key, grouped_projects, 864000)
-        #print("Available Projects by Category:")
-        #print(available_projects_str)
-        return grouped_projects
+            return None
+
+        self.backoff.success('ecosystem')
+        changes = self.ecosystem.replace(
+            projects, response.headers.get('ETag'), response.headers.get('Last-Modified')
+        )
+        self._save_ecosystem()
+        return changes
+
+    def sync_ecosystem(self):
+        """
+        Bring the catalog up to date: adopt a newer snapshot saved by another worker, then
+        revalidate the page if it is due and nobody else is doing so. Returns the combined
+        (added, changed, removed) projects, or None if nothing changed; filling an empty
+        catalog is not reported as a change.
+        """
+        was_empty = not len(self.ecosystem)
+        changes = None
+        snapshot = self.cache.get('ecosystem_catalog')
+        if snapshot and snapshot['checked_at'] > self.ecosystem.checked_at:
+            changes = self.ecosystem.load(snapshot)
+
+        due = time.time() - self.ecosystem.checked_at > Config.SOURCE_CACHE_TTLS['ecosystem']
+        if due and self.backoff.ready('ecosystem') and self.cache.add(
+            'ecosystem_refresh_lease', os.getpid(), Config.SOURCE_TIMEOUTS['ecosystem'] * 2
+        ):
+            refreshed = self.refresh_ecosystem()
+            if refreshed:
+                changes = refreshed if changes is None else tuple(a + b for a, b in zip(changes, refreshed))
+
+        if was_empty or not changes or not any(changes):
+            return None
+        return changes
+
+    def _fill_ecosystem(self):
+        """
+        Cold start: sync the empty catalog, and while another worker holds the refresh lease,
+        poll for the snapshot it saves instead of answering with no projects. Once the lease
+        expires (its holder failed), the next sync fetches the page here.
+        """
+        self.sync_ecosystem()
+        while not len(self.ecosystem) and self.cache.get('ecosystem_refresh_lease') not in (None, os.getpid()):
+            time.sleep(Config.COALESCE_POLL_INTERVAL)
+            self.sync_ecosystem()
+
+    @timed('data_collector.fetch_application_data', 'ecosystem')
+    def fetch_application_data(self):
+        """Projects grouped by category, straight from the in-memory catalog"""
+        if not len(self.ecosystem):
+            # Cold start: load or fetch before answering; concurrent requests share one sync
+            self.flight.call('ecosystem_catalog', self._fill_ecosystem, 'ecosystem')
+        elif time.time() - self.ecosystem.checked_at > Config.SOURCE_CACHE_TTLS['ecosystem']:
+            self._schedule_refresh('ecosystem_catalog', self.sync_ecosystem)
+        return self.ecosystem.grouped()
+
+    @timed('data_collector.fetch_listings', 'listings')
+    def fetch_listings(self, limit=Config.UNIVERSE_SIZE):
+        """
+        Rank the universe from one listings/latest call: names and ranks go to the symbol
+        registry, and each listing's quote fills the quote cache like quotes/latest would.
+        Returns the number of symbols listed, or None if the call failed.
+        """
+        if not self.backoff.ready('listings'):
+            return None
+        try:
+            response = requests.get(
+                Config.LISTINGS_API_URL,
+                headers=self.headers,
+                params={'start': 1, 'limit': limit, 'convert': 'USD'},
+                timeout=Config.SOURCE_TIMEOUTS['listings']
+            )
+            response.raise_for_status()
+            listings = response.json().get('data', [])
+            self.backoff.success('listings')
+        except Exception as e:
+            record_error('data_collector.fetch_listings', 'listings')
+            self.backoff.failure('listings')
+            print(f"Listings request failed: {e}")
+            return None
+
+        for listing in listings:
+            if listing.get('symbol') and listing.get('quote'):
+                self._store('quote', f"{listing['symbol'].upper()}_quote", listing)
+        return self.registry.sync_listings(listings)
+
+    def sync_universe(self, limit=Config.UNIVERSE_SIZE, backfill=Config.UNIVERSE_BACKFILL_PER_RUN):
+        """
+        Refresh the listings when due, then append recent daily candles for up to `backfill`
+        symbols of the universe whose history is missing or two days behind, and fold new
+        candles into the OHLCV rollups. Each step runs in one worker at a time (the candle and
+        rollup files take a single writer). Returns the symbols backfilled.
+        """
+        due = time.time() - self.registry.listed_at() > Config.UNIVERSE_REFRESH_INTERVAL
+        if due and self.cache.add('universe_refresh_lease', os.getpid(), self._lease_ttl('listings')):
+            self.fetch_listings(limit)
+
+        lease = 'universe_backfill_lease'
+        if not self.cache.add(lease, os.getpid(), Config.SOURCE_TIMEOUTS['history'] * (backfill + 1) * 2):
+            return []
+        try:
+            now = time.time()
+            universe = self.registry.universe(limit)
+            attempted = self.registry.backfilled_at(universe)
+            behind = []
+            for symbol in universe:
+                if len(behind) >= backfill:
+                    break
+                # Symbols tried this interval wait their turn, so failing ones don't starve the rest
+                if now - attempted.get(symbol, 0) < Config.UNIVERSE_REFRESH_INTERVAL:
+                    continue
+                if not self.price_store.has(symbol):
+                    self.price_store.create(symbol)
+                    behind.append(symbol)
+                    continue
+                timestamps = self.price_store.get(symbol).timestamp
+                if not len(timestamps) or timestamps[-1] < now - 2 * 86400:
+                    behind.append(symbol)
+
+            self.registry.mark_backfilled(behind, now)
+            for symbol in behind:
+                self.price_store.fetch_latest(symbol)
+            for symbol in dict.fromkeys(self.registry.tracked() + behind):
+                if self.price_store.has(symbol):
+                    self.rollups.update(symbol)
+            return behind
+        finally:
+            # Expire the lease now so the next run can start in any worker
+            self.cache.set(lease, None, 0)
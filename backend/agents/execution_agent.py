@@ -1,25 +1,243 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import asyncio
+import itertools
+import threading
 import time
+from collections import OrderedDict
+
+from config import Config
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def _chromedriver_path():
+    """Resolve (and download if needed) chromedriver once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+class ChromeDriver:
+    """Headless Chrome session; selenium is imported when the first session starts"""
 
-class ExecutionAgent:
     def __init__(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
         chrome_options = Options()
         chrome_options.add_argument("--headless=new")
-        self.driver = webdriver.Chrome(
-            ChromeDriverManager().install(),
-            options=chrome_options
-        )
+        self.driver = webdriver.Chrome(service=Service(_chromedriver_path()), options=chrome_options)
+        self.driver.set_page_load_timeout(Config.EXECUTION_TIMEOUT)
+
+    def open(self, url):
+        # get() returns once the page has loaded
+        self.driver.get(url)
+        return self.driver.title
+
+    def healthy(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        self.driver.quit()
+
+
+class FakeDriver:
+    """Browserless stand-in with the same interface, for tests and offline runs"""
+
+    def __init__(self, delay=0.0, fail_urls=()):
+        self.delay = delay
+        self.fail_urls = set(fail_urls)
+        self.visited = []
+        self.closed = False
+
+    def open(self, url):
+        if self.closed:
+            raise RuntimeError("Session is closed")
+        time.sleep(self.delay)
+        if url in self.fail_urls:
+            raise RuntimeError(f"Failed to load {url}")
+        self.visited.append(url)
+        return "Fake page"
+
+    def healthy(self):
+        return not self.closed
+
+    def quit(self):
+        self.closed = True
+
+
+DRIVERS = {
+    'chrome': ChromeDriver,
+    'fake': FakeDriver,
+}
+
+
+class ExecutionAgent:
+    def __init__(self, driver=None):
+        self.driver = driver or DRIVERS[Config.EXECUTION_DRIVER]()
+        self.cancelled = threading.Event()  # Set when the caller gave up; no driver calls after it
 
     def execute_action(self, action):
+        if self.cancelled.is_set():
+            raise RuntimeError("Action was cancelled")
+        self.driver.open(Config.EXECUTION_URL)
+        return {
+            "status": "simulated_success",
+            "action": action,
+            "details": "Headless execution completed"
+        }
+
+
+class ExecutionPool:
+    """
+    A fixed number of warm browser sessions fed from an asyncio job queue.
+
+    Each worker owns one session. It checks the session's health before every job and
+    replaces it when the check fails, when a job errors, or after `max_jobs_per_session`
+    jobs. Driver calls are blocking, so they run in worker threads. Jobs are tracked by
+    id for status polling; only the latest `history` jobs are kept.
+    """
+
+    def __init__(self, size=Config.EXECUTION_WORKERS, max_jobs_per_session=Config.EXECUTION_MAX_JOBS_PER_SESSION,
+                 driver_factory=None, timeout=Config.EXECUTION_TIMEOUT, history=1000):
+        self.size = size
+        self.max_jobs_per_session = max_jobs_per_session
+        self.driver_factory = driver_factory or DRIVERS[Config.EXECUTION_DRIVER]
+        self.timeout = timeout
+        self.history = history
+        self.jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._queue = None
+        self._done = {}  # job id -> asyncio.Event, until the job finishes
+        self._workers = []
+        self._retiring = set()  # Tasks closing sessions that a timed-out job's thread still holds
+        self.sessions_started = 0
+
+    def _new_job_id(self):
+        return f"{int(time.time())}-{next(self._ids)}"
+
+    async def _new_session(self):
+        session = await asyncio.to_thread(self.driver_factory)
+        self.sessions_started += 1
+        return session
+
+    async def _close(self, session):
+        if session is not None:
+            try:
+                await asyncio.to_thread(session.quit)
+            except Exception as e:
+                print(f"Failed to close execution session: {e}")
+
+    async def _close_after(self, session, call):
         try:
-            self.driver.get("https://www.binance.com/en")
-            time.sleep(3)
-            return {
-                "status": "simulated_success",
-                "action": action,
-                "details": "Headless execution completed"
-            }
+            await call
+        except Exception:
+            pass
+        await self._close(session)
+
+    def _retire(self, session, call):
+        """Close `session` in the background once the thread still using it has returned"""
+        task = asyncio.create_task(self._close_after(session, call))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def _worker(self):
+        session = None
+        jobs_done = 0
+        try:
+            try:
+                session = await self._new_session()  # Warm before the first job arrives
+            except Exception as e:
+                print(f"Failed to start execution session: {e}")
+            while True:
+                job = await self._queue.get()
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+                try:
+                    if session is None or jobs_done >= self.max_jobs_per_session or \
+                            not await asyncio.to_thread(session.healthy):
+                        await self._close(session)
+                        session, jobs_done = None, 0
+                        session = await self._new_session()
+                    agent = ExecutionAgent(session)
+                    call = asyncio.ensure_future(asyncio.to_thread(agent.execute_action, job['action']))
+                    try:
+                        job['result'] = await asyncio.wait_for(asyncio.shield(call), self.timeout)
+                    except asyncio.TimeoutError:
+                        # A thread cannot be interrupted: flag the job so it makes no further driver
+                        # calls, and hand its session off to be closed once the thread returns
+                        agent.cancelled.set()
+                        self._retire(session, call)
+                        session = None
+                        raise
+                    job['status'] = 'succeeded'
+                    jobs_done += 1
+                except asyncio.CancelledError:
+                    raise
+                except asyncio.TimeoutError:
+                    job['status'] = 'failed'
+                    job['error'] = f"Failed to execute action: timed out after {self.timeout}s"
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = f"Failed to execute action: {e!r}"
+                    # Don't trust a session that just failed
+                    await self._close(session)
+                    session = None
+                finally:
+                    job['finished_at'] = time.time()
+                    self._done.pop(job['id']).set()
+                    self._queue.task_done()
         finally:
-            self.driver.quit()
\ No newline at end of file
+            await self._close(session)
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.size)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await asyncio.gather(*self._retiring, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, action):
+        """Queue an action; returns its job record (poll `get` with its id)"""
+        if not self._workers:
+            self.start()
+        job = {'id': self._new_job_id(), 'action': action, 'status': 'queued', 'submitted_at': time.time(),
+               'started_at': None, 'finished_at': None, 'result': None, 'error': None}
+        self.jobs[job['id']] = job
+        self._done[job['id']] = asyncio.Event()
+        while len(self.jobs) > self.history:
+            self.jobs.popitem(last=False)
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id, timeout=None):
+        """Wait until a job has finished and return it"""
+        job = self.jobs[job_id]
+        done = self._done.get(job_id)
+        if done:
+            await asyncio.wait_for(done.wait(), timeout)
+        return job
+
+    def stats(self):
+        counts = {}
+        for job in self.jobs.values():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'workers': len(self._workers), 'queued': self._queue.qsize() if self._queue else 0,
+                'sessions_started': self.sessions_started, 'jobs': counts}
@@ -1,19 +1,23 @@
+import time
+
 import pandas as pd
 import numpy as np
+from utils.indicators import IndicatorEngine, validate_closes
+from utils.rollups import resample
+from utils.streaming_indicators import StreamingIndicators
+from utils.metrics import timed
 
 class MarketAnalyst:
-    def __init__(self):
+    def __init__(self, rollups=None):
         self.rsi_window = 14  # Standard RSI window
         self.sma_windows = [3, 5]  # Short-term SMAs
         self.ema_windows = [5, 10]  # Medium-term EMAs
+        self.engine = IndicatorEngine(self.sma_windows, self.ema_windows, self.rsi_window)
+        self.rollups = rollups  # DataCollector's RollupStore, for reading a symbol's history
 
     def _validate_data(self, closes):
         """Ensure data quality before analysis"""
-        if len(closes) < 2:
-            raise ValueError("Insufficient data points")
-        if any(price <= 0 for price in closes):
-            raise ValueError("Invalid prices (zero or negative)")
-        return np.array(closes)
+        return validate_closes(closes)
 
     def calculate_rsi(self, closes):
         """Calculate Relative Strength Index"""
@@ -59,43 +63,129 @@ class MarketAnalyst:
             "signal": round(signal.iloc[-1], 4)
         }
 
-    def analyze_trends(self, historical_prices):
+    def _closes(self, historical_prices):
+        """Chronological closing prices from a PriceSeries (zero-copy) or raw CSV rows"""
+        if hasattr(historical_prices, 'close'):
+            # HistoricalPriceStore series are already sorted oldest first
+            return historical_prices.close
+
+        # Convert historical prices to DataFrame for easier manipulation
+        df = pd.DataFrame(historical_prices)
+
+        # Ensure data is sorted chronologically
+        df['Start'] = pd.to_datetime(df['Start'])
+        df = df.sort_values('Start')
+
+        # Extract closing prices
+        return df['Close'].values
+
+    def _summarize(self, closes, indicators):
+        # Basic price analysis
+        price_change_pct = ((closes[-1] - closes[0]) / closes[0]) * 100
+        recent_trend = "up" if closes[-1] > closes[-2] else "down"
+
+        analysis = {
+            "price_change": f"{price_change_pct:.2f}%",
+            "current_price": closes[-1],
+            "recent_trend": recent_trend,
+            **indicators
+        }
+
+        # Add trend strength analysis
+        analysis['trend_strength'] = self._assess_trend_strength(analysis)
+        return analysis
+
+    def _candles(self, historical_prices, timeframe):
+        """A symbol's stored candles (its rollup with a timeframe), or the given history resampled"""
+        if isinstance(historical_prices, str):
+            if self.rollups is None:
+                raise ValueError("No price store to read symbols from")
+            if timeframe:
+                return self.rollups.get(historical_prices, timeframe)
+            return self.rollups.price_store.get(historical_prices)
+        if timeframe:
+            if not hasattr(historical_prices, 'close'):
+                raise ValueError("Resampling needs a symbol or a PriceSeries")
+            return resample(historical_prices, timeframe)
+        return historical_prices
+
+    @timed('market_analyst.analyze_trends')
+    def analyze_trends(self, historical_prices, timeframe=None):
+        """
+        Indicators over a PriceSeries, raw CSV rows or a symbol's stored history. With a
+        `timeframe` ('1h', '4h', '1d', '1w') each window counts candles of that timeframe,
+        read from the symbol's precomputed rollup.
+        """
         try:
-            # Convert historical prices to DataFrame for easier manipulation
-            df = pd.DataFrame(historical_prices)
-            
-            # Ensure data is sorted chronologically
-            df['Start'] = pd.to_datetime(df['Start'])
-            df = df.sort_values('Start')
-            
-            # Extract closing prices
-            closes = df['Close'].values
-            
-            # Basic price analysis
-            price_change_pct = ((closes[-1] - closes[0]) / closes[0]) * 100
-            recent_trend = "up" if closes[-1] > closes[-2] else "down"
-            
-            # Calculate technical indicators
-            analysis = {
-                "price_change": f"{price_change_pct:.2f}%",
-                "current_price": closes[-1],
-                "recent_trend": recent_trend,
-                "sma": {w: self.calculate_sma(closes, w) for w in self.sma_windows},
-                "ema": {w: self.calculate_ema(closes, w) for w in self.ema_windows},
-                "rsi": self.calculate_rsi(closes),
-                "macd": self.calculate_macd(closes)
-            }
-            
-            # Add trend strength analysis
-            analysis['trend_strength'] = self._assess_trend_strength(analysis)
-            
+            closes = self._validate_data(self._closes(self._candles(historical_prices, timeframe)))
+
+            # All technical indicators come from one engine pass over the validated closes
+            analysis = self._summarize(closes, self.engine.compute(closes))
+            if timeframe:
+                analysis['timeframe'] = timeframe
             return analysis
-            
+
         except Exception as e:
             return {"error": str(e)}
 
+    @timed('market_analyst.analyze_trends_batch')
+    def analyze_trends_batch(self, histories):
+        """analyze_trends for many symbols with a single vectorized indicator call"""
+        closes = []
+        for historical_prices in histories:
+            try:
+                closes.append(np.asarray(self._closes(historical_prices), dtype=np.float64))
+            except Exception:
+                closes.append(np.empty(0))
+        result = self.engine.compute_batch(closes)
+
+        analyses = []
+        for i, series in enumerate(closes):
+            try:
+                analyses.append(self._summarize(series, self.engine.summary(result, i)))
+            except Exception as e:
+                analyses.append({"error": str(e)})
+        return analyses
+
+    def live_indicators(self, symbol, historical_prices):
+        """O(1)-per-update indicator state for a symbol, seeded from its price history"""
+        return StreamingIndicators.from_series(
+            symbol, historical_prices,
+            sma_windows=self.sma_windows, ema_windows=self.ema_windows, rsi_window=self.rsi_window
+        )
+
+    def analyze_live(self, symbol, historical_prices, price=None, state=None):
+        """
+        analyze_trends for a monitored symbol, updated incrementally. `state` (the
+        StreamingIndicators a previous call returned, or None to seed one from the history)
+        takes the stored candles it has not seen yet, then the live `price` as a tick on the
+        current candle. Returns (analysis, state).
+        """
+        try:
+            timestamps = np.asarray(historical_prices.timestamp)
+            if state is None or state.timestamp is None:
+                state = self.live_indicators(symbol, historical_prices)
+            else:
+                # The candle at the state's timestamp may be its live candle, now closed and stored
+                for i in range(int(np.searchsorted(timestamps, state.timestamp)), len(timestamps)):
+                    timestamp = int(timestamps[i])
+                    state.update(historical_prices.close[i], timestamp, new_candle=timestamp != state.timestamp)
+            if price:
+                spacing = int(timestamps[-1] - timestamps[-2]) if len(timestamps) > 1 else 86400
+                candle = int(time.time()) // spacing * spacing
+                if state.timestamp is None or candle >= state.timestamp:
+                    state.update(price, candle, new_candle=candle != state.timestamp)
+
+            analysis = state.snapshot()
+            analysis['trend_strength'] = self._assess_trend_strength(analysis)
+            return analysis, state
+        except Exception as e:
+            return {"error": str(e)}, state
+
     def _assess_trend_strength(self, analysis):
         """Evaluate trend strength based on multiple indicators"""
+        if isinstance(analysis, StreamingIndicators):
+            analysis = analysis.snapshot()
         strength = []
         
         # RSI analysis
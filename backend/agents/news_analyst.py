@@ -1,22 +1,20 @@
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage
 import json
 import logging
-from textblob import TextBlob
-from collections import defaultdict
+import numpy as np
+from utils.metrics import timed
+from utils.sentiment_scorer import get_sentiment_scorer
 
 logger = logging.getLogger(__name__)
 
 class NewsAnalyst:
     def __init__(self):
-        # Initialize sentiment analyzer
-        pass
+        # Shared, memoized TextBlob scorer
+        self.scorer = get_sentiment_scorer('textblob')
 
     def _analyze_single_article(self, text):
         """Analyze sentiment of a single news article."""
-        analysis = TextBlob(text)
         # Polarity ranges from -1 (negative) to 1 (positive)
-        return analysis.sentiment.polarity
+        return float(self.scorer.scores([text])[0])
 
     def _categorize_sentiment(self, score):
         """Convert sentiment score to bullish/bearish/neutral."""
@@ -27,55 +25,58 @@ class NewsAnalyst:
         else:
             return "neutral"
 
+    @timed('news_analyst.analyze_sentiment')
     def analyze_sentiment(self, news_items):
         try:
             if not news_items or not isinstance(news_items, list):
                 return {"error": "Invalid news data"}
 
-            sentiment_scores = []
-            key_events = []
-            source_sentiments = defaultdict(list)
-
-            # Analyze each news item
+            titles = []
+            sources = []
+            texts = []
             for item in news_items:
                 title = item.get('title', '')
                 description = item.get('description', '')
-                source = item.get('source', 'Unknown')
 
                 # Combine title and description for analysis
                 text = f"{title}. {description}"
                 if not text.strip():
                     continue
+                titles.append(title)
+                sources.append(item.get('source', 'Unknown'))
+                texts.append(text)
 
-                # Get sentiment score
-                score = self._analyze_single_article(text)
-                sentiment_scores.append(score)
-                source_sentiments[source].append(score)
+            if not texts:
+                return {"error": "No valid news items to analyze"}
 
-                # Identify key events
-                if abs(score) >= 0.3:  # Significant sentiment
-                    key_events.append({
-                        "title": title,
-                        "source": source,
-                        "sentiment": self._categorize_sentiment(score),
-                        "confidence": abs(score) * 100
-                    })
+            # Score all articles in one (cached) batch
+            sentiment_scores = self.scorer.scores(texts)
 
-            if not sentiment_scores:
-                return {"error": "No valid news items to analyze"}
+            # Identify key events
+            key_events = [
+                {
+                    "title": titles[i],
+                    "source": sources[i],
+                    "sentiment": self._categorize_sentiment(sentiment_scores[i]),
+                    "confidence": float(abs(sentiment_scores[i]) * 100)
+                }
+                for i in np.flatnonzero(np.abs(sentiment_scores) >= 0.3)  # Significant sentiment
+            ]
 
             # Calculate overall sentiment
-            avg_score = sum(sentiment_scores) / len(sentiment_scores)
+            avg_score = float(sentiment_scores.mean())
             overall_sentiment = self._categorize_sentiment(avg_score)
             confidence = abs(avg_score) * 100  # Scale to 0-100
 
-            # Source-wise sentiment breakdown
+            # Source-wise sentiment breakdown, in order of first appearance
+            source_names, first_seen, source_ids = np.unique(sources, return_index=True, return_inverse=True)
+            source_means = np.bincount(source_ids, weights=sentiment_scores) / np.bincount(source_ids)
             source_analysis = {
-                source: {
-                    "sentiment": self._categorize_sentiment(sum(scores) / len(scores)),
-                    "confidence": abs(sum(scores) / len(scores)) * 100
+                str(source_names[j]): {
+                    "sentiment": self._categorize_sentiment(source_means[j]),
+                    "confidence": float(abs(source_means[j]) * 100)
                 }
-                for source, scores in source_sentiments.items()
+                for j in np.argsort(first_seen)
             }
 
             return {
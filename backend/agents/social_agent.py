@@ -1,74 +1,105 @@
-import praw  # Python Reddit API Wrapper
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+import asyncio
+import time
+import numpy as np
 from config import Config
-from langchain_groq import ChatGroq
+from utils.metrics import record_error, timed
+from utils.llm_gateway import get_llm_gateway
+from utils.sentiment_scorer import get_sentiment_scorer
+from utils.reddit_store import RedditIngestor, RedditStore, reddit_query
 import os
 
 class SocialSentimentAnalyst:
     def __init__(self):
-        self.reddit = praw.Reddit(
-            client_id=Config.REDDIT_CLIENT_ID,
-            client_secret=Config.REDDIT_CLIENT_SECRET,
-            user_agent=Config.REDDIT_USER_AGENT
-        )
-        self.analyzer = SentimentIntensityAnalyzer()
-        self.llm = ChatGroq(temperature=0.5,model_name="llama-3.1-8b-instant", groq_api_key=os.getenv('GROQ_API_KEY'))
+        self._reddit = None
+        self.store = RedditStore()
+        self.ingestor = RedditIngestor(lambda: self.reddit, self.store)
+        self.scorer = get_sentiment_scorer('vader')
+        self.llm = get_llm_gateway()
 
+    @property
+    def reddit(self):
+        """PRAW client, imported and built on first use"""
+        if self._reddit is None:
+            import praw  # Python Reddit API Wrapper
+            self._reddit = praw.Reddit(
+                client_id=Config.REDDIT_CLIENT_ID,
+                client_secret=Config.REDDIT_CLIENT_SECRET,
+                user_agent=Config.REDDIT_USER_AGENT
+            )
+        return self._reddit
+
+    @timed('social_agent.fetch_reddit_posts', 'reddit', symbol_arg='crypto_name')
     def fetch_reddit_posts(self, crypto_name, limit=50):
-        """Fetch recent Reddit posts about a cryptocurrency"""
+        """
+        Recent Reddit posts about a cryptocurrency, from the local post store (None if that failed).
+        The store holds the newest posts of the week rather than Reddit's most relevant ones, and
+        returns the most upvoted of them.
+        """
         try:
-            posts = []
-            for submission in self.reddit.subreddit('all').search(
-                f'{crypto_name} cryptocurrency',
-                sort='relevance',
-                time_filter='week',
-                limit=limit
-            ):
-                posts.append({
-                    'title': submission.title,
-                    'content': submission.selftext,
-                    'upvotes': submission.score,
-                    'comments': submission.num_comments,
-                    'created': submission.created_utc
-                })
-            return posts
+            query = reddit_query(crypto_name)
+            newest = self.store.watermark(query)
+            if newest is None:
+                # First request for this query: backfill it now
+                self.ingestor.ingest(query)
+            elif time.time() - newest > Config.REDDIT_STALE_AFTER and self.store.claim(query, Config.REDDIT_STALE_AFTER):
+                # The ingestor is off or behind: search again, one worker per query and period
+                self.ingestor.ingest(query)
+            return self.store.recent(query, limit=limit)
         except Exception as e:
+            record_error('social_agent.fetch_reddit_posts', 'reddit', crypto_name)
             print(f"Reddit API error: {e}")
-            return []
+            return None
 
-    def analyze_reddit_sentiment(self, posts):
-        """Analyze sentiment of Reddit posts using combined VADER and LLM analysis"""
-        if not posts:
-            return {"error": "No Reddit posts found"}
-        # VADER Sentiment Analysis
-        vader_scores = []
-        weighted_scores = []
-        
-        for post in posts:
-            vs = self.analyzer.polarity_scores(post['title'] + " " + post['content'])
-            vader_scores.append(vs['compound'])
-            # Weight by post engagement
-            weight = 1 + (post['upvotes'] / 100) + (post['comments'] / 10)
-            weighted_scores.append(vs['compound'] * weight)
-        
-        avg_vader = sum(vader_scores) / len(vader_scores)
-        avg_weighted = sum(weighted_scores) / sum(1 + (p['upvotes']/100) + (p['comments']/10) for p in posts)
+    async def afetch_reddit_posts(self, crypto_name, limit=50):
+        """Async variant of fetch_reddit_posts; PRAW is blocking, so it runs in a worker thread"""
+        return await asyncio.to_thread(self.fetch_reddit_posts, crypto_name, limit)
+
+    def _summarize(self, posts, llm_analysis):
+        # VADER Sentiment Analysis, scored as one cached batch
+        vader_scores = self.scorer.scores([post['title'] + " " + post['content'] for post in posts])
+        upvotes = np.array([post['upvotes'] for post in posts], dtype=float)
+        comments = np.array([post['comments'] for post in posts], dtype=float)
+
+        # Weight by post engagement
+        weights = 1 + upvotes / 100 + comments / 10
+        avg_vader = float(vader_scores.mean())
+        avg_weighted = float(vader_scores @ weights / weights.sum())
 
-        # LLM Analysis for contextual understanding
-        llm_analysis = self._llm_sentiment_analysis(posts)
-        
         return {
             'vader_score': avg_vader,
             'weighted_score': avg_weighted,
             'llm_analysis': llm_analysis,
             'post_count': len(posts),
-            'average_upvotes': sum(p['upvotes'] for p in posts) / len(posts),
-            'average_comments': sum(p['comments'] for p in posts) / len(posts)
+            'average_upvotes': float(upvotes.mean()),
+            'average_comments': float(comments.mean())
         }
 
-    def _llm_sentiment_analysis(self, posts):
-        """Use LLM for nuanced sentiment analysis"""
+    @timed('social_agent.analyze_reddit_sentiment')
+    def analyze_reddit_sentiment(self, posts):
+        """Analyze sentiment of Reddit posts using combined VADER and LLM analysis"""
+        if not posts:
+            return {"error": "No Reddit posts found"}
+        # LLM Analysis for contextual understanding
+        llm_analysis = self._llm_sentiment_analysis(posts)
+        return self._summarize(posts, llm_analysis)
+
+    @timed('social_agent.analyze_reddit_sentiment')
+    async def aanalyze_reddit_sentiment(self, posts):
+        """Async variant of analyze_reddit_sentiment; the gateway bounds the LLM call and its retries"""
+        if not posts:
+            return {"error": "No Reddit posts found"}
+        try:
+            llm_analysis = await self._allm_sentiment_analysis(posts)
+        except asyncio.TimeoutError:
+            print(f"LLM sentiment analysis timed out after {Config.LLM_DEADLINE}s")
+            llm_analysis = "LLM analysis unavailable"
+        except Exception as e:
+            print(f"LLM sentiment analysis failed: {e}")
+            llm_analysis = "LLM analysis unavailable"
+        # VADER scoring is CPU-bound (or waits on the process pool), so it stays off the event loop
+        return await asyncio.to_thread(self._summarize, posts, llm_analysis)
+
+    def _sentiment_prompt(self, posts):
         sample_posts = "\n".join([p['title'] for p in posts[:5]])
         prompt = f"""
         Analyze the sentiment of these cryptocurrency-related Reddit posts:
@@ -86,6 +117,14 @@ class SocialSentimentAnalyst:
         - Key Themes: [comma-separated list]
         - Anomalies: [notable observations]
         """
-        
-        response = self.llm.invoke(prompt)
-        return response.content
+        return prompt
+
+    @timed('social_agent.llm_sentiment', 'llm')
+    def _llm_sentiment_analysis(self, posts):
+        """Use LLM for nuanced sentiment analysis"""
+        return self.llm.invoke(self._sentiment_prompt(posts))
+
+    @timed('social_agent.llm_sentiment', 'llm')
+    async def _allm_sentiment_analysis(self, posts):
+        return await self.llm.ainvoke(self._sentiment_prompt(posts))
+
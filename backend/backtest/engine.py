@@ -0,0 +1,221 @@
+"""
+Vectorized replay of the MarketAnalyst / ActionRecommender trading rules.
+
+Each rule casts a daily vote from indicators computed once over the whole history:
+
+    rsi     +1 below `rsi_lower` (oversold), -1 above `rsi_upper` (overbought)
+    macd    +1 when MACD is above its signal line, else -1
+    ema     +1 when EMA(`ema_fast`) is above EMA(`ema_slow`), else -1
+    change  +1 after a rise of more than `change_threshold` over `change_window` days,
+            -1 after a fall of more than that
+
+The strategy is long when the votes sum to at least `min_votes` and flat otherwise,
+trading at the close on the day's signal and paying `fee` per unit of turnover. News and
+social sentiment have no history, so they take no part.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 365
+
+DEFAULT_CONFIG = {
+    'rsi_window': 14,
+    'rsi_lower': 30,
+    'rsi_upper': 70,
+    'ema_fast': 5,
+    'ema_slow': 10,
+    'macd': (12, 26, 9),
+    'change_window': 30,
+    'change_threshold': 0.10,
+    'min_votes': 1,
+}
+
+DEFAULT_GRID = {
+    'rsi_window': [7, 14, 21],
+    'rsi_lower': [20, 25, 30, 35],
+    'rsi_upper': [65, 70, 75, 80],
+    'ema_fast': [3, 5, 8],
+    'ema_slow': [10, 15, 20, 30],
+    'macd': [(8, 17, 9), (12, 26, 9)],
+    'change_window': [7, 14, 30],
+    'change_threshold': [0.05, 0.10, 0.20],
+    'min_votes': [1, 2],
+}
+
+
+def expand_grid(grid):
+    """Every combination of the grid's values as config dicts (unlisted keys keep their defaults)"""
+    grid = {**{key: [value] for key, value in DEFAULT_CONFIG.items()}, **grid}
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = dict(zip(keys, values))
+        config['macd'] = tuple(config['macd'])
+        if config['ema_fast'] < config['ema_slow'] and config['rsi_lower'] < config['rsi_upper']:
+            configs.append(config)
+    return configs
+
+
+def synthetic_series(n, seed=0):
+    """Geometric random walk of n daily closes with drifting regimes, oldest first"""
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.004, n // 60 + 1), 60)[:n]
+    return 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.03, n)))
+
+
+def _votes(condition_up, condition_down=None):
+    """+1 / -1 / 0 vote per day as int8"""
+    votes = condition_up.astype(np.int8)
+    if condition_down is not None:
+        votes -= condition_down.astype(np.int8)
+    return votes
+
+
+class IndicatorTables:
+    """
+    Daily int8 votes for one close series, computed once per distinct rule parameter set
+    (RSI window and bands, MACD spans, EMA pair, change window and threshold) and shared by
+    every config that uses it. Indicators use IndicatorEngine's formulas, so a day's vote
+    matches what analyze_trends would say given the history up to that day.
+    """
+
+    def __init__(self, closes, configs):
+        self.closes = np.asarray(closes, dtype=np.float64)
+        series = pd.Series(self.closes)
+        self.index = {}
+        self.votes = {}
+
+        emas = {}
+        for span in sorted({config[key] for config in configs for key in ('ema_fast', 'ema_slow')}):
+            emas[span] = series.ewm(span=span, adjust=False).mean().to_numpy()
+        self._table('ema', {(c['ema_fast'], c['ema_slow']) for c in configs},
+                    lambda fast, slow: _votes(emas[fast] > emas[slow], emas[fast] <= emas[slow]))
+
+        deltas = series.diff()
+        gains, losses = deltas.clip(lower=0), -deltas.clip(upper=0)
+        rsis = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for w in sorted({config['rsi_window'] for config in configs}):
+                rsis[w] = 100 - 100 / (1 + gains.rolling(w).mean().to_numpy() / losses.rolling(w).mean().to_numpy())
+        with np.errstate(invalid='ignore'):
+            self._table('rsi', {(c['rsi_window'], c['rsi_lower'], c['rsi_upper']) for c in configs},
+                        lambda w, lower, upper: _votes(rsis[w] < lower, rsis[w] > upper))
+
+        def macd_votes(fast, slow, signal):
+            macd = series.ewm(span=fast, adjust=False).mean() - series.ewm(span=slow, adjust=False).mean()
+            histogram = (macd - macd.ewm(span=signal, adjust=False).mean()).to_numpy()
+            return _votes(histogram > 0, histogram <= 0)
+        self._table('macd', {c['macd'] for c in configs}, macd_votes)
+
+        changes = {w: series.pct_change(w).to_numpy() for w in sorted({c['change_window'] for c in configs})}
+        with np.errstate(invalid='ignore'):
+            self._table('change', {(c['change_window'], c['change_threshold']) for c in configs},
+                        lambda w, threshold: _votes(changes[w] > threshold, changes[w] < -threshold))
+
+    def _table(self, rule, keys, compute):
+        keys = sorted(keys)
+        self.index[rule] = {key: i for i, key in enumerate(keys)}
+        self.votes[rule] = np.vstack([compute(*key) for key in keys])
+
+    def rows(self, rule, keys):
+        """Vote rows (len(keys) x days) for each config's parameters of `rule`"""
+        index = self.index[rule]
+        return self.votes[rule][[index[key] for key in keys]]
+
+
+def positions(tables, configs):
+    """(configs x days) boolean array: long after that day's close"""
+    days = len(tables.closes)
+    votes = tables.rows('rsi', [(c['rsi_window'], c['rsi_lower'], c['rsi_upper']) for c in configs])
+    votes += tables.rows('macd', [c['macd'] for c in configs])
+    votes += tables.rows('ema', [(c['ema_fast'], c['ema_slow']) for c in configs])
+    votes += tables.rows('change', [(c['change_window'], c['change_threshold']) for c in configs])
+    held = votes >= np.array([c['min_votes'] for c in configs], dtype=np.int8)[:, None]
+    # No position until every indicator has enough history
+    warmup = np.array([max(c['rsi_window'], c['ema_slow'], c['macd'][1], c['change_window']) for c in configs])
+    held &= np.arange(days)[None, :] >= warmup[:, None]
+    return held
+
+
+def performance(closes, held, fee=0.001):
+    """
+    Return and risk metrics per row of `held` (configs x days) over one close series.
+
+    Equity is tracked in log space (held days earn log(1 + market return), each unit of
+    turnover costs log(1 - fee)), and the return moments come from matrix-vector products,
+    so the only per-config passes are additions, comparisons and one cumulative sum.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    market = np.diff(closes) / closes[:-1]
+    periods = max(len(market), 1)
+    exposure = held[:, :-1]
+    turnover = np.diff(held, axis=1, prepend=False)[:, :-1]  # Position changes, charged on the next day
+
+    log_equity = exposure * np.log1p(market)
+    log_equity += turnover * np.log1p(-fee)
+    np.cumsum(log_equity, axis=1, out=log_equity)
+    # Drawdown from the running peak, counting the starting equity as the first peak
+    peak = np.maximum.accumulate(log_equity, axis=1)
+    peak -= log_equity
+    drawdown = np.maximum(peak.max(axis=1), -log_equity.min(axis=1)) if peak.shape[1] else np.zeros(len(held))
+
+    # Daily returns are held * market - fee * turnover; held and turnover are 0/1
+    trades = turnover.sum(axis=1)
+    exposure_f = exposure.astype(np.float64)
+    total = exposure_f @ market - fee * trades
+    entries = (turnover & exposure).astype(np.float64) @ market
+    squares = exposure_f @ market ** 2 - 2 * fee * entries + fee ** 2 * trades
+    mean = total / periods
+    volatility = np.sqrt(np.maximum(squares / periods - mean ** 2, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, mean / volatility * np.sqrt(PERIODS_PER_YEAR), 0.0)
+    growth = log_equity[:, -1] if log_equity.shape[1] else np.zeros(len(held))
+    return {
+        'total_return': np.expm1(growth),
+        'annual_return': np.expm1(growth * PERIODS_PER_YEAR / periods),
+        'volatility': volatility * np.sqrt(PERIODS_PER_YEAR),
+        'sharpe': sharpe,
+        'max_drawdown': -np.expm1(-drawdown),
+        'trades': trades.astype(np.float64),
+        'exposure': held.mean(axis=1),
+    }
+
+
+def evaluate(series, configs, fee=0.001, max_cells=4_000_000):
+    """
+    Backtest every config on every series ({name: closes}). Returns one result dict per
+    config: its parameters, metrics averaged over the series (worst drawdown) and each
+    series' total return. Configs are evaluated in blocks of at most `max_cells` values.
+    """
+    per_series = {}
+    for name, closes in series.items():
+        tables = IndicatorTables(closes, configs)
+        block = max(1, max_cells // max(len(tables.closes), 1))
+        chunks = [performance(tables.closes, positions(tables, configs[i:i + block]), fee)
+                  for i in range(0, len(configs), block)]
+        per_series[name] = {metric: np.concatenate([chunk[metric] for chunk in chunks]) for metric in chunks[0]}
+
+    names = list(per_series)
+    results = []
+    for i, config in enumerate(configs):
+        metrics = {metric: float(np.mean([per_series[name][metric][i] for name in names]))
+                   for metric in ('total_return', 'annual_return', 'volatility', 'sharpe', 'trades', 'exposure')}
+        metrics['max_drawdown'] = float(max(per_series[name]['max_drawdown'][i] for name in names))
+        metrics['by_series'] = {name: float(per_series[name]['total_return'][i]) for name in names}
+        results.append({'config': config, **metrics})
+    return results
+
+
+def buy_and_hold(series):
+    """Total return and max drawdown of simply holding each series"""
+    report = {}
+    for name, closes in series.items():
+        closes = np.asarray(closes, dtype=np.float64)
+        equity = closes / closes[0]
+        report[name] = {
+            'total_return': float(equity[-1] - 1),
+            'max_drawdown': float((1 - equity / np.maximum.accumulate(equity)).max()),
+        }
+    return report
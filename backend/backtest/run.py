@@ -0,0 +1,112 @@
+"""
+Parameter sweep of the trading rules over historical or synthetic prices.
+
+Run from the backend directory:
+
+    python -m backtest.run                                  # default grid over historical_data/
+    python -m backtest.run --symbols WBTC WETH --top 20
+    python -m backtest.run --synthetic 100000 --assets 10 --output sweep.json
+    python -m backtest.run --grid '{"rsi_window": [10, 14], "min_votes": [1, 2, 3]}'
+
+The grid's configs are split into chunks and evaluated across a process pool; each worker
+receives the price series once. Results are ranked by --rank (default: total return).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest.engine import DEFAULT_CONFIG, DEFAULT_GRID, buy_and_hold, evaluate, expand_grid, synthetic_series
+
+_series = None
+
+
+def _init_worker(series):
+    global _series
+    _series = series
+
+
+def _evaluate_chunk(args):
+    configs, fee = args
+    return evaluate(_series, configs, fee)
+
+
+def historical_series(symbols=None):
+    """Close series per symbol from the columnar price store, oldest first"""
+    from utils.price_store import HistoricalPriceStore
+    store = HistoricalPriceStore()
+    series = {symbol.upper(): store.get(symbol).close.copy() for symbol in symbols or store.symbols()}
+    # Symbols whose backfill has not produced candles yet have nothing to replay
+    return {symbol: closes for symbol, closes in series.items() if len(closes)}
+
+
+def sweep(series, configs, fee=0.001, workers=None, chunks_per_worker=4):
+    """Evaluate `configs` over `series` on a process pool (workers=0 runs in-process)"""
+    if workers == 0 or len(configs) < 2:
+        return evaluate(series, configs, fee)
+    workers = workers or os.cpu_count() or 1
+    size = max(1, -(-len(configs) // (workers * chunks_per_worker)))
+    chunks = [(configs[i:i + size], fee) for i in range(0, len(configs), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+        return [result for chunk in pool.map(_evaluate_chunk, chunks) for result in chunk]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', nargs='*', help="historical symbols to replay (default: all)")
+    parser.add_argument('--synthetic', type=int, help="replay synthetic series of this many days instead")
+    parser.add_argument('--assets', type=int, default=5, help="number of synthetic series (default 5)")
+    parser.add_argument('--grid', help="JSON object (or file) of parameter lists overriding the default grid")
+    parser.add_argument('--default-only', action='store_true', help="only backtest the rules as the agents use them")
+    parser.add_argument('--fee', type=float, default=0.001, help="cost per unit of turnover (default 0.001)")
+    parser.add_argument('--workers', type=int, help="processes (default: CPU count; 0 runs in-process)")
+    parser.add_argument('--rank', default='total_return',
+                        choices=['total_return', 'annual_return', 'sharpe', 'max_drawdown'])
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--output', help="write every result to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        series = {f"SYN{seed}": synthetic_series(args.synthetic, seed) for seed in range(args.assets)}
+    else:
+        series = historical_series(args.symbols)
+
+    if args.default_only:
+        configs = expand_grid({})
+    elif args.grid:
+        text = open(args.grid).read() if os.path.exists(args.grid) else args.grid
+        configs = expand_grid(json.loads(text))
+    else:
+        configs = expand_grid(DEFAULT_GRID)
+
+    started = time.perf_counter()
+    results = sweep(series, configs, args.fee, args.workers)
+    elapsed = time.perf_counter() - started
+    # Lower is better for drawdown, higher for the rest
+    sign = 1 if args.rank == 'max_drawdown' else -1
+    results.sort(key=lambda result: sign * result[args.rank])
+
+    days = sum(len(closes) for closes in series.values())
+    print(f"{len(configs)} configs x {len(series)} series ({days} days) in {elapsed:.2f}s")
+    for name, stats in buy_and_hold(series).items():
+        print(f"  buy & hold {name:10s} return {stats['total_return']:+8.1%}  drawdown {stats['max_drawdown']:6.1%}")
+    default = evaluate(series, [dict(DEFAULT_CONFIG)], args.fee)[0]
+    print(f"  agent rules            return {default['total_return']:+8.1%}  drawdown "
+          f"{default['max_drawdown']:6.1%}  sharpe {default['sharpe']:5.2f}")
+    for result in results[:args.top]:
+        params = ' '.join(f"{key}={value}" for key, value in result['config'].items())
+        print(f"  return {result['total_return']:+8.1%}  drawdown {result['max_drawdown']:6.1%}  "
+              f"sharpe {result['sharpe']:5.2f}  trades {result['trades']:6.1f}  {params}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'series': list(series), 'fee': args.fee, 'seconds': elapsed, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Deterministic offline inputs for the benchmark suite"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+WORDS = ("moon", "crash", "bullish", "bearish", "great", "terrible", "launch", "hack",
+         "partnership", "rug", "pump", "dump", "adoption", "scam", "upgrade", "delay")
+
+Candles = namedtuple('Candles', ['timestamp', 'close'])
+
+# Real pages saved by `python -m benchmarks.run --record-ecosystem`
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recorded')
+ECOSYSTEM_RECORDING = os.path.join(RECORDED_DIR, 'ecosystem.html')
+
+
+def candles(n, seed=0):
+    """Geometric random walk of n daily closes, oldest first"""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    timestamps = 1_600_000_000 + 86400 * np.arange(n, dtype=np.int64)
+    return Candles(timestamps, closes)
+
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS, length))
+
+
+def reddit_posts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        'title': _sentence(rng, 8),
+        'content': _sentence(rng, 40),
+        'upvotes': int(rng.integers(0, 5000)),
+        'comments': int(rng.integers(0, 500)),
+        'created': 1_700_000_000 + i,
+    } for i in range(n)]
+
+
+def news_articles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        'source': f"source-{i % 7}",
+        'published_at': "2025-02-14T00:00:00Z",
+        'title': _sentence(rng, 10),
+        'description': _sentence(rng, 30),
+        'url': f"https://example.com/{i}",
+    } for i in range(n)]
+
+
+def ecosystem_html(n, seed=0):
+    """An ecosystem page with the same markup fetch_projects scrapes"""
+    rng = np.random.default_rng(seed)
+    categories = ["DeFi", "NFT", "Gaming", "Infra", "Wallet", "DEX", "Bridge", "Social"]
+    items = []
+    for i in range(n):
+        cats = "".join(f'<li class="tag tag__cat">{c}</li>' for c in rng.choice(categories, 2, replace=False))
+        items.append(
+            f'<div class="grid__item"><picture><a href="https://project{i}.xyz"><img src="p{i}.png"></a></picture>'
+            f'<div class="content"><a href="https://project{i}.xyz"><h3>Project {i}</h3>'
+            f'<p>{_sentence(rng, 12)}</p></a></div>'
+            f'<ul class="tags">{cats}<li class="tag tag__lang">Move</li></ul></div>'
+        )
+    return f'<html><body><div id="projects_results">{"".join(items)}</div></body></html>'
+
+
+def recorded_ecosystem_html():
+    """The live ecosystem page as last recorded, so the scraper is also timed on real markup"""
+    if not os.path.exists(ECOSYSTEM_RECORDING):
+        raise FileNotFoundError(f"no recorded page at {ECOSYSTEM_RECORDING}; record one with --record-ecosystem")
+    with open(ECOSYSTEM_RECORDING, encoding='utf-8') as f:
+        return f.read()
+
+
+def analyses(symbols=("MOVE", "WBTC", "WETH", "USDT", "USDC"), apps=30):
+    """all_analyses input for ActionRecommender.get_recommendations"""
+    applications = {"DeFi": [{"name": f"App {i}"} for i in range(apps)]}
+    return [{
+        'symbol': symbol,
+        'market': {'price_change': "-4.20%", 'rsi': 45.0, 'recent_trend': "up",
+                   'trend_strength': ['Bullish MACD crossover']},
+        'sentiment': {'sentiment': "bullish", 'confidence': 42.0},
+        'social_sentiment': {'llm_analysis': "- Overall Sentiment: neutral", 'weighted_score': 0.1, 'post_count': 50},
+        'applications': applications,
+    } for symbol in symbols]
@@ -0,0 +1,222 @@
+"""
+Offline micro-benchmarks for the analysis hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.2
+
+Every case runs on synthetic fixtures with stubbed network clients, except
+fetch_projects[recorded], which parses a real ecosystem page saved with
+
+    python -m benchmarks.run --record-ecosystem
+
+(the case is skipped until one is recorded). Results are written as JSON; with --baseline, any case whose median time grows by more than
+--threshold (a fraction) is reported and the run exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config requires these at import; no case talks to the services they are for
+for _name in ('COINMARKETCAP_API_KEY', 'OPENAI_API_KEY', 'NEWS_API_KEY', 'REDDIT_CLIENT_ID',
+              'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'):
+    os.environ.setdefault(_name, 'benchmark')
+
+from benchmarks import fixtures
+
+CANDLE_SIZES = (30, 1_000, 100_000, 1_000_000)
+TEXT_SIZES = (5, 500, 50_000)
+HTML_SIZES = (10, 100, 1_000)
+QUICK_LIMIT = 1_000
+
+
+RECOMMENDATION = "MOVE: Buy - Strong momentum\nWBTC: Hold - Range bound\nUSDC: Hold - Stable reserve"
+
+
+def stub_llm():
+    """Gateway over the deterministic stub backend with caching disabled, so every call does the work"""
+    from utils.llm_gateway import LLMGateway, StubBackend
+    return LLMGateway(StubBackend(default=RECOMMENDATION), cache_size=0, requests_per_minute=1e9)
+
+
+def market_analyst_case(n):
+    from agents.market_analyst import MarketAnalyst
+    analyst = MarketAnalyst()
+    series = fixtures.candles(n)
+    return lambda: analyst.analyze_trends(series)
+
+
+def indicator_batch_case(n):
+    from utils.indicators import IndicatorEngine
+    engine = IndicatorEngine()
+    batch = [fixtures.candles(n, seed).close for seed in range(100)]
+    return lambda: engine.compute_batch(batch)
+
+
+def news_analyst_case(n, cached=False):
+    from agents.news_analyst import NewsAnalyst
+    from utils.sentiment_scorer import SentimentScorer
+    analyst = NewsAnalyst()
+    analyst.scorer = SentimentScorer('textblob', cache_size=100_000 if cached else 0, pool_workers=0)
+    articles = fixtures.news_articles(n)
+    return lambda: analyst.analyze_sentiment(articles)
+
+
+def social_analyst_case(n, cached=False):
+    from agents.social_agent import SocialSentimentAnalyst
+    from utils.sentiment_scorer import SentimentScorer
+    analyst = SocialSentimentAnalyst.__new__(SocialSentimentAnalyst)  # skip the PRAW client
+    analyst.scorer = SentimentScorer('vader', cache_size=100_000 if cached else 0, pool_workers=0)
+    analyst.llm = stub_llm()
+    posts = fixtures.reddit_posts(n)
+    return lambda: analyst.analyze_reddit_sentiment(posts)
+
+
+def recommender_case(n):
+    from agents.action_recommender import ActionRecommender
+    recommender = ActionRecommender()
+    recommender.llm = stub_llm()
+    analyses = fixtures.analyses(apps=n)
+    return lambda: recommender.get_recommendations("Double my portfolio in a year", analyses)
+
+
+def allocation_case(n):
+    from utils.allocation import AllocationEngine, goal_allocation_params
+
+    class Store:
+        series = {f"S{seed}": fixtures.candles(1_000, seed) for seed in range(20)}
+
+        def get(self, symbol):
+            return self.series[symbol]
+
+    engine = AllocationEngine(Store())
+    symbols = list(Store.series)
+    goals = ("Double my portfolio, 2x", "A balanced portfolio", "Stay conservative", "Aggressive growth", "Grow 30%")
+    requests = [goal_allocation_params(goals[i % len(goals)]) for i in range(n)]
+    engine.model(symbols)  # Estimated once per data version, like the served engine
+    return lambda: engine.allocate_many(symbols, requests)
+
+
+def fetch_projects_case(n, recorded=False):
+    from agents.data_collector import DataCollector
+    collector = DataCollector.__new__(DataCollector)  # skip the network clients
+    html = fixtures.recorded_ecosystem_html() if recorded else fixtures.ecosystem_html(n)
+    collector.fetch_html = lambda url: html
+    return lambda: collector.fetch_projects()
+
+
+def record_ecosystem():
+    """Save the live ecosystem page as the fetch_projects[recorded] fixture; returns an exit status"""
+    from agents.data_collector import DataCollector, ECOSYSTEM_URL
+    from utils.ecosystem import parse_projects
+    html = DataCollector.__new__(DataCollector).fetch_html(ECOSYSTEM_URL)
+    projects = parse_projects(html) if html else None
+    if not projects:
+        print(f"Not recorded: no projects found at {ECOSYSTEM_URL}")
+        return 1
+    os.makedirs(fixtures.RECORDED_DIR, exist_ok=True)
+    with open(fixtures.ECOSYSTEM_RECORDING, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"Recorded {len(projects)} projects to {fixtures.ECOSYSTEM_RECORDING}")
+    return 0
+
+
+CASES = {
+    'market_analyst.analyze_trends': (market_analyst_case, CANDLE_SIZES),
+    'indicator_engine.compute_batch[100 symbols]': (indicator_batch_case, CANDLE_SIZES[:3]),
+    'news_analyst.analyze_sentiment': (news_analyst_case, TEXT_SIZES),
+    'news_analyst.analyze_sentiment[cached]': (lambda n: news_analyst_case(n, cached=True), TEXT_SIZES),
+    'social_agent.analyze_reddit_sentiment': (social_analyst_case, TEXT_SIZES),
+    'social_agent.analyze_reddit_sentiment[cached]': (lambda n: social_analyst_case(n, cached=True), TEXT_SIZES),
+    'action_recommender.get_recommendations': (recommender_case, (30, 300, 3_000)),
+    'data_collector.fetch_projects': (fetch_projects_case, HTML_SIZES),
+    'data_collector.fetch_projects[recorded]': (lambda n: fetch_projects_case(n, recorded=True), (1,)),
+    'allocation_engine.allocate_many[20 assets]': (allocation_case, (1, 100, 10_000)),
+}
+
+
+def measure(fn, repeat, budget):
+    """Median and min wall time in seconds over up to `repeat` runs within `budget` seconds"""
+    fn()  # warm-up
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeat and (not timings or time.perf_counter() - started < budget):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return {'median': statistics.median(timings), 'min': min(timings), 'runs': len(timings)}
+
+
+def run(selected, quick, repeat, budget):
+    results = {}
+    for name, (factory, sizes) in CASES.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        for size in sizes:
+            if quick and size > QUICK_LIMIT:
+                continue
+            key = f"{name}/{size}"
+            try:
+                results[key] = measure(factory(size), repeat, budget)
+                print(f"{key:60s} {results[key]['median'] * 1e3:12.3f} ms")
+            except (ImportError, FileNotFoundError) as e:
+                print(f"{key:60s} skipped ({e})")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the cases whose median slowed down by more than `threshold`"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous and current['median'] > previous['median'] * (1 + threshold):
+            regressions.append((key, previous['median'], current['median']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cases', nargs='*', help="only run cases whose name contains one of these")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare against a previous results file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown fraction (default 0.2)")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=5.0, help="max seconds per case after the first run")
+    parser.add_argument('--quick', action='store_true', help=f"skip sizes above {QUICK_LIMIT}")
+    parser.add_argument('--record-ecosystem', action='store_true',
+                        help="save the live ecosystem page for fetch_projects[recorded] and exit")
+    args = parser.parse_args(argv)
+
+    if args.record_ecosystem:
+        return record_ecosystem()
+
+    results = run(args.cases, args.quick, args.repeat, args.budget)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'timestamp': time.time(),
+                'results': results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({after / before - 1:+.0%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,15 +14,147 @@ class Config:
     CRYPTO_NEWS_URL = f"{CMC_BASE_URL}/content/posts/latest"
 
     PRICE_API_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+    # quotes/latest accepts a comma-separated symbol list; larger universes are chunked
+    CMC_MAX_SYMBOLS_PER_REQUEST = 100
     HISTORICAL_API_URL = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/historical"
+    # Per-symbol OHLCV CSVs; HistoricalPriceStore keeps its column files under .store/
+    HISTORICAL_PRICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historical_data")
     # RAG Configuration
-    VECTOR_STORE_PATH = r"\backend\rag\vector_store"
-    HISTORICAL_DATA_PATH = r"\backend\rag\historical_data.csv"
+    VECTOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rag", "vector_store")
+    HISTORICAL_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rag", "historical_data.csv")
+    # Embeddings: backend ("openai", or the offline "local" / "sentence-transformers"), texts per
+    # request and concurrent requests while (re)building the index
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+    EMBEDDING_MODEL = "text-embedding-ada-002"
+    EMBEDDING_BATCH_SIZE = 256
+    EMBEDDING_CONCURRENCY = 4
 
     #News API KEY
     NEWS_API_KEY= os.environ["NEWS_API_KEY"]
     # Cache Settings
     CACHE_TTL = 300  # 5 minutes
+    # Background precompute: per-symbol refresh cadence (seconds), +/- jitter fraction,
+    # and how old a snapshot may be before requests collect the symbol themselves
+    PRECOMPUTE_ENABLED = os.getenv("PRECOMPUTE_ENABLED", "1") != "0"
+    PRECOMPUTE_INTERVAL = 60
+    PRECOMPUTE_JITTER = 0.2
+    SNAPSHOT_MAX_AGE = 15 * 60
+    # Request coalescing: how often a worker polls for a result another worker is computing,
+    # how long a shared recommendation is kept, and how long its lease may be held (seconds)
+    COALESCE_POLL_INTERVAL = 0.1
+    RECOMMENDATION_CACHE_TTL = 10 * 60
+    RECOMMENDATION_LEASE_TTL = 60
+    # Portfolio allocation: daily returns used per asset, fewest daily returns a symbol needs
+    # to be weighted, fewest shared days for estimating correlations, how far expected returns are pulled to their average, frontier points,
+    # cached symbol sets, risk aversion per goal profile, the ecosystem apps' share and the
+    # smallest share of the crypto sleeve a Buy recommendation gets
+    ALLOCATION_LOOKBACK = 365
+    ALLOCATION_MIN_RETURNS = 20
+    ALLOCATION_MIN_OVERLAP = 20
+    ALLOCATION_RETURN_SHRINKAGE = 0.5
+    ALLOCATION_FRONTIER_POINTS = 64
+    ALLOCATION_MODEL_CACHE_SIZE = 256
+    ALLOCATION_RISK_AVERSION = {'conservative': 10.0, 'moderate': 3.0, 'aggressive': 1.0}
+    ALLOCATION_ECOSYSTEM_SHARE = 0.3
+    ALLOCATION_MIN_BUY_WEIGHT = 0.1
+    # Token universe: symbols analysed for goals, the registry database, the listings endpoint
+    # that ranks the wider universe, how many listed tokens are kept, how often listings are
+    # refreshed (seconds) and how many symbols' histories are backfilled per refresh
+    TRACKED_SYMBOLS = ['MOVE', 'WBTC', 'WETH', 'USDT', 'USDC']
+    SYMBOL_DB = "symbols.db"
+    LISTINGS_API_URL = f"{CMC_BASE_URL}/cryptocurrency/listings/latest"
+    UNIVERSE_SIZE = 500
+    UNIVERSE_REFRESH_INTERVAL = 6 * 3600
+    UNIVERSE_BACKFILL_PER_RUN = 25
+    # Persistent cache: entries kept (quote, snapshot, news, sentiment, leases... for each
+    # symbol of the universe) and how often read access times are written back (seconds)
+    CACHE_MAX_ENTRIES = 16 * UNIVERSE_SIZE
+    CACHE_ACCESS_FLUSH_INTERVAL = 5
+    # Screener: daily closes per symbol fed to the indicators, symbols per batched pass, and
+    # the momentum and volatility windows (days)
+    SCREEN_LOOKBACK = 120
+    SCREEN_CHUNK_SIZE = 128
+    SCREEN_MOMENTUM_WINDOW = 30
+    SCREEN_VOLATILITY_WINDOW = 30
+    # OHLCV rollups kept per symbol (from '1h', '4h', '1d', '1w'); timeframes no coarser than a
+    # symbol's candles are skipped, and unlisted ones are aggregated on read
+    ROLLUP_TIMEFRAMES = ['4h', '1d', '1w']
+    # Per-upstream exponential backoff after failures (seconds)
+    BACKOFF_BASE = 5
+    BACKOFF_MAX = 10 * 60
+    # LLM gateway: backend ("groq" or the offline "stub"), response cache, provider limits, and
+    # the timeout per attempt and for a whole call with its retries (within SOURCE_TIMEOUTS['llm'])
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+    LLM_MODEL = "llama-3.1-8b-instant"
+    LLM_TEMPERATURE = 0.5
+    LLM_CACHE_SIZE = 1024
+    LLM_CACHE_TTL = 15 * 60
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 30))
+    LLM_ATTEMPT_TIMEOUT = 10
+    LLM_DEADLINE = 25
+    # Message bus: per-subscriber queue size, what to do when it is full ("drop_oldest" or
+    # "block" the publisher), and how many past messages per channel new subscribers replay
+    BUS_QUEUE_SIZE = 100
+    BUS_OVERFLOW = "drop_oldest"
+    BUS_REPLAY = 10
+    # Sentiment scoring: scores cached per text hash; batches of at least POOL_THRESHOLD
+    # uncached texts are scored in a process pool (0 workers disables the pool)
+    SENTIMENT_CACHE_SIZE = 20000
+    SENTIMENT_POOL_THRESHOLD = 200
+    SENTIMENT_POOL_WORKERS = int(os.getenv("SENTIMENT_POOL_WORKERS", 2))
+    # News: local article store, articles requested per NewsAPI call, how many pages a fetch
+    # reads to reach the newest stored article, and how many stored articles per symbol are
+    # handed to the analysts
+    NEWS_DB = "news_articles.db"
+    NEWS_PAGE_SIZE = 100
+    NEWS_MAX_PAGES = 5
+    NEWS_ARTICLE_LIMIT = 100
+    # Reddit ingestion: local post store, how often each query is searched for new posts,
+    # how often stored posts' vote/comment counts are re-read, the first-run backfill size, and
+    # how old a query's newest post may get before a request searches again itself
+    REDDIT_DB = "reddit_posts.db"
+    REDDIT_INGEST_ENABLED = os.getenv("REDDIT_INGEST_ENABLED", "1") != "0"
+    REDDIT_INGEST_INTERVAL = 5 * 60
+    REDDIT_VOTE_INTERVAL = 30 * 60
+    REDDIT_BACKFILL_LIMIT = 200
+    REDDIT_STALE_AFTER = 30 * 60
+    # Execution: browser driver ("chrome" or the browserless "fake"), warm sessions, jobs per
+    # session before it is replaced, per-job timeout (seconds) and the page actions open
+    EXECUTION_DRIVER = os.getenv("EXECUTION_DRIVER", "chrome")
+    EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", 2))
+    EXECUTION_MAX_JOBS_PER_SESSION = 50
+    EXECUTION_TIMEOUT = 60
+    EXECUTION_URL = "https://www.binance.com/en"
+    # Latency histograms, /metrics and the Server-Timing header
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+    # Read-through cache TTLs per source, and how long past its TTL a value may still be
+    # served (stale) while a background refresh runs
+    SOURCE_CACHE_TTLS = {
+        'quote': 30,
+        'news': 15 * 60,
+        'reddit': 15 * 60,
+        'social_sentiment': 15 * 60,
+        'ecosystem': 6 * 3600,  # revalidated with a conditional GET, so this can be short
+    }
+    SOURCE_STALE_TTLS = {
+        'quote': 10 * 60,
+        'news': 6 * 3600,
+        'reddit': 6 * 3600,
+        'social_sentiment': 6 * 3600,
+        'ecosystem': 30 * 86400,
+    }
+    # Collection pipeline: max in-flight upstream calls and per-source timeouts (seconds)
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", 10))
+    SOURCE_TIMEOUTS = {
+        'quote': 10,
+        'history': 10,
+        'listings': 20,
+        'news': 10,
+        'reddit': 20,
+        'ecosystem': 20,
+        'llm': 30,
+    }
     #Reddit APIs
     REDDIT_CLIENT_ID=os.environ["REDDIT_CLIENT_ID"]
     REDDIT_CLIENT_SECRET=os.environ["REDDIT_CLIENT_SECRET"]
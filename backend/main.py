@@ -1,12 +1,20 @@
 import os
-from fastapi import FastAPI
+import asyncio
+import hashlib
+import json
+import time
+from utils import startup
+from fastapi import FastAPI, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from agents.data_collector import DataCollector
-from agents.news_analyst import NewsAnalyst
-from agents.action_recommender import ActionRecommender
 from utils.message_bus import MessageBus
-from agents.market_analyst import MarketAnalyst
+from utils.http_client import close_async_client
+from utils.scheduler import PrecomputeScheduler, load_snapshots
+from utils.reddit_store import reddit_query
+from utils.sentiment_scorer import shutdown_pool, start_pool
+from utils import metrics
+from config import Config
 import uvicorn
 
 app = FastAPI(
@@ -24,31 +32,137 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global dependency placeholders (initialized in startup_event)
+async def _finish_after(body, finish):
+    """ Passes a response body through, calling finish() once it has been sent or abandoned. """
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        finish()
+
+@app.middleware("http")
+async def track_latency(request: Request, call_next):
+    """
+    Records request metrics and attaches a per-stage Server-Timing breakdown. An event stream
+    does its work while its body is sent, after the headers, so it gets no Server-Timing and
+    stays in flight until the stream ends.
+    """
+    if not Config.METRICS_ENABLED:
+        return await call_next(request)
+
+    token = metrics.start_request()
+    metrics.IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+
+    def finish():
+        metrics.IN_FLIGHT.dec()
+        route = request.scope.get('route')
+        metrics.REQUEST_LATENCY.labels(
+            request.method, getattr(route, 'path', 'unmatched'), status
+        ).observe(time.perf_counter() - start)
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    except BaseException:
+        finish()
+        metrics.end_request(token)
+        raise
+    server_timing = metrics.end_request(token)
+    if response.headers.get('content-type', '').startswith('text/event-stream'):
+        response.body_iterator = _finish_after(response.body_iterator, finish)
+        return response
+    finish()
+    if server_timing:
+        response.headers['Server-Timing'] = server_timing
+    return response
+
+# Global dependency placeholders (built in the background by _warm_up)
 bus = None
 collector = None
 news_analyst = None
 recommender = None
 market_analyst = None
+scheduler = None
+execution_pool = None
+screener = None
+warm_up_task = None
 
-@app.on_event("startup")
-async def startup_event():
-    """ Initializes dependencies when the server starts. """
-    global bus, collector, news_analyst, recommender, market_analyst
-    print("🚀 Server is starting...")
+# Symbols analysed for goals; replaced by the symbol registry's tracked list once it is loaded
+SYMBOLS = list(Config.TRACKED_SYMBOLS)
+
+def _build_agents():
+    """ Imports and constructs the agents; the heavy imports (pandas, PRAW, lxml...) happen here, not at import of main. """
+    with startup.phase('import agents'):
+        from agents.data_collector import DataCollector
+        from agents.news_analyst import NewsAnalyst
+        from agents.action_recommender import ActionRecommender
+        from agents.market_analyst import MarketAnalyst
+        from utils.screener import Screener
+    with startup.phase('build DataCollector'):
+        built_collector = DataCollector()
+    with startup.phase('build NewsAnalyst'):
+        built_news_analyst = NewsAnalyst()
+    with startup.phase('build ActionRecommender'):
+        built_recommender = ActionRecommender(built_collector.price_store)
+    with startup.phase('build MarketAnalyst'):
+        built_market_analyst = MarketAnalyst(built_collector.rollups)
+    built_screener = Screener(built_collector.price_store)
+    return built_collector, built_news_analyst, built_recommender, built_market_analyst, built_screener
 
+async def _warm_up():
+    """ Builds the agents off the event loop once the server is accepting connections, then starts background work. """
+    global collector, news_analyst, recommender, market_analyst, scheduler, screener, SYMBOLS
     try:
-        # Initialize dependencies inside startup to prevent execution during import
-        bus = MessageBus()
-        collector = DataCollector()
-        news_analyst = NewsAnalyst()
-        recommender = ActionRecommender()
-        market_analyst = MarketAnalyst()
-        
-        print("✅ Dependencies initialized successfully")
+        collector, news_analyst, recommender, market_analyst, screener = await asyncio.to_thread(_build_agents)
+        SYMBOLS = await asyncio.to_thread(collector.registry.tracked)
+        # Sentiment pool workers start now, not on the first large batch mid-request
+        await asyncio.to_thread(start_pool)
+
+        if Config.REDDIT_INGEST_ENABLED:
+            # Reddit posts are pulled into the local store in the background, not per request
+            collector.social_analyst.ingestor.start([reddit_query(symbol) for symbol in SYMBOLS])
+
+        if Config.PRECOMPUTE_ENABLED:
+            # Keep goal-independent analysis fresh so requests only run the recommender
+            scheduler = PrecomputeScheduler(collector, market_analyst, news_analyst, bus, SYMBOLS)
+            scheduler.start()
+
+        startup.mark_ready()
+        print(f"✅ Dependencies initialized successfully in {startup.report()['seconds_to_ready']:.2f}s")
     except Exception as e:
         print(f"❌ ERROR during startup: {e}")
 
+async def _agents_ready():
+    """ Waits for the background warm-up; requests arriving during a cold start queue here. """
+    if warm_up_task:
+        await asyncio.shield(warm_up_task)
+
+@app.on_event("startup")
+async def startup_event():
+    """ Creates the message bus and starts building the agents in the background so the port opens immediately. """
+    global bus, warm_up_task
+    print("🚀 Server is starting...")
+    bus = MessageBus()
+    warm_up_task = asyncio.create_task(_warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """ Stops background refreshes, bus subscribers and the sentiment pool, and releases the shared HTTP client connections. """
+    if warm_up_task:
+        await warm_up_task
+    if scheduler:
+        await scheduler.stop()
+    if collector:
+        await collector.social_analyst.ingestor.stop()
+    if execution_pool:
+        await execution_pool.stop()
+    if bus:
+        await bus.close()
+    await asyncio.to_thread(shutdown_pool)
+    await close_async_client()
+
 @app.get("/")
 async def root():
     return {"message": "Movement Agent API is running"}
@@ -61,34 +175,30 @@ async def handle_goal(request: GoalRequest):
     """ Handles goal submission, fetches market data, and analyzes sentiment. """
     global collector, news_analyst, market_analyst, recommender
 
+    await _agents_ready()
     if not collector or not news_analyst or not market_analyst or not recommender:
         return {"error": "Server not initialized properly"}
 
     all_analyses = []
-    symbols = ['MOVE', 'WBTC', 'WETH', 'USDT', 'USDC']
+    symbols = SYMBOLS
     
     try:
-        application_data = collector.fetch_application_data()
+        # Precomputed snapshots cover most symbols; only the rest are collected live,
+        # concurrently across symbols and sources, and once for all concurrent requests
+        snapshots = await asyncio.to_thread(load_snapshots, collector.cache, symbols)
+        missing = [symbol for symbol in symbols if symbol not in snapshots]
+        application_data, live = await asyncio.gather(
+            asyncio.to_thread(collector.fetch_application_data),
+            _live_snapshots(missing)
+        )
+        snapshots.update(live)
 
         for symbol in symbols:
-            crypto_data = collector.get_crypto_data(symbol)
-            if not crypto_data:
-                continue  # Skip if no data available
-
-            market_analysis = market_analyst.analyze_trends(crypto_data['historical_prices'])
-            sentiment_analysis = news_analyst.analyze_sentiment(crypto_data['news'])
-            social_sentiment = crypto_data.get('social_sentiment', {})
-
-            all_analyses.append({
-                'symbol': symbol,
-                'market': market_analysis,
-                'sentiment': sentiment_analysis,
-                'social_sentiment': social_sentiment,
-                'applications': application_data
-            })
-
-        recommendations = recommender.get_recommendations(request, all_analyses)
-        bus.publish('recommendations', {
+            if symbol in snapshots:
+                all_analyses.append(_analysis_entry(snapshots[symbol], application_data))
+
+        recommendations = await _shared_recommendations(request, all_analyses)
+        await bus.publish('recommendations', {
             "goal": request.user_goal,
             "actions": recommendations,
             "analysis": all_analyses
@@ -100,16 +210,286 @@ async def handle_goal(request: GoalRequest):
         print(f"❌ Error in /submit_goal: {e}")
         return {"error": str(e)}
 
+def _live_snapshots(symbols):
+    """ Snapshots of symbols collected live, collected once for all concurrent requests for the same symbols. """
+    return collector.flight.do(f"live:{','.join(symbols)}", lambda: _collect_live(symbols), 'live')
+
+async def _collect_live(symbols):
+    """ Collects and analyses symbols that have no fresh snapshot; returns symbol -> snapshot. """
+    if not symbols:
+        return {}
+    crypto_results = await collector.aget_crypto_data_many(symbols)
+    collected = [(symbol, data) for symbol, data in zip(symbols, crypto_results) if data]  # Skip if no data available
+    return await asyncio.to_thread(_analyse_live, collected)
+
+def _analyse_live(collected):
+    """ Market and news analysis of freshly collected (symbol, crypto data) pairs; CPU-bound, so run in a thread. """
+    # Indicators for all live symbols in one vectorized pass
+    market_analyses = market_analyst.analyze_trends_batch([data['historical_prices'] for _, data in collected])
+    return {
+        symbol: {
+            'symbol': symbol,
+            'market': market_analysis,
+            'sentiment': news_analyst.analyze_sentiment(crypto_data['news']),
+            'social_sentiment': crypto_data.get('social_sentiment', {}),
+            'updated_at': time.time()
+        }
+        for (symbol, crypto_data), market_analysis in zip(collected, market_analyses)
+    }
+
+def _recommendation_key(request, all_analyses):
+    """ Identifies a recommender input: the normalised goal plus the content of every analysis and the ecosystem catalog's version. """
+    goal = ' '.join(request.user_goal.lower().split())
+    # Content rather than `updated_at`, which live collection sets to the time of each request
+    analyses = [
+        {field: value for field, value in entry.items() if field not in ('applications', 'updated_at')}
+        for entry in all_analyses
+    ]
+    raw = json.dumps([goal, analyses, collector.ecosystem.fingerprint], sort_keys=True, default=str)
+    return f"recommendation:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+async def _shared_recommendations(request, all_analyses, tokens=None):
+    """
+    Runs the recommender once per distinct input, sharing the result with concurrent and later requests in every worker.
+    If this call runs the recommender and `tokens` (an asyncio.Queue) is given, the LLM's tokens are put on it as they arrive.
+    """
+    key = _recommendation_key(request, all_analyses)
+
+    async def recommend():
+        if tokens is None:
+            recommendations = await asyncio.to_thread(recommender.get_recommendations, request, all_analyses)
+        else:
+            async for kind, payload in recommender.astream_recommendations(request, all_analyses):
+                if kind == 'token':
+                    tokens.put_nowait(payload)
+                else:
+                    recommendations = payload
+        await asyncio.to_thread(collector.cache.set, key, recommendations, Config.RECOMMENDATION_CACHE_TTL)
+        return recommendations
+
+    return await collector.flight.do(
+        key, recommend, 'recommendation', lambda: collector.cache.get(key), Config.RECOMMENDATION_LEASE_TTL
+    )
+
+def _analysis_entry(snapshot, application_data):
+    """ One symbol's entry in `analysis`, with the time its data was analysed. """
+    return {
+        'symbol': snapshot['symbol'],
+        'market': snapshot['market'],
+        'sentiment': snapshot['sentiment'],
+        'social_sentiment': snapshot['social_sentiment'],
+        'applications': application_data,
+        'updated_at': snapshot['updated_at']
+    }
+
+def _sse(event, data):
+    """ Formats one Server-Sent Events message. """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _goal_events(request: GoalRequest):
+    """ Yields each symbol's analysis as soon as it is ready, then the recommender's tokens and result. """
+    try:
+        application_task = asyncio.ensure_future(asyncio.to_thread(collector.fetch_application_data))
+
+        # Precomputed symbols are sent at once; the rest once collected, shared with concurrent requests
+        collected = await asyncio.to_thread(load_snapshots, collector.cache, SYMBOLS)
+        for snapshot in collected.values():
+            yield _sse('symbol', snapshot)
+
+        live = await _live_snapshots([symbol for symbol in SYMBOLS if symbol not in collected])
+        for symbol in SYMBOLS:
+            if symbol in live:
+                collected[symbol] = live[symbol]
+                yield _sse('symbol', live[symbol])
+
+        application_data = await application_task
+        all_analyses = [
+            _analysis_entry(collected[symbol], application_data)
+            for symbol in SYMBOLS if symbol in collected
+        ]
+
+        # Tokens are only streamed if this request runs the recommender; a shared or cached result is sent as is
+        tokens = asyncio.Queue()
+        shared = asyncio.ensure_future(_shared_recommendations(request, all_analyses, tokens))
+        while not shared.done() or not tokens.empty():
+            token = asyncio.ensure_future(tokens.get())
+            await asyncio.wait({shared, token}, return_when=asyncio.FIRST_COMPLETED)
+            if token.done():
+                yield _sse('token', token.result())
+            else:
+                token.cancel()
+        recommendations = shared.result()
+
+        await bus.publish('recommendations', {
+            "goal": request.user_goal,
+            "actions": recommendations,
+            "analysis": all_analyses
+        })
+        yield _sse('recommendations', {"goal": request.user_goal, "recommendations": recommendations})
+
+    except Exception as e:
+        print(f"❌ Error in /submit_goal/stream: {e}")
+        yield _sse('error', {"error": str(e)})
+
+@app.post("/submit_goal/stream")
+async def stream_goal(request: GoalRequest):
+    """
+    Streaming variant of /submit_goal (Server-Sent Events): a `symbol` event per analysed
+    symbol as it completes, `token` events while the recommender LLM writes, then a final
+    `recommendations` event.
+    """
+    await _agents_ready()
+    if not collector or not news_analyst or not market_analyst or not recommender:
+        return {"error": "Server not initialized properly"}
+
+    return StreamingResponse(
+        _goal_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/confirm_action")
-async def execute_action(action: str):
-    """ Executes an action via ExecutionAgent. """
-    from agents.execution_agent import ExecutionAgent
+async def execute_action(action: str, wait: bool = False):
+    """
+    Queues an action on the warm ExecutionAgent pool and returns its job (poll /actions/{id}).
+    With wait=true, responds once the job has finished.
+    """
+    global execution_pool
     try:
-        executor = ExecutionAgent()
-        return executor.execute_action(action)
+        if execution_pool is None:
+            from agents.execution_agent import ExecutionPool
+            execution_pool = ExecutionPool()
+            execution_pool.start()
+        job = execution_pool.submit(action)
+        if wait:
+            job = await execution_pool.wait(job['id'], Config.EXECUTION_TIMEOUT * 2)
+        return job
+    except asyncio.TimeoutError:
+        return {"error": f"Action still {job['status']} after {Config.EXECUTION_TIMEOUT * 2}s; "
+                         f"poll /actions/{job['id']}", "job": job}
     except Exception as e:
         return {"error": f"Failed to execute action: {e}"}
 
+@app.get("/actions/{job_id}")
+async def action_status(job_id: str):
+    """ Status (queued/running/succeeded/failed) and result of a submitted action. """
+    job = execution_pool.get(job_id) if execution_pool else None
+    if not job:
+        return {"error": "Unknown job"}
+    return job
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """ Read-through cache hit/miss/stale counts per source, and how many calls were coalesced. """
+    await _agents_ready()
+    if not collector:
+        return {"error": "Server not initialized properly"}
+    return {**collector.cache_stats, 'coalesced': collector.flight.stats}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """ Prometheus text exposition of latency, error, cache and in-flight metrics. """
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.websocket("/ws/{channel}")
+async def websocket_channel(websocket: WebSocket, channel: str, replay: int = 1):
+    """
+    Pushes bus messages as JSON `{"channel", "message"}` frames. `channel` may be a
+    wildcard pattern (e.g. `snapshots.*`, `prices.*`, `recommendations`); the last
+    `replay` messages of each matching channel are sent first.
+    """
+    await websocket.accept()
+    if not bus:
+        await websocket.close(code=1011)
+        return
+
+    subscription = bus.open(channel, replay=max(0, min(replay, Config.BUS_REPLAY)))
+
+    async def forward():
+        async for name, message in subscription:
+            await websocket.send_text(json.dumps({"channel": name, "message": message}, default=str))
+
+    async def drain():
+        # Client frames are ignored; receiving is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(drain())]
+    try:
+        # Ends when the client disconnects (drain) or sending fails (forward)
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        subscription.close()
+        for task in tasks:
+            task.cancel()
+        # Retrieve their exceptions (e.g. the disconnect) so none is logged as never retrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@app.get("/news/{symbol}")
+async def get_news(symbol: str, days: int = 7, q: str = None, limit: int = 50):
+    """ Stored articles for a symbol from the last `days` days, optionally narrowed by a full-text query. """
+    await _agents_ready()
+    if not collector:
+        return {"error": "Server not initialized properly"}
+    since = time.time() - days * 86400
+    if q:
+        articles = await asyncio.to_thread(collector.news_store.search, f"{symbol} {q}", since, None, limit)
+    else:
+        articles = await asyncio.to_thread(collector.news_store.recent, f"{symbol} cryptocurrency", since, None, limit)
+    return {"symbol": symbol, "articles": articles}
+
+@app.get("/snapshots")
+async def get_snapshots():
+    """ Latest precomputed snapshot per symbol with its freshness, plus upstream backoff state. """
+    await _agents_ready()
+    if not collector:
+        return {"error": "Server not initialized properly"}
+    snapshots = await asyncio.to_thread(load_snapshots, collector.cache, SYMBOLS)
+    return {
+        "snapshots": {
+            symbol: {**snapshot, "age_seconds": round(time.time() - snapshot['updated_at'], 1)}
+            for symbol, snapshot in snapshots.items()
+        },
+        "backoff": collector.backoff.state()
+    }
+
+@app.get("/trends/{symbol}")
+async def get_trends(symbol: str, timeframe: str = '1d'):
+    """ Technical indicators for a symbol on '1h', '4h', '1d' or '1w' candles, read from its OHLCV rollups. """
+    await _agents_ready()
+    if not market_analyst:
+        return {"error": "Server not initialized properly"}
+    return await asyncio.to_thread(market_analyst.analyze_trends, symbol.upper(), timeframe)
+
+@app.get("/screen")
+async def screen_tokens(rsi_min: float = None, rsi_max: float = None, macd: str = None,
+                        momentum_min: float = None, momentum_max: float = None, volatility_max: float = None,
+                        sort: str = 'momentum', ascending: bool = False, limit: int = 50,
+                        universe: int = Config.UNIVERSE_SIZE):
+    """ Ranks the token universe by RSI band, MACD state ('bullish'/'bearish'), momentum and volatility. """
+    await _agents_ready()
+    if not collector or not screener:
+        return {"error": "Server not initialized properly"}
+    symbols = await asyncio.to_thread(collector.registry.universe, universe)
+    quotes, info = await asyncio.gather(
+        collector.aget_quotes_batch(symbols),
+        asyncio.to_thread(collector.registry.info, symbols)
+    )
+    try:
+        return await asyncio.to_thread(
+            screener.screen, symbols, quotes, info, rsi_min=rsi_min, rsi_max=rsi_max, macd=macd,
+            momentum_min=momentum_min, momentum_max=momentum_max, volatility_max=volatility_max,
+            sort=sort, ascending=ascending, limit=limit
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/startup")
+async def startup_report():
+    """ Startup phase timings and time to ready; `python -m utils.startup` breaks down import time. """
+    return startup.report()
+
 @app.get("/health")
 async def health_check():
     """ Health check endpoint. """
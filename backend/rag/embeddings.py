@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import Config
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI embeddings through langchain, built on first use"""
+
+    def __init__(self, model=Config.EMBEDDING_MODEL):
+        self.model = model
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._client = OpenAIEmbeddings(model=self.model, openai_api_key=Config.OPENAI_API_KEY)
+        return self._client
+
+    def embed(self, texts):
+        return self.client.embed_documents(texts)
+
+
+class SentenceTransformerBackend:
+    """Local sentence-transformers model, loaded on first use"""
+
+    def __init__(self, model="all-MiniLM-L6-v2"):
+        self.model = f"sentence-transformers/{model}"
+        self._model_name = model
+        self._encoder = None
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        with self._lock:
+            if self._encoder is None:
+                from sentence_transformers import SentenceTransformer
+                self._encoder = SentenceTransformer(self._model_name)
+            return self._encoder.encode(texts, normalize_embeddings=True)
+
+
+class LocalEmbeddingBackend:
+    """
+    Deterministic offline embeddings: hashed bag of words and character trigrams, L2-normalised.
+    Good enough to build and exercise the index without network access or model downloads.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.model = f"local-hash-{dim}"
+
+    def _features(self, text):
+        words = re.findall(r'\w+', text.lower())
+        return words + [text[i:i + 3] for i in range(len(text) - 2)]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], 'little') % self.dim
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+BACKENDS = {
+    'openai': OpenAIEmbeddingBackend,
+    'sentence-transformers': SentenceTransformerBackend,
+    'local': LocalEmbeddingBackend,
+}
+
+
+def build_embedding_backend(name=None):
+    name = name or Config.EMBEDDING_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    return BACKENDS[name]()
+
+
+class EmbeddingCache:
+    """Embeddings keyed by a hash of (model, text), in SQLite so they survive rebuilds"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._local = threading.local()  # sqlite3 connections are per-thread
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        found = {}
+        conn = self._connect()
+        for start in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def put_many(self, items):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+            )
+
+
+class Embedder:
+    """
+    Cached, batched embedding. Texts already embedded by the same model come from the cache;
+    the rest are sent in batches of `batch_size`, up to `concurrency` batches at a time.
+    """
+
+    def __init__(self, backend, cache, batch_size=Config.EMBEDDING_BATCH_SIZE,
+                 concurrency=Config.EMBEDDING_CONCURRENCY):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.backend.model}\0{text}".encode('utf-8')).hexdigest()
+
+    def embed(self, texts):
+        """Embed `texts` as a float32 matrix, one row per text"""
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        if missing:
+            missing_keys = list(missing)
+            batches = [missing_keys[i:i + self.batch_size] for i in range(0, len(missing_keys), self.batch_size)]
+
+            def embed_batch(batch):
+                vectors = np.asarray(self.backend.embed([missing[key] for key in batch]), dtype=np.float32)
+                self.cache.put_many(zip(batch, vectors))
+                return batch, vectors
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(batches)))) as pool:
+                for batch, vectors in pool.map(embed_batch, batches):
+                    cached.update(zip(batch, vectors))
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([cached[key] for key in keys])
@@ -1,12 +1,20 @@
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
+import os
+
+from config import Config
 
 execution_knowledge = [
     "Buy MOVEMENT: 1. Login 2. Navigate to Spot 3. Enter amount",
     "Sell MOVEMENT: 1. Select limit order 2. Set price 3. Confirm"
 ]
 
-vector_store = FAISS.from_texts(
-    execution_knowledge,
-    embedding=OpenAIEmbeddings()
-)
\ No newline at end of file
+_vector_store = None
+
+
+def get_vector_store():
+    """Index over execution_knowledge, built (and embedded) on first use rather than at import"""
+    global _vector_store
+    if _vector_store is None:
+        from rag.vector_index import VectorIndex
+        _vector_store = VectorIndex(os.path.join(Config.VECTOR_STORE_PATH, 'execution_guides'))
+        _vector_store.update([{'text': text, 'metadata': {'row': i}} for i, text in enumerate(execution_knowledge)])
+    return _vector_store
@@ -1,16 +1,11 @@
-from langchain_community.document_loaders import CSVLoader
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from config import Config
+from rag.vector_index import get_vector_index
 
 def load_historical_data():
-    loader = CSVLoader(
-        Config.HISTORICAL_DATA_PATH,
-        csv_args={'delimiter': ','},
-        metadata_columns=['Date', 'Time']
-    )
-    docs = loader.load()
-    return FAISS.from_documents(
-        docs,
-        OpenAIEmbeddings(openai_api_key=Config.OPENAI_API_KEY)
-    )
\ No newline at end of file
+    """
+    The historical-data vector index, synced with Config.HISTORICAL_DATA_PATH: only rows
+    that are new or changed since the last sync are embedded.
+    """
+    index = get_vector_index()
+    index.update_from_csv(Config.HISTORICAL_DATA_PATH)
+    return index
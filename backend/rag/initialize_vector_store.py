@@ -5,8 +5,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rag.historical_data_loader import load_historical_data
-from config import Config
 
+# Embeds only rows added or changed since the last run; the index is saved as it is built
 vector_store = load_historical_data()
-vector_store.save_local(Config.VECTOR_STORE_PATH)
-print("Vector store initialized successfully!")
\ No newline at end of file
+print(f"Vector store initialized successfully! ({len(vector_store)} rows)")
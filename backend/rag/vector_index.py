@@ -0,0 +1,188 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from config import Config
+from rag.embeddings import EmbeddingCache, Embedder, build_embedding_backend
+
+
+def _doc_key(text, metadata):
+    return hashlib.sha256(json.dumps([text, metadata], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def csv_documents(path, metadata_columns=('Date', 'Time')):
+    """
+    One document per CSV row, shaped like langchain's CSVLoader output: the non-metadata
+    columns as "Column: value" lines, plus source, row and the metadata columns.
+    """
+    documents = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            text = "\n".join(
+                f"{k.strip()}: {(v or '').strip()}" for k, v in row.items() if k not in metadata_columns
+            )
+            metadata = {'source': path, 'row': i, **{column: row.get(column) for column in metadata_columns}}
+            documents.append({'text': text, 'metadata': metadata})
+    return documents
+
+
+class VectorIndex:
+    """
+    On-disk vector index: a raw float32 matrix memory-mapped on first use, documents as JSON
+    lines, and meta.json recording the row count, dimension and embedding model.
+
+    `update` embeds only documents not already in the index (through the embedding cache,
+    so re-adding a previously seen text is free too). When the new documents extend the
+    old ones it appends to both files; otherwise it rewrites them and swaps them in.
+    Vectors are L2-normalised, so search is a dot product over the mapped matrix.
+    """
+
+    def __init__(self, path=Config.VECTOR_STORE_PATH, backend=None):
+        self.path = path
+        self.backend = backend or build_embedding_backend()
+        self.embedder = Embedder(self.backend, EmbeddingCache(os.path.join(path, 'embeddings.db')))
+        self._lock = threading.Lock()
+        self._loaded = None  # (meta, vectors, documents), read lazily
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._file('meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('model') != self.backend.model:
+            return None  # Built with another embedding model; vectors are not comparable
+        return meta
+
+    def _write_meta(self, meta):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _load(self):
+        with self._lock:
+            if self._loaded is None:
+                meta = self._read_meta()
+                if not meta or not meta['count']:
+                    self._loaded = (meta, np.empty((0, 0), dtype=np.float32), [])
+                else:
+                    vectors = np.memmap(
+                        self._file('vectors.f32'), dtype=np.float32, mode='r', shape=(meta['count'], meta['dim'])
+                    )
+                    with open(self._file('documents.jsonl'), encoding='utf-8') as f:
+                        documents = [json.loads(line) for _, line in zip(range(meta['count']), f)]
+                    self._loaded = (meta, vectors, documents)
+            return self._loaded
+
+    def __len__(self):
+        return len(self._load()[2])
+
+    def _normalized(self, vectors):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+    def update(self, documents, source_stat=None):
+        """Make the index hold exactly `documents` ({'text', 'metadata'}); returns how many were new to the index"""
+        meta, vectors, current = self._load()
+        keys = [_doc_key(doc['text'], doc['metadata']) for doc in documents]
+        current_keys = [doc['key'] for doc in current]
+        appending = bool(current) and keys[:len(current_keys)] == current_keys
+
+        if appending:
+            new_docs = documents[len(current):]
+            dim = meta['dim']
+            documents_bytes = meta['documents_bytes']
+            if new_docs:
+                new_vectors = self._normalized(self.embedder.embed([doc['text'] for doc in new_docs]))
+                lines = "".join(
+                    json.dumps({'key': key, **doc}) + "\n" for key, doc in zip(keys[len(current):], new_docs)
+                ).encode('utf-8')
+                # Write after the committed rows, dropping anything a crashed append left behind
+                for name, offset, data in (('vectors.f32', len(current) * dim * 4, new_vectors.tobytes()),
+                                           ('documents.jsonl', documents_bytes, lines)):
+                    with open(self._file(name), 'r+b') as f:
+                        f.seek(offset)
+                        f.write(data)
+                        f.truncate()
+                documents_bytes += len(lines)
+            embedded = len(new_docs)
+        else:
+            # Rows already in the index keep their vectors; everything else goes through the embedder
+            position = {key: i for i, key in enumerate(current_keys)}
+            reused = [position.get(key) for key in keys]
+            todo = [i for i, row in enumerate(reused) if row is None]
+            fresh = self._normalized(self.embedder.embed([documents[i]['text'] for i in todo])) if todo else None
+            dim = fresh.shape[1] if fresh is not None else vectors.shape[1] if len(vectors) else 0
+            matrix = np.empty((len(documents), dim), dtype=np.float32)
+            known = [i for i, row in enumerate(reused) if row is not None]
+            if known:
+                matrix[known] = vectors[[reused[i] for i in known]]
+            if todo:
+                matrix[todo] = fresh
+
+            # Release the old mapping before replacing its file (required on Windows)
+            del vectors
+            with self._lock:
+                self._loaded = None
+            lines = "".join(json.dumps({'key': key, **doc}) + "\n" for key, doc in zip(keys, documents)).encode('utf-8')
+            os.makedirs(self.path, exist_ok=True)
+            matrix.tofile(self._file('vectors.f32.tmp'))
+            with open(self._file('documents.jsonl.tmp'), 'wb') as f:
+                f.write(lines)
+            os.replace(self._file('vectors.f32.tmp'), self._file('vectors.f32'))
+            os.replace(self._file('documents.jsonl.tmp'), self._file('documents.jsonl'))
+            documents_bytes = len(lines)
+            embedded = len(todo)
+
+        self._write_meta({
+            'count': len(documents), 'dim': dim, 'model': self.backend.model,
+            'documents_bytes': documents_bytes, 'source': source_stat,
+        })
+        with self._lock:
+            self._loaded = None
+        return embedded
+
+    def update_from_csv(self, path=Config.HISTORICAL_DATA_PATH):
+        """Sync the index with a CSV file; a no-op when the file is unchanged since the last sync"""
+        st = os.stat(path)
+        source_stat = [path, st.st_mtime_ns, st.st_size]
+        meta = self._load()[0]
+        if meta and meta.get('source') == source_stat:
+            return 0
+        return self.update(csv_documents(path), source_stat)
+
+    def search(self, query, k=4):
+        """The `k` documents most similar to `query`, as (document, score) pairs, best first"""
+        _, vectors, documents = self._load()
+        if not documents:
+            return []
+        query_vector = self._normalized(self.embedder.embed([query]))[0]
+        scores = vectors @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            ({'text': documents[i]['text'], 'metadata': documents[i]['metadata']}, float(scores[i]))
+            for i in top
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    """The process-wide index over Config.VECTOR_STORE_PATH; nothing is read until it is searched"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex()
+        return _index
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Config reads the API keys at import; the tests never call the real services
+for key in ('COINMARKETCAP_API_KEY', 'OPENAI_API_KEY', 'NEWS_API_KEY',
+            'REDDIT_CLIENT_ID', 'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'):
+    os.environ.setdefault(key, 'test')
+os.environ.setdefault('SENTIMENT_POOL_WORKERS', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
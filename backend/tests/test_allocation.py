@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+import pytest
+
+from agents.action_recommender import ActionRecommender
+from config import Config
+from utils.allocation import AllocationEngine, goal_allocation_params
+from utils.price_store import HistoricalPriceStore
+
+DAY = 86400
+
+
+def candles(days, seed, start=1_700_000_000 // DAY * DAY):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.03, days)))
+    return [{'timestamp': start + i * DAY, 'open': c, 'high': c, 'low': c, 'close': c, 'volume': 1.0,
+             'market_cap': 1.0} for i, c in enumerate(closes)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Backfilled histories: two long ones, one a few days old and one still header-only"""
+    prices = HistoricalPriceStore(data_dir=str(tmp_path / 'seed'), store_dir=str(tmp_path / 'store'))
+    for symbol, days in (('AAA', 200), ('BBB', 200), ('NEW', 5), ('EMPTY', 0)):
+        prices.create(symbol)
+        prices.append(symbol, candles(days, seed=len(symbol) + days))
+    return prices
+
+
+def test_short_histories_get_no_weight(store):
+    engine = AllocationEngine(store)
+    assert [s for s in ('AAA', 'BBB', 'NEW', 'EMPTY') if engine.has_history(s)] == ['AAA', 'BBB']
+    assert not engine.has_history('MISSING')
+
+
+def test_short_history_buy_gets_only_the_floor(store):
+    recommender = ActionRecommender.__new__(ActionRecommender)  # No LLM needed for the weights
+    recommender.allocator = AllocationEngine(store)
+    recs = [{'symbol': 'AAA', 'action': 'Buy'}, {'symbol': 'BBB', 'action': 'Hold'},
+            {'symbol': 'EMPTY', 'action': 'Buy'}, {'symbol': 'NEW', 'action': 'Sell'}]
+    weights = recommender._crypto_weights(recs, 'Grow steadily')
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[2] == pytest.approx(Config.ALLOCATION_MIN_BUY_WEIGHT)
+    assert weights[3] == 0.0
+
+
+def test_concurrent_allocations_match_one_batch(store):
+    engine = AllocationEngine(store)
+    symbols = ['AAA', 'BBB']
+    goals = ['Double it, 2x', 'A balanced portfolio', 'Stay conservative', 'Aggressive growth', 'Grow 30%'] * 4
+    results = [None] * len(goals)
+
+    def allocate(i):
+        results[i] = engine.allocate(symbols, **goal_allocation_params(goals[i]))
+
+    threads = [threading.Thread(target=allocate, args=(i,)) for i in range(len(goals))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = engine.allocate_many(symbols, [goal_allocation_params(goal) for goal in goals])
+    np.testing.assert_allclose(np.array(results), expected)
+    assert not engine._pending
+
+
+def test_unknown_mode_fails_only_its_request(store):
+    engine = AllocationEngine(store)
+    with pytest.raises(ValueError):
+        engine.allocate(['AAA', 'BBB'], mode='momentum')
+    assert engine.allocate(['AAA', 'BBB']).sum() == pytest.approx(1.0)
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+
+import pytest
+
+import agents.data_collector as data_collector
+from agents.data_collector import DataCollector
+from config import Config
+from utils.backoff import UpstreamBackoff
+from utils.cache import Cache
+from utils.ecosystem import EcosystemCatalog
+from utils.singleflight import SingleFlight
+
+PAGE = '<html><div id="projects_results">' + ''.join(
+    f'<div class="grid__item"><div class="content"><a href="https://{name}.xyz"><h3>{name}</h3><p>About {name}</p></a>'
+    f'</div><ul class="tags"><li class="tag__cat">DeFi</li></ul></div>'
+    for name in ('Alpha', 'Beta', 'Gamma')
+) + '</div></html>'
+
+
+class Page:
+    status_code = 200
+    headers = {}
+    text = PAGE
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Serve the ecosystem page locally, recording each request"""
+    calls = []
+
+    def get(url, *args, **kwargs):
+        calls.append(url)
+        return Page()
+
+    monkeypatch.setattr(data_collector.requests, 'get', get)
+    monkeypatch.setattr(Config, 'COALESCE_POLL_INTERVAL', 0.01)
+    return calls
+
+
+def collector(filename):
+    """A DataCollector with only the ecosystem machinery, sharing `filename` like another worker would"""
+    worker = DataCollector.__new__(DataCollector)
+    worker.cache = Cache(filename)
+    worker.ecosystem = EcosystemCatalog()
+    worker.backoff = UpstreamBackoff()
+    worker.flight = SingleFlight(worker.cache)
+    return worker
+
+
+def test_cold_start_fetches_once_and_shares_the_snapshot(tmp_path, fetches):
+    filename = str(tmp_path / 'cache.db')
+    first, second = collector(filename), collector(filename)
+    assert set(first.fetch_application_data()) == {'DeFi'}
+    assert len(first.ecosystem) == 3
+    # The second worker adopts the saved snapshot instead of fetching again
+    assert second.fetch_application_data() == first.fetch_application_data()
+    assert len(fetches) == 1
+
+
+def test_lease_loser_waits_for_the_holders_snapshot(tmp_path, fetches):
+    filename = str(tmp_path / 'cache.db')
+    holder, loser = collector(filename), collector(filename)
+    assert holder.cache.add('ecosystem_refresh_lease', os.getpid() + 1, 60)  # Another worker's lease
+    threading.Timer(0.1, holder.refresh_ecosystem).start()
+
+    grouped = loser.fetch_application_data()
+    assert [project['name'] for project in grouped['DeFi']] == ['Alpha', 'Beta', 'Gamma']
+    assert len(fetches) == 1  # Only the holder fetched
+
+
+def test_expired_lease_is_taken_over(tmp_path, fetches):
+    filename = str(tmp_path / 'cache.db')
+    worker = collector(filename)
+    worker.cache.add('ecosystem_refresh_lease', os.getpid() + 1, 0.2)  # Its holder never finishes
+
+    start = time.monotonic()
+    assert len(worker.fetch_application_data()['DeFi']) == 3
+    assert time.monotonic() - start >= 0.2
+    assert len(fetches) == 1
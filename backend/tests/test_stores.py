@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from utils.cache import Cache
+from utils.news_store import NewsStore
+from utils.reddit_store import RedditStore
+from utils.symbol_registry import SymbolRegistry
+
+
+def fail_on(filename, table, event):
+    """Make every `event` (INSERT/UPDATE/DELETE) on `table` abort, to fail a write halfway"""
+    conn = sqlite3.connect(filename)
+    conn.execute(f"CREATE TRIGGER fail_{event.lower()} BEFORE {event} ON {table} BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    conn.commit()
+    conn.close()
+
+
+def count(filename, table):
+    conn = sqlite3.connect(filename)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def article(i, published_at='2026-10-01T00:00:00Z'):
+    return {'url': f'https://example.com/{i}', 'title': f'title {i}', 'description': 'd',
+            'source': {'name': 's'}, 'publishedAt': published_at}
+
+
+def post(i, created):
+    return {'id': f'p{i}', 'title': 't', 'content': 'c', 'upvotes': i, 'comments': 0, 'created': created}
+
+
+def test_news_add_rolls_back_articles_when_the_watermark_fails(tmp_path):
+    filename = str(tmp_path / 'news.db')
+    store = NewsStore(filename)
+    fail_on(filename, 'watermarks', 'INSERT')
+    with pytest.raises(sqlite3.DatabaseError):
+        store.add('q', [article(1), article(2)])
+    assert count(filename, 'articles') == 0
+    assert count(filename, 'article_queries') == 0
+    assert store.watermark('q') is None
+
+
+def test_news_add_keeps_the_given_watermark(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    assert store.add('q', [article(1, '2026-10-02T00:00:00Z'), article(2, '2026-10-01T00:00:00Z')],
+                     '2026-10-01T00:00:00Z') == 2
+    assert store.watermark('q') == '2026-10-01T00:00:00Z'
+    assert store.add('q', [article(1, '2026-10-02T00:00:00Z')]) == 0  # Already stored
+    assert store.watermark('q') == '2026-10-02T00:00:00Z'
+
+
+def test_news_prune_is_all_or_nothing(tmp_path):
+    filename = str(tmp_path / 'news.db')
+    store = NewsStore(filename)
+    store.add('q', [article(1, '2000-01-01T00:00:00Z')])
+    fail_on(filename, 'articles', 'DELETE')
+    with pytest.raises(sqlite3.DatabaseError):
+        store.prune()
+    assert count(filename, 'article_queries') == 1
+    # The connection is usable again after the rollback
+    store.add('q', [article(2)])
+    assert count(filename, 'articles') == 2
+
+
+def test_reddit_add_posts_rolls_back_when_the_watermark_fails(tmp_path):
+    filename = str(tmp_path / 'reddit.db')
+    store = RedditStore(filename)
+    fail_on(filename, 'watermarks', 'INSERT')
+    with pytest.raises(sqlite3.DatabaseError):
+        store.add_posts('q', [post(1, time.time())])
+    assert count(filename, 'posts') == 0
+    assert count(filename, 'matches') == 0
+
+
+def test_reddit_update_votes_and_prune_are_transactional(tmp_path):
+    filename = str(tmp_path / 'reddit.db')
+    store = RedditStore(filename)
+    now = time.time()
+    store.add_posts('q', [post(1, now), post(2, now - 30 * 86400)])
+    store.mark_ingested('q')
+
+    store.update_votes([('p1', 10, 3)])
+    assert store.recent('q')[0]['upvotes'] == 10
+
+    fail_on(filename, 'posts', 'UPDATE')
+    with pytest.raises(sqlite3.DatabaseError):
+        store.update_votes([('p1', 20, 3)])
+    assert store.recent('q')[0]['upvotes'] == 10
+
+    fail_on(filename, 'posts', 'DELETE')
+    with pytest.raises(sqlite3.DatabaseError):
+        store.prune()
+    assert count(filename, 'matches') == 2  # The matches delete was rolled back with it
+
+
+def test_registry_add_rolls_back_when_tracking_fails(tmp_path):
+    filename = str(tmp_path / 'symbols.db')
+    registry = SymbolRegistry(filename, tracked=['BTC'])
+    fail_on(filename, 'symbols', 'UPDATE')
+    with pytest.raises(sqlite3.DatabaseError):
+        registry.add(['ETH', 'SOL'], tracked=True)
+    assert registry.universe() == ['BTC']
+
+
+def test_cache_add_grants_one_lease(tmp_path):
+    filename = str(tmp_path / 'cache.db')
+    Cache(filename)
+    won = []
+    barrier = threading.Barrier(8)
+
+    def claim(worker):
+        cache = Cache(filename)  # One connection per worker, as in separate processes
+        barrier.wait()
+        if cache.add('lease', worker, 60):
+            won.append(worker)
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(won) == 1
+    assert Cache(filename).get('lease') == won[0]
+
+
+def test_cache_reads_do_not_write_until_flushed(tmp_path):
+    filename = str(tmp_path / 'cache.db')
+    cache = Cache(filename, max_entries=2, access_flush_interval=60)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    conn = sqlite3.connect(filename)
+    accessed = conn.execute("SELECT accessed FROM entries WHERE key = 'a'").fetchone()[0]
+    assert cache.get('a') == 1
+    assert conn.execute("SELECT accessed FROM entries WHERE key = 'a'").fetchone()[0] == accessed
+    # The next set writes the noted read first, so 'b' is the least recently used
+    cache.set('c', 3, 60)
+    assert sorted(key for (key,) in conn.execute("SELECT key FROM entries")) == ['a', 'c']
+    conn.close()
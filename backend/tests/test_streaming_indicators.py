@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from agents.market_analyst import MarketAnalyst
+from utils.streaming_indicators import StreamingRSI, StreamingSMA
+
+
+def closes(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def test_rsi_matches_the_batch_formula_at_every_step():
+    prices = closes()
+    analyst = MarketAnalyst()
+    rsi = StreamingRSI(analyst.rsi_window)
+    for i, price in enumerate(prices):
+        value = rsi.update(price)
+        if i < analyst.rsi_window:
+            assert value is None
+        else:
+            assert round(value, 2) == analyst.calculate_rsi(prices[:i + 1])
+
+
+def test_rsi_known_values():
+    rsi = StreamingRSI(2)
+    for price in (10, 11, 12):
+        rsi.update(price)
+    assert rsi.value == 100.0  # Only gains
+    assert rsi.update(11) == pytest.approx(50.0)  # Gains 1, losses 1 over the last two changes
+    assert rsi.update(10) == pytest.approx(0.0)
+
+
+def test_rsi_revise_replaces_the_latest_price():
+    prices = closes(40)
+    revised = StreamingRSI(14)
+    for price in prices[:-1]:
+        revised.update(price)
+    revised.update(prices[-1] * 1.5)
+    revised.revise(prices[-1])
+
+    expected = StreamingRSI(14)
+    for price in prices:
+        expected.update(price)
+    assert revised.value == pytest.approx(expected.value)
+    assert StreamingRSI.from_dict(revised.to_dict()).value == pytest.approx(expected.value)
+
+
+def test_sma_does_not_drift():
+    sma = StreamingSMA(3)
+    for price in (1e16, 1.0, 1.0, 1.0):
+        sma.update(price)
+    assert sma.value == 1.0
+    for _ in range(1000):
+        sma.revise(1e16)
+        sma.revise(1.0)
+    assert sma.value == 1.0
+    assert not math.isnan(sma.value)
@@ -0,0 +1,374 @@
+"""
+Portfolio allocation from historical prices.
+
+Expected returns and a shrinkage covariance matrix are estimated from the daily OHLCV
+files once per data version and reused. Long-only, fully invested weights are then
+solved for a whole batch of requests at once, in one of three modes:
+
+    mean_variance   maximise mu'w - risk_aversion / 2 * w'Sw
+    risk_parity     every asset contributes its budget share of portfolio variance
+    target_return   the least-variance portfolio on the frontier with the target return
+
+Returns are annualised daily log returns, so a target of log(2) means doubling in a year.
+"""
+import functools
+import math
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+from cachetools import LRUCache
+
+from config import Config
+
+PERIODS_PER_YEAR = 365  # Crypto trades every day
+MODES = ('mean_variance', 'risk_parity', 'target_return')
+
+
+def _shrunk_correlation(returns):
+    """
+    Correlation matrix of a (days x assets) return matrix, shrunk towards the identity
+    with the Ledoit-Wolf optimal intensity.
+    """
+    days, n = returns.shape
+    std = returns.std(axis=0)
+    z = (returns - returns.mean(axis=0)) / np.where(std > 0, std, 1)
+    sample = z.T @ z / days
+    identity = np.eye(n)
+    distance = ((sample - identity) ** 2).sum()
+    spread = (((z ** 2).sum(axis=1) ** 2).sum() / days ** 2) - (sample ** 2).sum() / days
+    intensity = min(1.0, max(0.0, spread / distance)) if distance > 0 else 1.0
+    correlation = intensity * identity + (1 - intensity) * sample
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def estimate_moments(series, lookback=Config.ALLOCATION_LOOKBACK, min_overlap=Config.ALLOCATION_MIN_OVERLAP,
+                     return_shrinkage=Config.ALLOCATION_RETURN_SHRINKAGE):
+    """
+    Annualised expected returns and covariance from (timestamps, closes) per asset, oldest first.
+
+    Each asset's mean and volatility use its own last `lookback` daily log returns, so a short
+    history does not truncate the others. Correlations use the days every asset has, shrunk
+    (Ledoit-Wolf); with fewer than `min_overlap` shared days they are taken as zero. Means are
+    shrunk towards their cross-sectional average by `return_shrinkage`.
+    """
+    n = len(series)
+    means = np.zeros(n)
+    vols = np.zeros(n)
+    daily = []
+    for i, (timestamps, closes) in enumerate(series):
+        timestamps = np.asarray(timestamps[-(lookback + 1):])
+        returns = np.diff(np.log(np.asarray(closes[-(lookback + 1):], dtype=np.float64)))
+        if len(returns) > 1:
+            means[i] = returns.mean()
+            vols[i] = returns.std(ddof=1)
+        daily.append((timestamps[1:], returns))
+
+    correlation = np.eye(n)
+    common = functools.reduce(np.intersect1d, [timestamps for timestamps, _ in daily]) if n else []
+    if len(common) >= min_overlap:
+        overlap = np.column_stack([returns[np.searchsorted(timestamps, common)] for timestamps, returns in daily])
+        correlation = _shrunk_correlation(overlap)
+
+    mu = means * PERIODS_PER_YEAR
+    if n:
+        mu = (1 - return_shrinkage) * mu + return_shrinkage * mu.mean()
+    # A floor on volatility keeps flat series (or a single candle) from making S singular
+    vols = np.maximum(vols, 1e-6) * math.sqrt(PERIODS_PER_YEAR)
+    return mu, correlation * np.outer(vols, vols)
+
+
+def _kkt_solve(mu, cov, risk_aversion, active):
+    """Equality-constrained optimum per row, with inactive weights pinned at zero"""
+    batch, n = active.shape
+    a = active.astype(np.float64)
+    system = np.zeros((batch, n + 1, n + 1))
+    system[:, :n, :n] = risk_aversion[:, None, None] * cov * (a[:, :, None] * a[:, None, :])
+    system[:, np.arange(n), np.arange(n)] += 1 - a
+    system[:, :n, n] = a
+    system[:, n, :n] = a
+    rhs = np.zeros((batch, n + 1))
+    rhs[:, :n] = mu * a
+    rhs[:, n] = 1.0
+    solution = np.linalg.solve(system, rhs[..., None])[..., 0]
+    return solution[:, :n], solution[:, n]
+
+
+def solve_mean_variance(mu, cov, risk_aversion, max_iter=None):
+    """
+    Long-only mean-variance weights, one row per risk aversion.
+
+    A batched active-set method: every iteration solves the KKT systems of the unfinished
+    rows at once, then each of them drops its most negative weight or re-admits the asset
+    whose constraint multiplier is most negative. Equal risk aversions are solved once.
+    """
+    mu = np.asarray(mu, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    requested = np.maximum(np.atleast_1d(np.asarray(risk_aversion, dtype=np.float64)), 1e-3)
+    risk_aversion, inverse = np.unique(requested, return_inverse=True)
+    batch, n = len(risk_aversion), len(mu)
+    active = np.ones((batch, n), dtype=bool)
+    weights = np.zeros((batch, n))
+    pending = np.arange(batch)
+    for _ in range(max_iter or 4 * n):
+        w, nu = _kkt_solve(mu, cov, risk_aversion[pending], active[pending])
+        weights[pending] = w
+        rows = np.arange(len(pending))
+        held = np.where(active[pending], w, np.inf)
+        worst = held.argmin(axis=1)
+        drop = held[rows, worst] < -1e-12
+        multipliers = np.where(
+            active[pending], np.inf, risk_aversion[pending, None] * (w @ cov) - mu + nu[:, None]
+        )
+        best = multipliers.argmin(axis=1)
+        add = ~drop & (multipliers[rows, best] < -1e-10)
+        active[pending[drop], worst[drop]] = False
+        active[pending[add], best[add]] = True
+        pending = pending[drop | add]
+        if not len(pending):
+            break
+    weights = np.clip(weights, 0, None)
+    return (weights / weights.sum(axis=1, keepdims=True))[inverse]
+
+
+def solve_risk_parity(cov, budgets=None, iterations=100, tol=1e-10):
+    """
+    Risk-budgeting weights, one row per budget vector (default: equal budgets).
+
+    Minimises x'Sx / 2 - budgets'log(x) by damped Newton steps for the whole batch; at the
+    optimum x_i (Sx)_i = budget_i, so normalised x gives each asset its budget's share of risk.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    n = len(cov)
+    cov = cov / np.mean(np.diag(cov))  # Scale-free, and better conditioned
+    budgets = np.ones((1, n)) if budgets is None else np.atleast_2d(np.asarray(budgets, dtype=np.float64))
+    budgets = n * budgets / budgets.sum(axis=1, keepdims=True)
+    x = budgets / np.sqrt(np.diag(cov))  # Inverse-volatility start
+    for _ in range(iterations):
+        gradient = x @ cov - budgets / x
+        if np.abs(gradient).max() < tol:
+            break
+        hessian = cov + (budgets / x ** 2)[:, :, None] * np.eye(n)
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        decrement = np.sqrt(np.maximum((gradient * step).sum(axis=1), 0))
+        # Damped step, never leaving the positive orthant
+        limit = np.where(step > 0, x / np.where(step > 0, step, 1), np.inf).min(axis=1)
+        t = np.minimum(np.where(decrement > 0.25, 1 / (1 + decrement), 1.0), 0.9 * limit)
+        x = x - t[:, None] * step
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def efficient_frontier(mu, cov, points=Config.ALLOCATION_FRONTIER_POINTS):
+    """
+    Long-only frontier from the minimum-variance portfolio to the highest-return asset, as
+    (returns, weights) in increasing order of return.
+    """
+    mu = np.asarray(mu, dtype=np.float64)
+    weights = np.vstack([
+        solve_mean_variance(np.zeros_like(mu), cov, [1.0]),
+        solve_mean_variance(mu, cov, np.logspace(3, -3, points)),
+        np.eye(len(mu))[[int(np.argmax(mu))]],
+    ])
+    returns = np.maximum.accumulate(weights @ mu)
+    return returns, weights
+
+
+def solve_target_return(frontier, targets):
+    """
+    Frontier weights for each target return, interpolated between neighbouring frontier
+    points. Targets outside the frontier get its end points.
+    """
+    returns, weights = frontier
+    targets = np.clip(np.atleast_1d(np.asarray(targets, dtype=np.float64)), returns[0], returns[-1])
+    upper = np.clip(np.searchsorted(returns, targets), 1, len(returns) - 1)
+    lower = upper - 1
+    span = returns[upper] - returns[lower]
+    fraction = np.where(span > 0, (targets - returns[lower]) / np.where(span > 0, span, 1), 0.0)
+    return weights[lower] + fraction[:, None] * (weights[upper] - weights[lower])
+
+
+_MULTIPLE = re.compile(r'(\d+(?:\.\d+)?)\s*x\b')
+_PERCENT = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_PARITY_WORDS = ('risk parity', 'balanced', 'diversif')
+_CONSERVATIVE_WORDS = ('conservative', 'safe', 'low risk', 'low-risk', 'preserve', 'protect', 'stable')
+_AGGRESSIVE_WORDS = ('aggressive', 'high risk', 'high-risk', 'maximi', 'moon')
+
+
+def apply_min_weights(weights, floored, minimum):
+    """
+    Normalise `weights` to sum to 1 with every `floored` entry at least `minimum` (capped at
+    an equal split of the floored entries). Entries raised to the floor are fixed there and
+    the rest are scaled down proportionally; weight no free entry can take goes to the
+    floored ones equally. All zeros stay zeros when nothing is floored.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    floored = np.asarray(floored, dtype=bool)
+    if not floored.any():
+        total = weights.sum()
+        return weights / total if total > 0 else weights
+    minimum = min(minimum, 1 / floored.sum())
+    fixed = np.zeros(len(weights), dtype=bool)
+    for _ in range(len(weights)):
+        free_total = weights[~fixed].sum()
+        if free_total <= 0:
+            return np.where(floored, 1 / floored.sum(), 0.0)
+        weights = np.where(fixed, minimum, weights * (1 - minimum * fixed.sum()) / free_total)
+        low = floored & ~fixed & (weights < minimum)
+        if not low.any():
+            break
+        fixed |= low
+    return weights
+
+
+def goal_allocation_params(user_goal):
+    """
+    Allocation request for a free-text goal: an explicit return ("2x", "30%") becomes a
+    target_return over a year, "balanced"/"diversified"/"risk parity" asks for risk_parity,
+    and anything else is mean_variance with a risk aversion set by the goal's tone.
+    """
+    goal = str(user_goal).lower()
+    multiple = _MULTIPLE.search(goal)
+    if multiple and float(multiple.group(1)) > 0:
+        return {'mode': 'target_return', 'target_return': math.log(float(multiple.group(1)))}
+    percent = _PERCENT.search(goal)
+    if percent:
+        return {'mode': 'target_return', 'target_return': math.log1p(float(percent.group(1)) / 100)}
+    if any(word in goal for word in _PARITY_WORDS):
+        return {'mode': 'risk_parity'}
+    if any(word in goal for word in _CONSERVATIVE_WORDS):
+        profile = 'conservative'
+    elif any(word in goal for word in _AGGRESSIVE_WORDS):
+        profile = 'aggressive'
+    else:
+        profile = 'moderate'
+    return {'mode': 'mean_variance', 'risk_aversion': Config.ALLOCATION_RISK_AVERSION[profile]}
+
+
+class AllocationEngine:
+    """
+    Allocates across any set of symbols with price history.
+
+    Moments, the efficient frontier and the equal-budget risk-parity weights are computed
+    once per symbol set and data version (each series' length and last timestamp) and kept
+    in an LRU cache, so a request costs one batched solve, or a lookup for target-return and
+    default risk-parity requests. Concurrent `allocate` calls are queued and solved together
+    (see allocate). Results are deterministic for the same data.
+    """
+
+    def __init__(self, price_store=None, cache_size=Config.ALLOCATION_MODEL_CACHE_SIZE):
+        if price_store is None:
+            from utils.price_store import HistoricalPriceStore
+            price_store = HistoricalPriceStore()
+        self.price_store = price_store
+        self._models = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+        self._pending = defaultdict(list)  # symbols -> queued allocate() requests
+        self._solve_lock = threading.Lock()
+
+    def has_history(self, symbol, min_returns=Config.ALLOCATION_MIN_RETURNS):
+        """Whether the symbol has enough daily returns to be weighted (a backfilled CSV may be empty)"""
+        return self.price_store.has(symbol) and len(self.price_store.get(symbol).close) > min_returns
+
+    def model(self, symbols):
+        """Expected returns, covariance, frontier and risk-parity weights for `symbols`"""
+        key = tuple(symbol.upper() for symbol in symbols)
+        series = [self.price_store.get(symbol) for symbol in key]
+        version = tuple((len(s.timestamp), int(s.timestamp[-1]) if len(s.timestamp) else 0) for s in series)
+        with self._lock:
+            model = self._models.get(key)
+        if model and model['version'] == version:
+            return model
+
+        mu, cov = estimate_moments([(s.timestamp, s.close) for s in series])
+        model = {
+            'version': version,
+            'mu': mu,
+            'cov': cov,
+            'frontier': efficient_frontier(mu, cov),
+            'risk_parity': solve_risk_parity(cov)[0],
+        }
+        with self._lock:
+            self._models[key] = model
+        return model
+
+    def allocate_many(self, symbols, requests):
+        """
+        Weights for many requests over the same symbols, as a (requests x symbols) array whose
+        rows sum to 1. Each request is a dict with `mode` and, per mode, `risk_aversion`,
+        `target_return` or `budgets` (see goal_allocation_params). Requests are grouped by
+        mode and each group is solved in one batch.
+        """
+        model = self.model(symbols)
+        weights = np.empty((len(requests), len(symbols)))
+        by_mode = defaultdict(list)
+        for i, request in enumerate(requests):
+            mode = request.get('mode', 'mean_variance')
+            if mode not in MODES:
+                raise ValueError(f"Unknown allocation mode: {mode}")
+            by_mode[mode].append(i)
+
+        rows = by_mode['mean_variance']
+        if rows:
+            risk_aversion = [requests[i].get('risk_aversion', Config.ALLOCATION_RISK_AVERSION['moderate']) for i in rows]
+            weights[rows] = solve_mean_variance(model['mu'], model['cov'], risk_aversion)
+        rows = by_mode['target_return']
+        if rows:
+            weights[rows] = solve_target_return(model['frontier'], [requests[i]['target_return'] for i in rows])
+        rows = by_mode['risk_parity']
+        budgeted = [i for i in rows if requests[i].get('budgets') is not None]
+        if budgeted:
+            weights[budgeted] = solve_risk_parity(model['cov'], [requests[i]['budgets'] for i in budgeted])
+        equal = [i for i in rows if requests[i].get('budgets') is None]
+        if equal:
+            weights[equal] = model['risk_parity']
+        return weights
+
+    def allocate(self, symbols, mode='mean_variance', **params):
+        """
+        Weights for one request; see allocate_many. The request is queued, and whichever caller
+        gets the solver next takes every queued request, one allocate_many per symbol set, so
+        requests arriving while a solve runs share the following one.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown allocation mode: {mode}")
+        key = tuple(symbol.upper() for symbol in symbols)
+        job = {'request': {'mode': mode, **params}, 'done': threading.Event()}
+        with self._lock:
+            self._pending[key].append(job)
+        with self._solve_lock:
+            if not job['done'].is_set():
+                with self._lock:
+                    pending, self._pending = self._pending, defaultdict(list)
+                for batch_key, jobs in pending.items():
+                    self._solve(batch_key, jobs)
+        if 'error' in job:
+            raise job['error']
+        return job['weights']
+
+    def _solve(self, symbols, jobs):
+        """Solve queued allocate() jobs over the same symbols in one batch and release their callers"""
+        try:
+            weights = self.allocate_many(list(symbols), [job['request'] for job in jobs])
+            for job, row in zip(jobs, weights):
+                job['weights'] = row
+        except Exception as e:
+            for job in jobs:
+                job['error'] = e
+        finally:
+            for job in jobs:
+                job['done'].set()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_allocation_engine(price_store=None):
+    """The process-wide engine over the historical price files (the first caller's store, if given)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AllocationEngine(price_store)
+        return _engine
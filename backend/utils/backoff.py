@@ -0,0 +1,41 @@
+import random
+import threading
+import time
+
+from config import Config
+
+
+class UpstreamBackoff:
+    """
+    Exponential backoff per upstream source (quote, news, reddit, llm, ...).
+
+    Shared by request handlers and the background scheduler, so a failing upstream is
+    left alone for a while instead of being retried by every caller.
+    """
+
+    def __init__(self, base=Config.BACKOFF_BASE, maximum=Config.BACKOFF_MAX):
+        self.base = base
+        self.maximum = maximum
+        self._failures = {}
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def ready(self, source):
+        return time.monotonic() >= self._until.get(source, 0)
+
+    def failure(self, source):
+        with self._lock:
+            failures = self._failures.get(source, 0) + 1
+            self._failures[source] = failures
+            delay = min(self.maximum, self.base * 2 ** (failures - 1))
+            self._until[source] = time.monotonic() + delay * random.uniform(0.5, 1.0)
+
+    def success(self, source):
+        with self._lock:
+            self._failures.pop(source, None)
+            self._until.pop(source, None)
+
+    def state(self):
+        """Seconds left in backoff for each source currently backing off"""
+        now = time.monotonic()
+        return {source: round(until - now, 1) for source, until in self._until.items() if until > now}
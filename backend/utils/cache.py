@@ -1,60 +1,182 @@
-from cachetools import TTLCache
-from datetime import datetime, timedelta
+import os
 import pickle
+import sqlite3
 import threading
-from cachetools import TTLCache
-import os
+import time
+
+from config import Config
+
+# Expiry is stored as wall-clock seconds so entries stay valid across restarts and workers,
+# but "now" is advanced from the monotonic clock so a wall-clock jump inside this process
+# cannot expire or revive entries.
+_WALL_ANCHOR = time.time()
+_MONO_ANCHOR = time.monotonic()
+
+
+def _now():
+    return _WALL_ANCHOR + (time.monotonic() - _MONO_ANCHOR)
+
 
 class Cache:
-    def __init__(self,filename='cache.pkl'):
+    """
+    Persistent TTL + LRU cache backed by SQLite in WAL mode.
+
+    Each set/get touches only its own row, and SQLite's file locking makes the
+    store safe to share between uvicorn/gunicorn workers. An entry may be kept for
+    `stale_ttl` seconds past its ttl so callers can serve it while refreshing.
+    Reads do not write: their access times are kept in memory and written back in
+    one batch every `access_flush_interval` seconds, or with the next set.
+    """
+
+    def __init__(self, filename='cache.db', max_entries=Config.CACHE_MAX_ENTRIES,
+                 access_flush_interval=Config.CACHE_ACCESS_FLUSH_INTERVAL):
         self.filename = filename
-        self.cache = {}
-        self.lock = threading.Lock()  # For thread safety
-        self.data = {}
+        self.max_entries = max_entries
+        self.access_flush_interval = access_flush_interval
+        self._local = threading.local()  # sqlite3 connections are per-thread
+        self._accessed = {}  # key -> access time not yet written
+        self._accessed_lock = threading.Lock()
+        self._flushed_at = _now()
 
-        # Load existing cache from disk if available
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'rb') as f:
-                    self.cache = pickle.load(f)
-                print(f"Loaded cache with {len(self.cache)} entries from disk")
-            except Exception as e:
-                print(f"Error loading cache: {str(e)}")
-                self.cache = {}
-
-    def _save_to_disk(self):
-        """Internal method to persist cache to disk"""
-        with self.lock:
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expiry REAL NOT NULL, accessed REAL NOT NULL, "
+                "stale_until REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(entries)")]
+            if 'stale_until' not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN stale_until REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        print(f"Loaded cache with {count} entries from disk")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _take_accessed(self, now):
+        """Access times noted since the last flush, as (accessed, key) rows, and start a new batch"""
+        with self._accessed_lock:
+            accessed, self._accessed = self._accessed, {}
+            self._flushed_at = now
+        return [(when, key) for key, when in accessed.items()]
+
+    def _write_accessed(self, conn, rows):
+        conn.executemany("UPDATE entries SET accessed = MAX(accessed, ?) WHERE key = ?", rows)
+
+    def _touch(self, key, now):
+        """Note a read, writing the batch of noted reads back once it is old enough"""
+        with self._accessed_lock:
+            self._accessed[key] = now
+            due = now - self._flushed_at >= self.access_flush_interval
+        if not due:
+            return
+        rows = self._take_accessed(now)
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
             try:
-                # Clean expired entries before saving
-                self._clean_expired()
-                with open(self.filename, 'wb') as f:
-                    pickle.dump(self.cache, f)
-            except Exception as e:
-                print(f"Error saving cache: {str(e)}")
-
-    def _clean_expired(self):
-        """Remove expired entries from cache"""
-        now = datetime.now()
-        expired_keys = [k for k, v in self.cache.items() if v['expiry'] < now]
-        for k in expired_keys:
-            del self.cache[k]
+                self._write_accessed(conn, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            # Only recency for eviction is lost; the read itself succeeded
+            print(f"Error saving cache access times: {str(e)}")
+
+    def _evict(self, conn):
+        """Drop expired entries, then least recently used ones, until within max_entries"""
+        excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        conn.execute("DELETE FROM entries WHERE MAX(expiry, stale_until) < ?", (_now(),))
+        conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT "
+            "MAX(0, (SELECT COUNT(*) FROM entries) - ?))",
+            (self.max_entries,)
+        )
+
+    def lookup(self, key):
+        """
+        Return (data, state) where state is 'hit', 'stale' (past its ttl but inside
+        its stale window) or 'miss'.
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expiry, stale_until FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, 'miss'
+            now = _now()
+            if max(row[1], row[2]) <= now:
+                conn.execute("DELETE FROM entries WHERE key = ? AND MAX(expiry, stale_until) <= ?", (key, now))
+                return None, 'miss'
+            self._touch(key, now)
+            return pickle.loads(row[0]), 'hit' if now < row[1] else 'stale'
+        except Exception as e:
+            print(f"Error reading cache: {str(e)}")
+            return None, 'miss'
 
     def get(self, key):
         """Retrieve cached data if it exists and is not expired"""
-        entry = self.cache.get(key)
-        if entry:
-            if datetime.now() < entry['expiry']:
-                return entry['data']
-            else:
-                del self.cache[key]
-                self._save_to_disk()
-        return None
-
-    def set(self, key, data, ttl):
-        """Store data in cache with time-to-live (ttl) in seconds"""
-        self.cache[key] = {
-            'data': data,
-            'expiry': datetime.now() + timedelta(seconds=ttl)
-        }
-        self._save_to_disk()
+        data, state = self.lookup(key)
+        return data if state == 'hit' else None
+
+    def add(self, key, data, ttl):
+        """Store data only if key is absent or expired; returns True if stored. Atomic across processes."""
+        try:
+            value = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            now = _now()
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT expiry FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] > now:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expiry, accessed, stale_until) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now + ttl, now, now + ttl)
+                )
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            print(f"Error saving cache: {str(e)}")
+            return False
+
+    def set(self, key, data, ttl, stale_ttl=0):
+        """Store data in cache with time-to-live (ttl) in seconds, servable as stale for stale_ttl more"""
+        try:
+            value = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            now = _now()
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expiry, accessed, stale_until) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now + ttl, now, now + ttl + stale_ttl)
+                )
+                # Already holding the write lock, so the noted reads go in before evicting
+                self._write_accessed(conn, self._take_accessed(now))
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            print(f"Error saving cache: {str(e)}")
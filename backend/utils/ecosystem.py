@@ -0,0 +1,180 @@
+import hashlib
+import json
+import threading
+import time
+
+import lxml.html
+from lxml import etree
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_CONTAINER = etree.XPath('//div[@id="projects_results"]')
+_ITEMS = etree.XPath(f'.//div[{_has_class("grid__item")}]')
+_PICTURE_HREF = etree.XPath('(.//picture)[1]//a[@href][1]/@href')
+_CONTENT = etree.XPath(f'(.//div[{_has_class("content")}])[1]')
+_FIRST = {tag: etree.XPath(f'(.//{tag})[1]') for tag in ('a', 'h3', 'p')}
+_TAGS = etree.XPath(f'(.//ul[{_has_class("tags")}])[1]//li')
+
+
+def _text(element):
+    # Same result as BeautifulSoup's get_text(strip=True)
+    return ''.join(text.strip() for text in element.itertext())
+
+
+def _first(element, tag):
+    found = _FIRST[tag](element) if element is not None else []
+    return found[0] if found else None
+
+
+def parse_projects(html):
+    """
+    Extract the projects from the ecosystem page markup with lxml: for each `grid__item` in
+    `#projects_results`, its name, link, description, category tags and language tags.
+    Returns None when the container is missing.
+    """
+    containers = _CONTAINER(lxml.html.fromstring(html))
+    if not containers:
+        return None
+
+    projects = []
+    for item in _ITEMS(containers[0]):
+        hrefs = _PICTURE_HREF(item)
+
+        name = description = None
+        content = _CONTENT(item)
+        if content:
+            a_content = _first(content[0], 'a')
+            h3 = _first(a_content, 'h3')
+            p = _first(a_content, 'p')
+            name = _text(h3) if h3 is not None else None
+            description = _text(p) if p is not None else None
+            # Fallback in case the description isn't inside the <a> tag
+            if not description:
+                p = _first(content[0], 'p')
+                if p is not None:
+                    description = _text(p)
+
+        categories = []
+        languages = []
+        for li in _TAGS(item):
+            classes = (li.get('class') or '').split()
+            if 'tag__cat' in classes:
+                categories.append(_text(li))
+            elif 'tag__lang' in classes:
+                languages.append(_text(li))
+
+        projects.append({
+            "name": name,
+            "link": str(hrefs[0]) if hrefs else None,
+            "description": description,
+            "categories": categories,
+            "languages": languages,
+        })
+    return projects
+
+
+def project_key(project):
+    return project.get("link") or project.get("name")
+
+
+class EcosystemCatalog:
+    """
+    In-memory index of ecosystem projects by key, category and language.
+
+    Indexes hold references to the same project dicts, and `replace` builds new indexes and
+    swaps them in at once, so lookups are O(1) dict reads that never copy projects and
+    readers never see a half-built catalog. Callers must treat returned data as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._set({}, {}, {}, {})
+        self.version = 0
+        self.fingerprint = None  # Content hash, equal across workers holding the same projects
+        self.etag = None
+        self.last_modified = None
+        self.checked_at = 0
+
+    def _set(self, projects, by_category, by_language, grouped):
+        self._projects = projects
+        self._by_category = by_category
+        self._by_language = by_language
+        self._grouped = grouped
+
+    def __len__(self):
+        return len(self._projects)
+
+    def get(self, key):
+        return self._projects.get(key)
+
+    def in_category(self, category):
+        return self._by_category.get(category, ())
+
+    def in_language(self, language):
+        return self._by_language.get(language, ())
+
+    @property
+    def categories(self):
+        return self._by_category.keys()
+
+    @property
+    def languages(self):
+        return self._by_language.keys()
+
+    def grouped(self):
+        """Category -> projects, the shape `group_projects_by_category` returns"""
+        return self._grouped
+
+    def diff(self, projects):
+        """(added, changed, removed) project dicts between the catalog and `projects`"""
+        current = self._projects
+        incoming = {project_key(project): project for project in projects}
+        added = [project for key, project in incoming.items() if key not in current]
+        changed = [project for key, project in incoming.items() if key in current and current[key] != project]
+        removed = [project for key, project in current.items() if key not in incoming]
+        return added, changed, removed
+
+    def replace(self, projects, etag=None, last_modified=None):
+        """Swap in a new project list; returns its diff against the previous one"""
+        changes = self.diff(projects)
+        projects_by_key = {}
+        by_category = {}
+        by_language = {}
+        for project in projects:
+            projects_by_key[project_key(project)] = project
+            for category in project.get("categories", []):
+                by_category.setdefault(category, []).append(project)
+            for language in project.get("languages", []):
+                by_language.setdefault(language, []).append(project)
+
+        fingerprint = hashlib.sha1(json.dumps(projects, sort_keys=True).encode('utf-8')).hexdigest()
+
+        with self._lock:
+            self._set(
+                projects_by_key,
+                {category: tuple(items) for category, items in by_category.items()},
+                {language: tuple(items) for language, items in by_language.items()},
+                by_category,
+            )
+            self.version += 1
+            self.fingerprint = fingerprint
+            self.etag = etag
+            self.last_modified = last_modified
+            self.checked_at = time.time()
+        return changes
+
+    def snapshot(self):
+        """Picklable state for persisting the catalog between processes"""
+        return {
+            'projects': list(self._projects.values()),
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'checked_at': self.checked_at,
+        }
+
+    def load(self, snapshot):
+        self.replace(snapshot['projects'], snapshot.get('etag'), snapshot.get('last_modified'))
+        self.checked_at = snapshot.get('checked_at', 0)
@@ -0,0 +1,26 @@
+import httpx
+from config import Config
+
+_client = None
+
+
+def get_async_client():
+    """Return the process-wide async HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(max(Config.SOURCE_TIMEOUTS.values())),
+            limits=httpx.Limits(
+                max_connections=Config.MAX_CONCURRENCY,
+                max_keepalive_connections=Config.MAX_CONCURRENCY
+            )
+        )
+    return _client
+
+
+async def close_async_client():
+    """Close the shared client (called on application shutdown)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
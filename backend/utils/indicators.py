@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+
+def validate_closes(closes):
+    """Ensure data quality before analysis; returns the closes as a float array"""
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(closes) < 2:
+        raise ValueError("Insufficient data points")
+    if np.any(closes <= 0):
+        raise ValueError("Invalid prices (zero or negative)")
+    return closes
+
+
+def align_batch(batch):
+    """
+    Stack a 2-D (time x symbols) array or a ragged list of 1-D close arrays into one
+    matrix. Shorter series are right-aligned and front-padded with NaN, which rolling
+    and EWM windows skip, so every column's last row matches computing it alone.
+    Returns (matrix, lengths).
+    """
+    if isinstance(batch, np.ndarray) and batch.ndim == 2:
+        matrix = np.asarray(batch, dtype=np.float64)
+        lengths = np.count_nonzero(~np.isnan(matrix), axis=0)
+        return matrix, lengths
+
+    series = [np.asarray(closes, dtype=np.float64) for closes in batch]
+    lengths = np.array([len(closes) for closes in series], dtype=np.int64)
+    matrix = np.full((int(lengths.max()) if len(series) else 0, len(series)), np.nan)
+    for i, closes in enumerate(series):
+        if len(closes):
+            matrix[-len(closes):, i] = closes
+    return matrix, lengths
+
+
+class IndicatorEngine:
+    """
+    Computes every configured indicator for one or many close series in a single pass.
+
+    Each EMA span (including the MACD fast/slow spans) is computed once and shared, and
+    all symbols are processed as columns of one matrix by pandas' vectorized windows.
+    """
+
+    def __init__(self, sma_windows=(3, 5), ema_windows=(5, 10), rsi_window=14, macd_spans=(12, 26, 9)):
+        self.sma_windows = list(sma_windows)
+        self.ema_windows = list(ema_windows)
+        self.rsi_window = rsi_window
+        self.macd_spans = macd_spans
+
+    def compute(self, closes, full=False):
+        """Indicators for a single close series, in the MarketAnalyst.analyze_trends layout"""
+        result = self.compute_batch([validate_closes(closes)], full=full)
+        summary = self.summary(result, 0)
+        if full:
+            summary['series'] = {name: values[:, 0] for name, values in result['series'].items()}
+        return summary
+
+    def compute_batch(self, batch, full=False):
+        """
+        Indicators for many series at once.
+
+        `batch` is a (time x symbols) array or a list of 1-D close arrays. Returns last values
+        as arrays of shape (symbols,), plus full (time x symbols) series when `full` is set.
+        Columns that fail validation are reported in `errors` and left as NaN.
+        """
+        matrix, lengths = align_batch(batch)
+        errors = {}
+        for i in range(matrix.shape[1]):
+            column = matrix[:, i]
+            if lengths[i] < 2:
+                errors[i] = "Insufficient data points"
+            elif np.any(column[~np.isnan(column)] <= 0):
+                errors[i] = "Invalid prices (zero or negative)"
+        if errors:
+            matrix = matrix.copy()
+            matrix[:, list(errors)] = np.nan
+
+        frame = pd.DataFrame(matrix)
+        series = {}
+        for w in self.sma_windows:
+            series[f'sma_{w}'] = frame.rolling(w).mean().to_numpy()
+
+        fast, slow, signal_span = self.macd_spans
+        emas = {}
+        for span in dict.fromkeys(self.ema_windows + [fast, slow]):
+            emas[span] = frame.ewm(span=span, adjust=False).mean()
+        for w in self.ema_windows:
+            series[f'ema_{w}'] = emas[w].to_numpy()
+
+        macd = emas[fast] - emas[slow]
+        series['macd'] = macd.to_numpy()
+        series['macd_signal'] = macd.ewm(span=signal_span, adjust=False).mean().to_numpy()
+
+        deltas = frame.diff()
+        avg_gain = deltas.clip(lower=0).rolling(self.rsi_window).mean().to_numpy()
+        avg_loss = (-deltas.clip(upper=0)).rolling(self.rsi_window).mean().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            series['rsi'] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        result = {
+            'lengths': lengths,
+            'errors': errors,
+            'close': matrix[-1] if len(matrix) else np.full(matrix.shape[1], np.nan),
+        }
+        result.update({name: values[-1] if len(values) else np.full(matrix.shape[1], np.nan)
+                       for name, values in series.items()})
+        if full:
+            result['series'] = series
+        return result
+
+    def summary(self, result, i):
+        """sma/ema/rsi/macd entries for column i, rounded like MarketAnalyst's calculate_* methods"""
+        if i in result['errors']:
+            raise ValueError(result['errors'][i])
+        length = result['lengths'][i]
+        return {
+            "sma": {w: round(result[f'sma_{w}'][i], 4) for w in self.sma_windows},
+            "ema": {w: round(result[f'ema_{w}'][i], 4) for w in self.ema_windows},
+            "rsi": round(result['rsi'][i], 2) if length >= self.rsi_window else None,
+            "macd": {
+                "macd": round(result['macd'][i], 4),
+                "signal": round(result['macd_signal'][i], 4)
+            } if length >= self.macd_spans[1] else None
+        }
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+
+from cachetools import TTLCache
+
+from config import Config
+from utils.metrics import record_cache, record_error
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so prompts differing only in indentation share a cache entry"""
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+class GroqBackend:
+    """ChatGroq, built on first use; retries and timeouts are handled by the gateway"""
+
+    def __init__(self, model_name, temperature, timeout):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.timeout = timeout
+        self._llm = None
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from langchain_groq import ChatGroq
+            self._llm = ChatGroq(
+                temperature=self.temperature, model_name=self.model_name,
+                groq_api_key=os.getenv('GROQ_API_KEY'), timeout=self.timeout, max_retries=0
+            )
+        return self._llm
+
+    def invoke(self, prompt):
+        return self.llm.invoke(prompt).content
+
+    async def ainvoke(self, prompt):
+        return (await self.llm.ainvoke(prompt)).content
+
+    async def astream(self, prompt):
+        async for chunk in self.llm.astream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+class StubBackend:
+    """
+    Deterministic offline backend. Returns `responses[i]` for the first prompt containing
+    key `i`, else `default`; when `default` is None the reply is derived from the prompt hash.
+    """
+
+    def __init__(self, responses=None, default=None, model_name="stub", temperature=0.0):
+        self.responses = responses or {}
+        self.default = default
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        for key, response in self.responses.items():
+            if key in prompt:
+                return response
+        if self.default is not None:
+            return self.default
+        return f"stub-{hashlib.sha256(prompt.encode()).hexdigest()[:12]}"
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+    async def astream(self, prompt):
+        for chunk in re.split(r'(?<=\s)', self.invoke(prompt)):
+            if chunk:
+                yield chunk
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token, returning how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class LLMGateway:
+    """
+    Single entry point for every LLM call.
+
+    Responses are cached by normalized prompt + model + temperature (TTL with LRU
+    eviction), calls are capped by one concurrency limit shared by sync and async
+    callers, and a token bucket keeps the request rate within the provider's limits.
+    Failed calls are retried with exponential backoff. Each attempt is bounded by `timeout`,
+    and no retry starts that could not finish within `deadline` of the call starting, so
+    callers can budget for the whole call. cache_size=0 disables caching.
+    """
+
+    def __init__(self, backend, cache_size=1024, cache_ttl=900, max_concurrency=4,
+                 requests_per_minute=30, timeout=10, retries=2, deadline=25):
+        self.backend = backend
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.cache_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.bucket = TokenBucket(requests_per_minute / 60, max(1, max_concurrency))
+        self.timeout = timeout
+        self.retries = retries
+        self.deadline = deadline
+
+    def _key(self, prompt):
+        raw = f"{self.backend.model_name}\x00{self.backend.temperature}\x00{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _cached(self, key):
+        with self.cache_lock:
+            response = self.cache.get(key)
+        record_cache('llm', 'miss' if response is None else 'hit')
+        return response
+
+    def _store(self, key, response):
+        if not self.cache.maxsize:
+            return
+        with self.cache_lock:
+            self.cache[key] = response
+
+    def invoke(self, prompt):
+        """Return the completion text for `prompt`"""
+        key = self._key(prompt)
+        response = self._cached(key)
+        if response is not None:
+            return response
+
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                with self.slots:
+                    response = self.backend.invoke(prompt)
+                break
+            except Exception as e:
+                record_error('llm_gateway.invoke', 'llm', error=e)
+                if not self._can_retry(attempt, deadline):
+                    raise
+                time.sleep(2 ** attempt)
+        self._store(key, response)
+        return response
+
+    def _can_retry(self, attempt, deadline):
+        # A retry must have time for its backoff sleep and a full attempt
+        return attempt < self.retries and time.monotonic() + 2 ** attempt + self.timeout <= deadline
+
+    async def _acquire_slot(self):
+        # The slot semaphore is shared with sync callers in worker threads, so poll it
+        # instead of blocking the event loop
+        delay = 0.005
+        while not self.slots.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    async def ainvoke(self, prompt):
+        """Async variant of invoke"""
+        key = self._key(prompt)
+        response = self._cached(key)
+        if response is not None:
+            return response
+
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.retries + 1):
+            await self.bucket.aacquire()
+            await self._acquire_slot()
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"LLM call exceeded its {self.deadline}s deadline")
+                response = await asyncio.wait_for(self.backend.ainvoke(prompt), min(self.timeout, remaining))
+                break
+            except Exception as e:
+                record_error('llm_gateway.invoke', 'llm', error=e)
+                if not self._can_retry(attempt, deadline):
+                    raise
+            finally:
+                self.slots.release()
+            await asyncio.sleep(2 ** attempt)
+        self._store(key, response)
+        return response
+
+    async def astream(self, prompt):
+        """
+        Yield completion chunks as the backend produces them. A cached response is yielded
+        whole; a completed stream is cached like ainvoke. Streams are not retried, since
+        chunks may already have reached the caller.
+        """
+        key = self._key(prompt)
+        response = self._cached(key)
+        if response is not None:
+            yield response
+            return
+
+        await self.bucket.aacquire()
+        await self._acquire_slot()
+        chunks = []
+        try:
+            async for chunk in self.backend.astream(prompt):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            record_error('llm_gateway.stream', 'llm', error=e)
+            raise
+        finally:
+            self.slots.release()
+        self._store(key, "".join(chunks))
+
+    async def abatch(self, prompts):
+        """Complete many prompts concurrently (within the gateway's limits); order is preserved"""
+        return await asyncio.gather(*(self.ainvoke(prompt) for prompt in prompts))
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def build_backend(name=None):
+    name = name or Config.LLM_BACKEND
+    if name == 'stub':
+        return StubBackend(model_name=Config.LLM_MODEL, temperature=Config.LLM_TEMPERATURE)
+    return GroqBackend(Config.LLM_MODEL, Config.LLM_TEMPERATURE, Config.LLM_ATTEMPT_TIMEOUT)
+
+
+def get_llm_gateway():
+    """The process-wide gateway shared by all agents"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                build_backend(),
+                cache_size=Config.LLM_CACHE_SIZE,
+                cache_ttl=Config.LLM_CACHE_TTL,
+                max_concurrency=Config.LLM_MAX_CONCURRENCY,
+                requests_per_minute=Config.LLM_REQUESTS_PER_MINUTE,
+                timeout=Config.LLM_ATTEMPT_TIMEOUT,
+                deadline=Config.LLM_DEADLINE,
+            )
+        return _gateway
@@ -1,16 +1,125 @@
-from collections import defaultdict
-from cachetools import TTLCache
+import asyncio
+import inspect
+from collections import defaultdict, deque
+from fnmatch import fnmatchcase
+
+from config import Config
+
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+
+class Subscription:
+    """
+    One subscriber's bounded queue of (channel, message) pairs for a channel pattern.
+
+    Patterns are shell-style wildcards matched against the channel name, e.g.
+    `snapshots.*` or `*`. When the queue is full, `drop_oldest` discards the oldest
+    pending message and `block` makes the publisher wait for room.
+    """
+
+    def __init__(self, bus, pattern, maxsize=Config.BUS_QUEUE_SIZE, overflow=Config.BUS_OVERFLOW):
+        if overflow not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.bus = bus
+        self.pattern = pattern
+        self.overflow = overflow
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, channel):
+        return fnmatchcase(channel, self.pattern)
+
+    def put_nowait(self, item):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def put(self, item):
+        if self.overflow == BLOCK:
+            await self.queue.put(item)
+        else:
+            self.put_nowait(item)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
 
 
 class MessageBus:
-    def __init__(self):
-        self.channels = defaultdict(list)
-        self.cache = TTLCache(maxsize=100, ttl=300)
+    """
+    Asyncio publish/subscribe bus.
+
+    Every subscriber has its own bounded queue, so publishing never runs subscriber code on
+    the publisher's call stack; a slow subscriber only falls behind (or, with `block`, holds
+    back the publisher). The last `replay` messages of each channel are kept for new
+    subscribers. Must be used from the event loop.
+    """
+
+    def __init__(self, replay=Config.BUS_REPLAY):
+        self.subscriptions = []
+        self.history = defaultdict(lambda: deque(maxlen=replay))
+        self._tasks = set()
+
+    async def publish(self, channel, message):
+        self.history[channel].append(message)
+        for subscription in list(self.subscriptions):
+            if subscription.matches(channel):
+                await subscription.put((channel, message))
+
+    def last(self, channel):
+        """Most recent message on a channel, or None"""
+        history = self.history.get(channel)
+        return history[-1] if history else None
+
+    def open(self, pattern, replay=0, maxsize=Config.BUS_QUEUE_SIZE, overflow=Config.BUS_OVERFLOW):
+        """Subscribe a queue to a channel pattern, pre-filled with up to `replay` past messages per channel"""
+        subscription = Subscription(self, pattern, maxsize, overflow)
+        if replay:
+            for channel, history in list(self.history.items()):
+                if subscription.matches(channel):
+                    for message in list(history)[-replay:]:
+                        subscription.put_nowait((channel, message))
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def subscribe(self, pattern, callback, replay=0, maxsize=Config.BUS_QUEUE_SIZE, overflow=Config.BUS_OVERFLOW):
+        """
+        Run `callback(message)` for each message on matching channels in a background task.
+        Callbacks may be sync or async; their exceptions are logged and do not reach the publisher.
+        """
+        subscription = self.open(pattern, replay, maxsize, overflow)
+
+        async def consume():
+            async for channel, message in subscription:
+                try:
+                    result = callback(message)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"Subscriber to {channel} failed: {e}")
+
+        task = asyncio.create_task(consume())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return subscription
 
-    def publish(self, channel, message):
-        self.cache[channel] = message
-        for callback in self.channels[channel]:
-            callback(message)
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
 
-    def subscribe(self, channel, callback):
-        self.channels[channel].append(callback)
\ No newline at end of file
+    async def close(self):
+        """Drop every subscription and stop the callback tasks"""
+        self.subscriptions.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
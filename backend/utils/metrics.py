@@ -0,0 +1,137 @@
+import contextvars
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from config import Config
+
+STAGE_LATENCY = Histogram(
+    'gfin_stage_duration_seconds', 'Latency of agent methods and upstream calls',
+    ['stage', 'source', 'symbol'],
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+)
+STAGE_ERRORS = Counter(
+    'gfin_stage_errors_total', 'Agent method and upstream call failures (including timeouts)',
+    ['stage', 'source', 'symbol']
+)
+CACHE_LOOKUPS = Counter('gfin_cache_lookups_total', 'Read-through cache lookups by result', ['source', 'state'])
+REQUEST_LATENCY = Histogram('gfin_request_duration_seconds', 'HTTP request latency', ['method', 'path', 'status'])
+IN_FLIGHT = Gauge('gfin_requests_in_flight', 'HTTP requests currently being served')
+COALESCED_CALLS = Counter(
+    'gfin_coalesced_calls_total', 'Coalesced calls by whether they ran the work or shared another call',
+    ['kind', 'outcome']
+)
+
+# Per-request (stage, symbol) -> [total seconds, calls]; child tasks and threads share the
+# same dict because asyncio.gather / to_thread copy the context that holds it
+_timings = contextvars.ContextVar('stage_timings', default=None)
+
+
+def _first_report(error):
+    """True the first time an exception is reported, so one failure counts once in STAGE_ERRORS"""
+    if error is None:
+        return True
+    if getattr(error, '_stage_error_counted', False):
+        return False
+    try:
+        error._stage_error_counted = True
+    except AttributeError:
+        pass
+    return True
+
+
+@contextmanager
+def span(stage, source='', symbol=''):
+    """Time a block into STAGE_LATENCY and the current request's Server-Timing breakdown"""
+    if not Config.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        # Counted at the innermost stage it reaches, unless record_error already took it
+        if _first_report(e):
+            STAGE_ERRORS.labels(stage, source, symbol).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage, source, symbol).observe(elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            entry = timings.setdefault((stage, symbol), [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+def timed(stage, source='', symbol_arg=None):
+    """
+    Decorator wrapping a sync or async function in span(). `symbol_arg` names the
+    parameter whose value is used as the symbol label.
+    """
+    def decorator(fn):
+        position = None
+        if symbol_arg:
+            position = list(inspect.signature(fn).parameters).index(symbol_arg)
+
+        def symbol_of(args, kwargs):
+            if symbol_arg is None:
+                return ''
+            if symbol_arg in kwargs:
+                return kwargs[symbol_arg]
+            return args[position] if position < len(args) else ''
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage, source, symbol_of(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, source, symbol_of(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_error(stage, source='', symbol='', error=None):
+    """Count a failure; pass the exception if it is re-raised, so enclosing spans do not count it again"""
+    if Config.METRICS_ENABLED and _first_report(error):
+        STAGE_ERRORS.labels(stage, source, symbol).inc()
+
+
+def record_cache(source, state):
+    if Config.METRICS_ENABLED:
+        CACHE_LOOKUPS.labels(source, state).inc()
+
+
+def record_coalesced(kind, outcome):
+    if Config.METRICS_ENABLED:
+        COALESCED_CALLS.labels(kind, outcome).inc()
+
+
+def start_request():
+    """Begin collecting stage timings for the current request; returns a token for end_request"""
+    return _timings.set({})
+
+
+def end_request(token):
+    """Stop collecting and return the request's Server-Timing header value"""
+    timings = _timings.get() or {}
+    _timings.reset(token)
+    entries = []
+    for (stage, symbol), (total, calls) in sorted(timings.items(), key=lambda item: -item[1][0]):
+        name = f"{stage}.{symbol}" if symbol else stage
+        name = "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+        entries.append(f'{name};dur={total * 1000:.1f};desc="{calls} call(s)"')
+    return ", ".join(entries)
+
+
+def render():
+    """Prometheus text exposition of every metric"""
+    return generate_latest(), CONTENT_TYPE_LATEST
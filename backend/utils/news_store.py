@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import Config
+
+WEEK = 7 * 86400
+
+
+def _timestamp(published_at):
+    """NewsAPI `publishedAt` (ISO 8601, usually with a Z suffix) as epoch seconds"""
+    try:
+        parsed = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return time.time()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class NewsStore:
+    """
+    Local store of NewsAPI articles, backed by SQLite in WAL mode.
+
+    Articles are de-duplicated by URL across queries; `article_queries` indexes which query
+    returned each one by publish time, and an FTS5 index over title and description serves
+    free-text searches (plain LIKE matching when SQLite lacks FTS5). `watermarks` keeps the
+    newest `publishedAt` seen per query so fetches can ask only for newer articles.
+    """
+
+    def __init__(self, filename=Config.NEWS_DB):
+        self.filename = filename
+        self._local = threading.local()  # sqlite3 connections are per-thread
+        self.fts = True
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "url TEXT PRIMARY KEY, source TEXT NOT NULL, published_at TEXT NOT NULL, "
+                "published_ts REAL NOT NULL, title TEXT NOT NULL, description TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_published ON articles (published_ts)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS article_queries ("
+                "query TEXT NOT NULL, url TEXT NOT NULL, published_ts REAL NOT NULL, PRIMARY KEY (query, url))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS article_queries_recent ON article_queries (query, published_ts)")
+            conn.execute("CREATE TABLE IF NOT EXISTS watermarks (query TEXT PRIMARY KEY, newest TEXT NOT NULL)")
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                    "title, description, content='articles', content_rowid='rowid')"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN "
+                    "INSERT INTO articles_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+                    "END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN "
+                    "INSERT INTO articles_fts (articles_fts, rowid, title, description) "
+                    "VALUES ('delete', old.rowid, old.title, old.description); "
+                    "END"
+                )
+            except sqlite3.OperationalError as e:
+                print(f"SQLite FTS5 unavailable, news search falls back to LIKE: {e}")
+                self.fts = False
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def watermark(self, query):
+        """Newest `publishedAt` stored for a query, or None if it was never fetched"""
+        row = self._connect().execute("SELECT newest FROM watermarks WHERE query = ?", (query,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, query, articles, watermark=None):
+        """
+        Store NewsAPI articles found by `query`, skipping URLs already stored; returns how many
+        were new. The query's watermark moves up to `watermark` (default: the newest article).
+        """
+        rows = []
+        for article in articles:
+            url = article.get('url')
+            if not url:
+                continue
+            published_at = article.get('publishedAt') or 'Unknown date'
+            rows.append({
+                'url': url,
+                'source': (article.get('source') or {}).get('name') or 'Unknown source',
+                'published_at': published_at,
+                'published_ts': _timestamp(published_at),
+                'title': article.get('title') or 'No title',
+                'description': article.get('description') or 'No description',
+            })
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # rowcount leaves out the FTS trigger's writes, which total_changes would include
+            added = conn.executemany(
+                "INSERT OR IGNORE INTO articles (url, source, published_at, published_ts, title, description) "
+                "VALUES (:url, :source, :published_at, :published_ts, :title, :description)",
+                rows
+            ).rowcount
+            conn.executemany(
+                "INSERT OR IGNORE INTO article_queries (query, url, published_ts) VALUES (:query, :url, :published_ts)",
+                [{**row, 'query': query} for row in rows]
+            )
+            newest = watermark or max(
+                (row['published_at'] for row in rows if row['published_at'] != 'Unknown date'), default=''
+            )
+            conn.execute(
+                "INSERT INTO watermarks (query, newest) VALUES (?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET newest = MAX(newest, excluded.newest)",
+                (query, newest)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def _rows(self, sql, params):
+        rows = self._connect().execute(sql, params).fetchall()
+        return [
+            {'source': row[0], 'published_at': row[1], 'title': row[2], 'description': row[3], 'url': row[4]}
+            for row in rows
+        ]
+
+    def recent(self, query, since=None, until=None, limit=Config.NEWS_ARTICLE_LIMIT):
+        """Articles found by `query` published between `since` and `until` (epoch seconds), newest first"""
+        since = time.time() - WEEK if since is None else since
+        until = time.time() if until is None else until
+        return self._rows(
+            "SELECT a.source, a.published_at, a.title, a.description, a.url FROM article_queries q "
+            "JOIN articles a ON a.url = q.url WHERE q.query = ? AND q.published_ts BETWEEN ? AND ? "
+            "ORDER BY q.published_ts DESC LIMIT ?",
+            (query, since, until, limit)
+        )
+
+    def search(self, text, since=None, until=None, limit=Config.NEWS_ARTICLE_LIMIT):
+        """Full-text search over every stored article's title and description, newest first"""
+        since = time.time() - WEEK if since is None else since
+        until = time.time() if until is None else until
+        if self.fts:
+            # Quote each term so user input cannot inject FTS5 query syntax
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in text.split())
+            return self._rows(
+                "SELECT a.source, a.published_at, a.title, a.description, a.url FROM articles_fts f "
+                "JOIN articles a ON a.rowid = f.rowid WHERE articles_fts MATCH ? "
+                "AND a.published_ts BETWEEN ? AND ? ORDER BY a.published_ts DESC LIMIT ?",
+                (match, since, until, limit)
+            )
+        pattern = f'%{text}%'
+        return self._rows(
+            "SELECT source, published_at, title, description, url FROM articles "
+            "WHERE (title LIKE ? OR description LIKE ?) AND published_ts BETWEEN ? AND ? "
+            "ORDER BY published_ts DESC LIMIT ?",
+            (pattern, pattern, since, until, limit)
+        )
+
+    def prune(self, max_age=4 * WEEK):
+        """Forget articles published more than `max_age` seconds ago"""
+        cutoff = time.time() - max_age
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM article_queries WHERE published_ts < ?", (cutoff,))
+            conn.execute("DELETE FROM articles WHERE published_ts < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
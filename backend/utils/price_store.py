@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+from config import Config
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'market_cap')
+CSV_COLUMNS = ('Start', 'Open', 'High', 'Low', 'Close', 'Volume', 'Market Cap')
+DTYPES = {'timestamp': np.int64}
+
+# Read-only, chronologically sorted column views; `timestamp` is the candle start in epoch seconds
+PriceSeries = namedtuple('PriceSeries', COLUMNS)
+
+
+class HistoricalPriceStore:
+    """
+    Columnar OHLCV store built from historical_data/{SYMBOL}_historical.csv.
+
+    Each symbol is converted once into one raw binary file per column, sorted oldest
+    first, and memory-mapped read-only; callers get zero-copy views. A symbol is only
+    rebuilt when its CSV changes on disk. New candles are appended to both the column
+    files and the CSV, so neither is rewritten. The checked-in CSVs are never written:
+    appends go to a copy under .store/history/, which also holds the CSVs of symbols
+    backfilled from scratch. Appends assume a single writer (the background refresher).
+    """
+
+    def __init__(self, data_dir=Config.HISTORICAL_PRICES_DIR, store_dir=None):
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, '.store')
+        self.history_dir = os.path.join(self.store_dir, 'history')
+        self._series = {}  # symbol -> (csv stat, PriceSeries)
+        self._lock = threading.Lock()
+
+    def _seed_path(self, symbol):
+        return os.path.join(self.data_dir, f"{symbol.upper()}_historical.csv")
+
+    def _history_path(self, symbol):
+        return os.path.join(self.history_dir, f"{symbol.upper()}_historical.csv")
+
+    def _csv_path(self, symbol):
+        # The writable copy once candles were appended, else the checked-in seed
+        path = self._history_path(symbol)
+        return path if os.path.exists(path) else self._seed_path(symbol)
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.store_dir, symbol.upper())
+
+    def _column_path(self, symbol, column):
+        dtype = np.dtype(DTYPES.get(column, np.float64))
+        return os.path.join(self._symbol_dir(symbol), f"{column}.{dtype.str[1:]}")
+
+    def _meta_path(self, symbol):
+        return os.path.join(self._symbol_dir(symbol), 'meta.json')
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def _read_meta(self, symbol):
+        try:
+            with open(self._meta_path(symbol)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, symbol, rows):
+        meta = {'rows': rows, 'csv': self._stat(self._csv_path(symbol))}
+        tmp = self._meta_path(symbol) + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(symbol))
+        return meta
+
+    def _build(self, symbol):
+        """Parse the CSV once into sorted, de-duplicated column files"""
+        df = pd.read_csv(self._csv_path(symbol), encoding='utf-8-sig', usecols=list(CSV_COLUMNS))
+        timestamps = pd.to_datetime(df['Start']).values.astype('datetime64[s]').astype(np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        keep = np.ones(len(timestamps), dtype=bool)
+        keep[1:] = timestamps[1:] != timestamps[:-1]
+
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        for column, csv_column in zip(COLUMNS, CSV_COLUMNS):
+            if column == 'timestamp':
+                values = timestamps[keep]
+            else:
+                values = df[csv_column].to_numpy(dtype=np.float64)[order][keep]
+            path = self._column_path(symbol, column)
+            values.tofile(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        return self._write_meta(symbol, int(keep.sum()))
+
+    def _map(self, symbol, rows):
+        columns = {}
+        for column in COLUMNS:
+            dtype = DTYPES.get(column, np.float64)
+            if rows:
+                columns[column] = np.memmap(self._column_path(symbol, column), dtype=dtype, mode='r', shape=(rows,))
+            else:
+                columns[column] = np.empty(0, dtype=dtype)
+        return PriceSeries(**columns)
+
+    def has(self, symbol):
+        return os.path.exists(self._csv_path(symbol))
+
+    def symbols(self):
+        """Symbols with local history, checked in or backfilled"""
+        names = set()
+        for directory in (self.data_dir, self.history_dir):
+            if os.path.isdir(directory):
+                names.update(name.split('_')[0] for name in os.listdir(directory) if name.endswith('_historical.csv'))
+        return sorted(names)
+
+    def create(self, symbol):
+        """Start an empty CSV for a symbol with no history yet, so candles can be appended"""
+        if not self.has(symbol):
+            os.makedirs(self.history_dir, exist_ok=True)
+            with open(self._history_path(symbol), 'x') as f:
+                f.write('Start,End,' + ','.join(CSV_COLUMNS[1:]) + '\n')
+
+    def get(self, symbol):
+        """Return the symbol's PriceSeries, rebuilding its columns only if the CSV changed"""
+        symbol = symbol.upper()
+        csv_stat = self._stat(self._csv_path(symbol))
+        loaded = self._series.get(symbol)
+        if loaded and loaded[0] == csv_stat:
+            return loaded[1]
+
+        with self._lock:
+            meta = self._read_meta(symbol)
+            if meta is None or meta['csv'] != csv_stat:
+                meta = self._build(symbol)
+            series = self._map(symbol, meta['rows'])
+            self._series[symbol] = (meta['csv'], series)
+            return series
+
+    def append(self, symbol, candles):
+        """
+        Append candles newer than the last stored one.
+
+        `candles` is an iterable of dicts with timestamp/open/high/low/close/volume/market_cap.
+        Returns the number of candles appended.
+        """
+        symbol = symbol.upper()
+        series = self.get(symbol)
+        last = series.timestamp[-1] if len(series.timestamp) else None
+        candles = sorted(
+            (c for c in candles if last is None or c['timestamp'] > last),
+            key=lambda c: c['timestamp']
+        )
+        if not candles:
+            return 0
+
+        with self._lock:
+            if not os.path.exists(self._history_path(symbol)):
+                os.makedirs(self.history_dir, exist_ok=True)
+                shutil.copyfile(self._seed_path(symbol), self._history_path(symbol))
+            for column in COLUMNS:
+                values = np.array([c[column] for c in candles], dtype=DTYPES.get(column, np.float64))
+                with open(self._column_path(symbol, column), 'ab') as f:
+                    f.write(values.tobytes())
+            with open(self._csv_path(symbol), 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+            with open(self._csv_path(symbol), 'a') as f:
+                if needs_newline:
+                    f.write('\n')
+                for c in candles:
+                    start = datetime.fromtimestamp(c['timestamp'], tz=timezone.utc)
+                    end = datetime.fromtimestamp(c['timestamp'] + 86400, tz=timezone.utc)
+                    f.write(
+                        f"{start:%Y-%m-%d},{end:%Y-%m-%d},{c['open']},{c['high']},{c['low']},"
+                        f"{c['close']},{c['volume']},{c['market_cap']}\n"
+                    )
+            meta = self._write_meta(symbol, len(series.timestamp) + len(candles))
+            self._series[symbol] = (meta['csv'], self._map(symbol, meta['rows']))
+        return len(candles)
+
+    def fetch_latest(self, symbol):
+        """Append daily candles published since the last stored one from Config.HISTORICAL_API_URL"""
+        symbol = symbol.upper()
+        series = self.get(symbol)
+        params = {'symbol': symbol, 'interval': 'daily', 'convert': 'USD'}
+        if len(series.timestamp):
+            params['time_start'] = int(series.timestamp[-1]) + 86400
+        try:
+            response = requests.get(
+                Config.HISTORICAL_API_URL,
+                headers={'X-CMC_PRO_API_KEY': Config.COINMARKETCAP_API_KEY},
+                params=params,
+                timeout=Config.SOURCE_TIMEOUTS['history']
+            )
+            response.raise_for_status()
+            return self.append(symbol, self._parse_quotes(response.json(), symbol))
+        except Exception as e:
+            print(f"Historical quote request failed for {symbol}: {e}")
+            return 0
+
+    @staticmethod
+    def _parse_quotes(payload, symbol):
+        # quotes/historical returns price points, not OHLC, so each point becomes a flat candle
+        data = payload.get('data', {})
+        entry = data.get(symbol, data)
+        if isinstance(entry, list):
+            entry = entry[0] if entry else {}
+        candles = []
+        for point in entry.get('quotes', []):
+            usd = point.get('quote', {}).get('USD', {})
+            price = usd.get('price')
+            if price is None:
+                continue
+            day = pd.Timestamp(point['timestamp']).normalize()
+            candles.append({
+                'timestamp': int(day.timestamp()),
+                'open': price,
+                'high': price,
+                'low': price,
+                'close': price,
+                'volume': usd.get('volume_24h') or 0.0,
+                'market_cap': usd.get('market_cap') or 0.0,
+            })
+        return candles
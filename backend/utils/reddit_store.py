@@ -0,0 +1,248 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from config import Config
+from utils.metrics import record_error
+
+WEEK = 7 * 86400
+
+
+class RedditStore:
+    """
+    Local index of Reddit submissions, backed by SQLite in WAL mode.
+
+    Posts are keyed by submission id; `matches` records which search query found each one,
+    indexed by (query, created) so "last N days for a query" is a single index range scan.
+    `watermarks` holds the newest post seen per query and doubles as a cross-worker lease.
+    """
+
+    def __init__(self, filename=Config.REDDIT_DB):
+        self.filename = filename
+        self._local = threading.local()  # sqlite3 connections are per-thread
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "id TEXT PRIMARY KEY, title TEXT NOT NULL, content TEXT NOT NULL, upvotes INTEGER NOT NULL, "
+                "comments INTEGER NOT NULL, created REAL NOT NULL, votes_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                "query TEXT NOT NULL, id TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (query, id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS matches_recent ON matches (query, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS posts_votes_at ON posts (votes_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                "query TEXT PRIMARY KEY, newest REAL NOT NULL DEFAULT 0, ingested_at REAL NOT NULL DEFAULT 0, "
+                "claimed_at REAL NOT NULL DEFAULT 0)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def watermark(self, query):
+        """Creation time of the newest stored post for a query, or None if it was never ingested"""
+        row = self._connect().execute(
+            "SELECT newest FROM watermarks WHERE query = ? AND ingested_at > 0", (query,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim(self, query, interval):
+        """Atomically take the right to refresh `query` if nobody did within `interval` seconds"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("INSERT OR IGNORE INTO watermarks (query) VALUES (?)", (query,))
+        cursor = conn.execute(
+            "UPDATE watermarks SET claimed_at = ? WHERE query = ? AND claimed_at <= ?",
+            (now, query, now - interval)
+        )
+        return cursor.rowcount == 1
+
+    def add_posts(self, query, posts):
+        """Insert new posts (or refresh known ones) and advance the query's watermark"""
+        if not posts:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO posts (id, title, content, upvotes, comments, created, votes_at) "
+                "VALUES (:id, :title, :content, :upvotes, :comments, :created, :votes_at) "
+                "ON CONFLICT(id) DO UPDATE SET upvotes = excluded.upvotes, comments = excluded.comments, "
+                "votes_at = excluded.votes_at",
+                [{**post, 'votes_at': now} for post in posts]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO matches (query, id, created) VALUES (?, ?, ?)",
+                [(query, post['id'], post['created']) for post in posts]
+            )
+            conn.execute(
+                "INSERT INTO watermarks (query, newest) VALUES (?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET newest = MAX(newest, excluded.newest)",
+                (query, max(post['created'] for post in posts))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def mark_ingested(self, query):
+        """Record that a query was searched, even if it found nothing new"""
+        self._connect().execute(
+            "INSERT INTO watermarks (query, ingested_at) VALUES (?, ?) "
+            "ON CONFLICT(query) DO UPDATE SET ingested_at = excluded.ingested_at",
+            (query, time.time())
+        )
+
+    def recent(self, query, max_age=WEEK, limit=50):
+        """Posts matching `query` created within `max_age` seconds, most upvoted first"""
+        rows = self._connect().execute(
+            "SELECT p.id, p.title, p.content, p.upvotes, p.comments, p.created FROM matches m "
+            "JOIN posts p ON p.id = m.id WHERE m.query = ? AND m.created >= ? "
+            "ORDER BY p.upvotes DESC LIMIT ?",
+            (query, time.time() - max_age, limit)
+        ).fetchall()
+        return [
+            {'id': row[0], 'title': row[1], 'content': row[2], 'upvotes': row[3], 'comments': row[4], 'created': row[5]}
+            for row in rows
+        ]
+
+    def stale_votes(self, max_age, limit, window=WEEK):
+        """Ids of posts from the last `window` seconds whose counts are older than `max_age`"""
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT id FROM posts WHERE votes_at < ? AND created >= ? ORDER BY votes_at LIMIT ?",
+            (now - max_age, now - window, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def update_votes(self, counts):
+        """counts: iterable of (id, upvotes, comments)"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE posts SET upvotes = ?, comments = ?, votes_at = ? WHERE id = ?",
+                [(upvotes, comments, now, post_id) for post_id, upvotes, comments in counts]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def prune(self, max_age=2 * WEEK):
+        """Forget posts older than `max_age` seconds"""
+        cutoff = time.time() - max_age
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM matches WHERE created < ?", (cutoff,))
+            conn.execute("DELETE FROM posts WHERE created < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def reddit_query(symbol):
+    return f'{symbol} cryptocurrency'
+
+
+class RedditIngestor:
+    """
+    Pulls new submissions per query into a RedditStore, off the request path.
+
+    Each ingest searches newest-first and stops at the query's watermark, so a cycle only
+    pages through posts made since the last one. Vote and comment counts of stored posts
+    are refreshed separately, in batched `info()` lookups at a lower rate.
+    """
+
+    def __init__(self, reddit_factory, store, interval=Config.REDDIT_INGEST_INTERVAL,
+                 vote_interval=Config.REDDIT_VOTE_INTERVAL):
+        self.reddit_factory = reddit_factory  # PRAW client is built on first use
+        self.store = store
+        self.interval = interval
+        self.vote_interval = vote_interval
+        self._tasks = []
+
+    @property
+    def reddit(self):
+        return self.reddit_factory()
+
+    def ingest(self, query, limit=Config.REDDIT_BACKFILL_LIMIT):
+        """Fetch posts newer than the watermark for `query`; returns how many were new"""
+        watermark = self.store.watermark(query) or 0
+        posts = []
+        for submission in self.reddit.subreddit('all').search(query, sort='new', time_filter='week', limit=limit):
+            if submission.created_utc < watermark:
+                break  # Everything from here on is already stored
+            posts.append({
+                'id': submission.id,
+                'title': submission.title,
+                'content': submission.selftext,
+                'upvotes': submission.score,
+                'comments': submission.num_comments,
+                'created': submission.created_utc
+            })
+        self.store.add_posts(query, posts)
+        self.store.mark_ingested(query)
+        return len(posts)
+
+    def refresh_votes(self, max_age=Config.REDDIT_VOTE_INTERVAL, limit=500):
+        """Re-read score and comment counts for posts whose counts are older than `max_age`"""
+        ids = self.store.stale_votes(max_age, limit)
+        counts = []
+        for start in range(0, len(ids), 100):  # info() takes up to 100 fullnames per call
+            fullnames = [f't3_{post_id}' for post_id in ids[start:start + 100]]
+            counts += [(s.id, s.score, s.num_comments) for s in self.reddit.info(fullnames=fullnames)]
+        self.store.update_votes(counts)
+        return len(counts)
+
+    async def _ingest_loop(self, queries):
+        while True:
+            for query in queries:
+                try:
+                    if await asyncio.to_thread(self.store.claim, query, self.interval / 2):
+                        await asyncio.to_thread(self.ingest, query)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    record_error('reddit_ingestor.ingest', 'reddit')
+                    print(f"Reddit ingest for '{query}' failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _vote_loop(self):
+        while True:
+            await asyncio.sleep(self.vote_interval)
+            try:
+                if await asyncio.to_thread(self.store.claim, '__votes__', self.vote_interval / 2):
+                    await asyncio.to_thread(self.refresh_votes)
+                    await asyncio.to_thread(self.store.prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                record_error('reddit_ingestor.refresh_votes', 'reddit')
+                print(f"Reddit vote refresh failed: {e}")
+
+    def start(self, queries):
+        """Start ingesting `queries` on the running event loop"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._ingest_loop(list(queries))), asyncio.create_task(self._vote_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
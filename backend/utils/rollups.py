@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from config import Config
+from utils.price_store import COLUMNS, DTYPES, HistoricalPriceStore, PriceSeries
+
+TIMEFRAMES = {
+    '1h': 3600,
+    '4h': 4 * 3600,
+    '1d': 86400,
+    '1w': 7 * 86400,
+}
+# Weekly buckets start on Monday 00:00 UTC (the epoch was a Thursday)
+_WEEK_ORIGIN = 4 * 86400
+
+
+def bucket_starts(timestamps, timeframe):
+    """Start (epoch seconds) of the `timeframe` bucket each timestamp falls in"""
+    seconds = TIMEFRAMES[timeframe]
+    origin = _WEEK_ORIGIN if timeframe == '1w' else 0
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    return (timestamps - origin) // seconds * seconds + origin
+
+
+def resample(series, timeframe):
+    """
+    OHLCV candles of `series` (a PriceSeries, oldest first) rolled up into `timeframe`
+    buckets: open first, high max, low min, close last, volume summed, market cap last.
+    Every bucket with at least one candle is returned; the last one may still be open.
+    """
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe {timeframe!r}; expected one of {', '.join(TIMEFRAMES)}")
+    if not len(series.timestamp):
+        return PriceSeries(**{column: np.empty(0, dtype=DTYPES.get(column, np.float64)) for column in COLUMNS})
+
+    buckets = bucket_starts(series.timestamp, timeframe)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    return PriceSeries(
+        timestamp=buckets[starts],
+        open=np.asarray(series.open)[starts],
+        high=np.maximum.reduceat(series.high, starts),
+        low=np.minimum.reduceat(series.low, starts),
+        close=np.asarray(series.close)[ends],
+        volume=np.add.reduceat(series.volume, starts),
+        market_cap=np.asarray(series.market_cap)[ends],
+    )
+
+
+class RollupStore:
+    """
+    Precomputed OHLCV rollups of the HistoricalPriceStore candles per symbol and timeframe.
+
+    Closed buckets live next to the symbol's columns (.store/{SYMBOL}/rollup_{timeframe}/) as
+    append-only raw column files, memory-mapped read-only like the candles themselves. Only
+    candles past the last closed bucket are aggregated when new ones arrive; the still-open
+    bucket is aggregated from those few candles on read. A rollup is rebuilt from scratch
+    if the candles it was built from change. Updates assume a single writer: they run in
+    DataCollector.sync_universe under its backfill lease, right after candles are appended.
+    Reads never write, and share the collector's instance so they see its lock.
+    """
+
+    def __init__(self, price_store=None, timeframes=Config.ROLLUP_TIMEFRAMES):
+        self.price_store = price_store or HistoricalPriceStore()
+        self.timeframes = list(timeframes)
+        self._views = {}  # (symbol, timeframe) -> ((candles, rollup rows, candles consumed), PriceSeries)
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol, timeframe):
+        return os.path.join(self.price_store.store_dir, symbol, f'rollup_{timeframe}')
+
+    def _column_path(self, symbol, timeframe, column):
+        dtype = np.dtype(DTYPES.get(column, np.float64))
+        return os.path.join(self._dir(symbol, timeframe), f"{column}.{dtype.str[1:]}")
+
+    def _read_meta(self, symbol, timeframe):
+        try:
+            with open(os.path.join(self._dir(symbol, timeframe), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, symbol, timeframe, meta):
+        path = os.path.join(self._dir(symbol, timeframe), 'meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _spacing(series):
+        """Seconds between the symbol's closest recent candles (0 with fewer than two)"""
+        spacing = np.diff(np.asarray(series.timestamp[-100:]))
+        return int(spacing.min()) if len(spacing) else 0
+
+    @staticmethod
+    def _valid(meta, series):
+        """Whether a rollup was built from the candles `series` still starts with"""
+        consumed = meta['consumed'] if meta else 0
+        return meta is not None and consumed <= len(series.timestamp) and \
+            (not consumed or int(series.timestamp[consumed - 1]) == meta['checkpoint'])
+
+    def update(self, symbol, timeframes=None):
+        """Fold candles added since the last update into the symbol's rollups (call after appending candles)"""
+        symbol = symbol.upper()
+        series = self.price_store.get(symbol)
+        spacing = self._spacing(series)
+        for timeframe in timeframes or self.timeframes:
+            # Timeframes no coarser than the candles need no rollup
+            if TIMEFRAMES[timeframe] > spacing:
+                self._update(symbol, timeframe, series)
+
+    def _update(self, symbol, timeframe, series):
+        with self._lock:
+            meta = self._read_meta(symbol, timeframe)
+            if not self._valid(meta, series):
+                # Fresh files (replaced, not truncated, so existing memmaps stay readable)
+                os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+                for column in COLUMNS:
+                    path = self._column_path(symbol, timeframe, column)
+                    open(path + '.tmp', 'wb').close()
+                    os.replace(path + '.tmp', path)
+                meta = {'rows': 0, 'consumed': 0, 'checkpoint': None}
+                self._write_meta(symbol, timeframe, meta)
+
+            consumed = meta['consumed']
+            tail = PriceSeries(*(column[consumed:] for column in series))
+            rolled = resample(tail, timeframe)
+            closed = len(rolled.timestamp) - 1  # The last bucket may still receive candles
+            if closed <= 0:
+                return
+            for column in COLUMNS:
+                path = self._column_path(symbol, timeframe, column)
+                # Drop rows a failed update wrote past the metadata
+                os.truncate(path, meta['rows'] * np.dtype(DTYPES.get(column, np.float64)).itemsize)
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(getattr(rolled, column)[:closed]).tobytes())
+            consumed += int(np.searchsorted(bucket_starts(tail.timestamp, timeframe), rolled.timestamp[closed]))
+            self._write_meta(symbol, timeframe, {
+                'rows': meta['rows'] + closed, 'consumed': consumed, 'checkpoint': int(series.timestamp[consumed - 1])
+            })
+
+    def _map(self, symbol, timeframe, rows):
+        columns = {}
+        for column in COLUMNS:
+            dtype = DTYPES.get(column, np.float64)
+            if rows:
+                columns[column] = np.memmap(self._column_path(symbol, timeframe, column), dtype=dtype, mode='r',
+                                            shape=(rows,))
+            else:
+                columns[column] = np.empty(0, dtype=dtype)
+        return columns
+
+    def get(self, symbol, timeframe):
+        """
+        The symbol's candles in `timeframe` buckets (PriceSeries, oldest first). Closed buckets
+        are read from the rollup; candles past it (the open bucket, or everything if the rollup
+        is missing or out of date) are aggregated in memory.
+        """
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe {timeframe!r}; expected one of {', '.join(TIMEFRAMES)}")
+        symbol = symbol.upper()
+        series = self.price_store.get(symbol)
+        spacing = self._spacing(series)
+        if spacing > TIMEFRAMES[timeframe]:
+            raise ValueError(f"{symbol} candles are coarser than {timeframe}")
+        if spacing == TIMEFRAMES[timeframe]:
+            return series
+
+        # Under the update lock, so the metadata and the column files it describes agree
+        with self._lock:
+            meta = self._read_meta(symbol, timeframe)
+            if not self._valid(meta, series):
+                meta = {'rows': 0, 'consumed': 0, 'checkpoint': None}
+            key = (symbol, timeframe)
+            state = (len(series.timestamp), meta['rows'], meta['consumed'])
+            view = self._views.get(key)
+            if view and view[0] == state:
+                return view[1]
+            closed = self._map(symbol, timeframe, meta['rows'])
+
+        pending = resample(PriceSeries(*(column[meta['consumed']:] for column in series)), timeframe)
+        rolled = PriceSeries(**{column: np.concatenate((closed[column], getattr(pending, column)))
+                                for column in COLUMNS})
+        self._views[key] = (state, rolled)
+        return rolled
+
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import random
+import time
+
+from config import Config
+from utils.streaming_indicators import StreamingIndicators
+
+
+def snapshot_key(symbol):
+    return f'{symbol}_snapshot'
+
+
+def live_indicators_key(symbol):
+    return f'{symbol}_live_indicators'
+
+
+def load_snapshots(store, symbols, max_age=Config.SNAPSHOT_MAX_AGE):
+    """Latest precomputed snapshot per symbol, skipping symbols with none younger than max_age"""
+    snapshots = {}
+    now = time.time()
+    for symbol in symbols:
+        snapshot = store.get(snapshot_key(symbol))
+        if snapshot and now - snapshot['updated_at'] <= max_age:
+            snapshots[symbol] = snapshot
+    return snapshots
+
+
+class PrecomputeScheduler:
+    """
+    Keeps every symbol's goal-independent analysis fresh in the background.
+
+    One task per symbol re-collects and re-analyses it every `interval` seconds (+/- jitter),
+    writes the snapshot to the shared store (the SQLite cache, so all workers see it) and
+    publishes it on the bus as `snapshots.{SYMBOL}`; its market indicators are advanced
+    incrementally with the live quote, their state kept in the store. A separate task keeps the quote cache
+    warm with one batched request for all symbols and publishes changed quotes as
+    `prices.{SYMBOL}`; another keeps the ecosystem catalog in sync and publishes project
+    changes as `ecosystem.added|changed|removed`; a slower one keeps the screener's token
+    universe listed and its price histories backfilled. Workers coordinate through a short
+    per-symbol lease in the store so only one of them refreshes a symbol each cycle.
+    Upstream failures back off per source inside DataCollector; a symbol whose refresh
+    fails outright backs off on its own schedule.
+    """
+
+    def __init__(self, collector, market_analyst, news_analyst, bus, symbols,
+                 interval=Config.PRECOMPUTE_INTERVAL, jitter=Config.PRECOMPUTE_JITTER):
+        self.collector = collector
+        self.market_analyst = market_analyst
+        self.news_analyst = news_analyst
+        self.bus = bus
+        self.store = collector.cache
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.jitter = jitter
+        self.worker_id = f"{os.getpid()}-{id(self)}"
+        self._tasks = []
+
+    def _jittered(self, seconds):
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def refresh_symbol(self, symbol):
+        """Collect and analyse one symbol now, then store and publish its snapshot"""
+        crypto_data = await self.collector.aget_crypto_data(symbol)
+        if not crypto_data:
+            raise RuntimeError(f"No data collected for {symbol}")
+
+        # Indicator state is shared through the store, as the next refresh may run in another worker
+        state = await asyncio.to_thread(self.store.get, live_indicators_key(symbol))
+        (market, state), sentiment = await asyncio.gather(
+            asyncio.to_thread(
+                self.market_analyst.analyze_live, symbol, crypto_data['historical_prices'],
+                crypto_data['current_price'].get('price'), state and StreamingIndicators.from_json(state)
+            ),
+            asyncio.to_thread(self.news_analyst.analyze_sentiment, crypto_data['news'])
+        )
+        if state is not None:
+            await asyncio.to_thread(
+                self.store.set, live_indicators_key(symbol), state.to_json(), Config.SNAPSHOT_MAX_AGE
+            )
+        snapshot = {
+            'symbol': symbol,
+            'market': market,
+            'sentiment': sentiment,
+            'social_sentiment': crypto_data.get('social_sentiment', {}),
+            'current_price': crypto_data['current_price'],
+            'updated_at': time.time(),
+        }
+        await asyncio.to_thread(
+            self.store.set, snapshot_key(symbol), snapshot, Config.SNAPSHOT_MAX_AGE, Config.SNAPSHOT_MAX_AGE
+        )
+        await self.bus.publish(f'snapshots.{symbol}', snapshot)
+        return snapshot
+
+    async def _symbol_loop(self, symbol):
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        failures = 0
+        while True:
+            delay = self._jittered(self.interval)
+            try:
+                lease = await asyncio.to_thread(
+                    self.store.add, f'{symbol}_refresh_lease', self.worker_id, self.interval / 2
+                )
+                if lease:
+                    await self.refresh_symbol(symbol)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = self._jittered(min(Config.BACKOFF_MAX, Config.BACKOFF_BASE * 2 ** (failures - 1)))
+                print(f"Precompute for {symbol} failed ({failures}x), retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+
+    async def _quote_loop(self):
+        while True:
+            try:
+                quotes = await self.collector.aget_quotes_batch(self.symbols)
+                for symbol, quote in quotes.items():
+                    if quote != self.bus.last(f'prices.{symbol}'):
+                        await self.bus.publish(f'prices.{symbol}', quote)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Quote refresh failed: {e}")
+            await asyncio.sleep(self._jittered(Config.SOURCE_CACHE_TTLS['quote']))
+
+    async def _ecosystem_loop(self):
+        while True:
+            try:
+                changes = await asyncio.to_thread(self.collector.sync_ecosystem)
+                if changes:
+                    for kind, projects in zip(('added', 'changed', 'removed'), changes):
+                        for project in projects:
+                            await self.bus.publish(f'ecosystem.{kind}', project)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ecosystem refresh failed: {e}")
+            await asyncio.sleep(self._jittered(self.interval))
+
+    async def _universe_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.collector.sync_universe)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Universe refresh failed: {e}")
+            await asyncio.sleep(self._jittered(self.interval * 10))
+
+    def start(self):
+        """Start the refresh tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._quote_loop()), asyncio.create_task(self._ecosystem_loop()),
+                       asyncio.create_task(self._universe_loop())]
+        self._tasks += [asyncio.create_task(self._symbol_loop(symbol)) for symbol in self.symbols]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,160 @@
+import time
+
+import numpy as np
+
+from config import Config
+from utils.indicators import IndicatorEngine
+
+DAY = 86400
+# Metrics results can be sorted by; `rank` sorts by market-cap rank
+SORT_KEYS = ('momentum', 'volatility', 'rsi', 'macd_histogram', 'percent_change_24h', 'volume_24h',
+             'market_cap', 'rank')
+
+
+def _number(value, digits=4):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+class Screener:
+    """
+    Ranks a universe of symbols by indicator criteria.
+
+    Symbols are screened in chunks of `chunk_size`: each chunk's last `lookback` daily closes
+    (from the columnar price store, with the live quote as today's close) form one
+    (lookback x chunk) matrix, and RSI, MACD, momentum and volatility are computed for every
+    column at once. Only the matching rows are kept between chunks, so memory is bounded by
+    the chunk size rather than the universe.
+    """
+
+    def __init__(self, price_store, lookback=Config.SCREEN_LOOKBACK, chunk_size=Config.SCREEN_CHUNK_SIZE,
+                 momentum_window=Config.SCREEN_MOMENTUM_WINDOW, volatility_window=Config.SCREEN_VOLATILITY_WINDOW):
+        self.price_store = price_store
+        self.lookback = lookback
+        self.chunk_size = chunk_size
+        self.momentum_window = momentum_window
+        self.volatility_window = volatility_window
+        self.engine = IndicatorEngine(sma_windows=(), ema_windows=())
+
+    def _matrix(self, symbols, prices):
+        """(lookback x symbols) closes, right-aligned and NaN-padded, with live prices appended as today's close"""
+        matrix = np.full((self.lookback, len(symbols)), np.nan)
+        today = time.time() // DAY * DAY
+        for i, symbol in enumerate(symbols):
+            series = self.price_store.get(symbol)
+            closes = series.close[-self.lookback:]
+            price = prices.get(symbol)
+            if price and (not len(series.timestamp) or series.timestamp[-1] < today):
+                closes = np.append(closes[1:] if len(closes) == self.lookback else closes, price)
+            if len(closes):
+                matrix[-len(closes):, i] = closes
+        return matrix
+
+    def _metrics(self, matrix):
+        """Indicator values per column of a close matrix, NaN where a column has too little history"""
+        result = self.engine.compute_batch(matrix)
+        lengths = result['lengths']
+        fast, slow, signal = self.engine.macd_spans
+        enough_macd = lengths >= slow
+
+        last = matrix[-1]
+        w = self.momentum_window
+        base = matrix[-1 - w] if len(matrix) > w else np.full(matrix.shape[1], np.nan)
+
+        # Annualized standard deviation of the daily log returns in the volatility window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(matrix[-(self.volatility_window + 1):]), axis=0)
+            valid = ~np.isnan(returns)
+            count = valid.sum(axis=0)
+            filled = np.where(valid, returns, 0.0)
+            mean = filled.sum(axis=0) / count
+            variance = (np.where(valid, returns - mean, 0.0) ** 2).sum(axis=0) / (count - 1)
+            volatility = np.where(count >= 2, np.sqrt(variance) * np.sqrt(365), np.nan)
+            momentum = last / base - 1
+
+        return {
+            'price': last,
+            'rsi': np.where(lengths >= self.engine.rsi_window, result['rsi'], np.nan),
+            'macd': np.where(enough_macd, result['macd'], np.nan),
+            'macd_signal': np.where(enough_macd, result['macd_signal'], np.nan),
+            'macd_histogram': np.where(enough_macd, result['macd'] - result['macd_signal'], np.nan),
+            'momentum': momentum,
+            'volatility': volatility,
+        }
+
+    @staticmethod
+    def _mask(metrics, rsi_min, rsi_max, macd, momentum_min, momentum_max, volatility_max):
+        # Comparisons with NaN are False, so a symbol lacking a filtered metric never matches
+        mask = ~np.isnan(metrics['price'])
+        with np.errstate(invalid='ignore'):
+            if rsi_min is not None:
+                mask &= metrics['rsi'] >= rsi_min
+            if rsi_max is not None:
+                mask &= metrics['rsi'] <= rsi_max
+            if macd == 'bullish':
+                mask &= metrics['macd_histogram'] > 0
+            elif macd == 'bearish':
+                mask &= metrics['macd_histogram'] <= 0
+            if momentum_min is not None:
+                mask &= metrics['momentum'] >= momentum_min
+            if momentum_max is not None:
+                mask &= metrics['momentum'] <= momentum_max
+            if volatility_max is not None:
+                mask &= metrics['volatility'] <= volatility_max
+        return mask
+
+    def screen(self, symbols, quotes=None, info=None, rsi_min=None, rsi_max=None, macd=None, momentum_min=None,
+               momentum_max=None, volatility_max=None, sort='momentum', ascending=False, limit=50):
+        """
+        Screen `symbols` and return the matches sorted by `sort`.
+
+        `quotes` are CMC quote objects per symbol (live price and 24h figures) and `info` the
+        registry's name and rank per symbol. `macd` is 'bullish' (MACD above its signal line)
+        or 'bearish'; momentum is the return over the momentum window and volatility is
+        annualized. Symbols without local price history are listed under `without_history`.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort!r}; expected one of {', '.join(SORT_KEYS)}")
+        if macd not in (None, 'bullish', 'bearish'):
+            raise ValueError("macd must be 'bullish' or 'bearish'")
+        quotes = quotes or {}
+        info = info or {}
+        usd = {symbol: quote.get('quote', {}).get('USD', {}) for symbol, quote in quotes.items()}
+        prices = {symbol: values.get('price') for symbol, values in usd.items()}
+
+        with_history = [symbol for symbol in symbols if self.price_store.has(symbol)]
+        without_history = [symbol for symbol in symbols if not self.price_store.has(symbol)]
+        matches = []
+        for start in range(0, len(with_history), self.chunk_size):
+            chunk = with_history[start:start + self.chunk_size]
+            metrics = self._metrics(self._matrix(chunk, prices))
+            mask = self._mask(metrics, rsi_min, rsi_max, macd, momentum_min, momentum_max, volatility_max)
+            for i in np.flatnonzero(mask):
+                symbol = chunk[i]
+                histogram = metrics['macd_histogram'][i]
+                matches.append({
+                    'symbol': symbol,
+                    'name': info.get(symbol, {}).get('name'),
+                    'rank': info.get(symbol, {}).get('rank'),
+                    'price': _number(metrics['price'][i], 8),
+                    'rsi': _number(metrics['rsi'][i], 2),
+                    'macd': _number(metrics['macd'][i]),
+                    'macd_signal': _number(metrics['macd_signal'][i]),
+                    'macd_histogram': _number(histogram),
+                    'macd_state': None if np.isnan(histogram) else 'bullish' if histogram > 0 else 'bearish',
+                    'momentum': _number(metrics['momentum'][i]),
+                    'volatility': _number(metrics['volatility'][i]),
+                    'percent_change_24h': _number(usd.get(symbol, {}).get('percent_change_24h'), 2),
+                    'volume_24h': _number(usd.get(symbol, {}).get('volume_24h'), 2),
+                    'market_cap': _number(usd.get(symbol, {}).get('market_cap'), 2),
+                })
+
+        # Rows missing the sort metric go last either way
+        known = [row for row in matches if row[sort] is not None]
+        unknown = [row for row in matches if row[sort] is None]
+        known.sort(key=lambda row: row[sort], reverse=not ascending)
+        return {
+            'screened': len(with_history),
+            'matched': len(matches),
+            'results': (known + unknown)[:limit],
+            'without_history': without_history,
+        }
@@ -0,0 +1,142 @@
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from cachetools import LRUCache
+
+from config import Config
+from utils.metrics import record_cache
+
+# Per-process analyzers, built on first use (also inside pool workers)
+_analyzers = {}
+
+
+def _textblob_scores(texts):
+    """TextBlob polarity, -1 (negative) to 1 (positive)"""
+    from textblob import TextBlob
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+def _vader_scores(texts):
+    """VADER compound score, -1 to 1"""
+    analyzer = _analyzers.get('vader')
+    if analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        analyzer = _analyzers['vader'] = SentimentIntensityAnalyzer()
+    return [analyzer.polarity_scores(text)['compound'] for text in texts]
+
+
+SCORERS = {
+    'textblob': _textblob_scores,
+    'vader': _vader_scores,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the server forks from a process already running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.SENTIMENT_POOL_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def start_pool():
+    """Create the shared process pool and start its workers now rather than on the first large batch"""
+    if not Config.SENTIMENT_POOL_WORKERS:
+        return
+    try:
+        pool = _get_pool()
+        for future in [pool.submit(abs, 0) for _ in range(Config.SENTIMENT_POOL_WORKERS)]:
+            future.result()
+    except Exception as e:
+        print(f"Sentiment process pool failed to start, large batches will be scored in-process: {e}")
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+class SentimentScorer:
+    """
+    Memoized batch sentiment scoring.
+
+    Scores are cached by a hash of the text, so articles and posts that reappear across
+    requests are scored once. Uncached texts are scored together; batches of at least
+    `pool_threshold` are split across a shared process pool.
+    """
+
+    def __init__(self, method, cache_size=Config.SENTIMENT_CACHE_SIZE,
+                 pool_threshold=Config.SENTIMENT_POOL_THRESHOLD, pool_workers=Config.SENTIMENT_POOL_WORKERS):
+        if method not in SCORERS:
+            raise ValueError(f"Unknown sentiment method: {method}")
+        self.method = method
+        self.score_fn = SCORERS[method]
+        self.cache = LRUCache(maxsize=cache_size) if cache_size else None
+        self.cache_lock = threading.Lock()
+        self.pool_threshold = pool_threshold
+        self.pool_workers = pool_workers
+
+    def _key(self, text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _score_uncached(self, texts):
+        if self.pool_workers and len(texts) >= self.pool_threshold:
+            size = -(-len(texts) // self.pool_workers)
+            chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+            try:
+                return [score for chunk in _get_pool().map(self.score_fn, chunks) for score in chunk]
+            except Exception as e:
+                print(f"Sentiment process pool failed, scoring in-process: {e}")
+        return self.score_fn(texts)
+
+    def scores(self, texts):
+        """Score every text; returns a float array aligned with `texts`"""
+        result = np.empty(len(texts), dtype=float)
+        keys = [self._key(text) for text in texts]
+
+        pending = {}
+        with self.cache_lock:
+            for i, key in enumerate(keys):
+                score = self.cache.get(key) if self.cache is not None else None
+                if score is None:
+                    pending.setdefault(key, []).append(i)
+                else:
+                    result[i] = score
+        hits = len(texts) - sum(len(indexes) for indexes in pending.values())
+        if hits:
+            record_cache(f'sentiment_{self.method}', 'hit')
+        if not pending:
+            return result
+
+        record_cache(f'sentiment_{self.method}', 'miss')
+        new_scores = self._score_uncached([texts[indexes[0]] for indexes in pending.values()])
+        with self.cache_lock:
+            for (key, indexes), score in zip(pending.items(), new_scores):
+                result[indexes] = score
+                if self.cache is not None:
+                    self.cache[key] = score
+        return result
+
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def get_sentiment_scorer(method):
+    """The process-wide scorer for a method ("textblob" or "vader")"""
+    with _scorers_lock:
+        if method not in _scorers:
+            _scorers[method] = SentimentScorer(method)
+        return _scorers[method]
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import Future
+
+from config import Config
+from utils.metrics import record_coalesced
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share one in-flight call.
+
+    `do` coalesces coroutines on the event loop and `call` coalesces blocking functions
+    across threads. Within a process the first caller runs the work and the rest await
+    its result (or exception); a cancelled waiter does not cancel the shared call.
+
+    Given a shared `cache` and a `lease_ttl`, `do` also coalesces across workers: the
+    caller that wins a lease in the cache runs the work, and the others poll `lookup`
+    for the result it stores until the lease is released or expires.
+    """
+
+    def __init__(self, cache=None, poll_interval=Config.COALESCE_POLL_INTERVAL):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self._tasks = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(Counter)
+
+    @property
+    def stats(self):
+        """Calls per kind that ran the work ('led'), joined one in flight ('joined') or used another worker's result ('waited')"""
+        return {kind: dict(counts) for kind, counts in self._stats.items()}
+
+    def _count(self, kind, outcome):
+        self._stats[kind][outcome] += 1
+        record_coalesced(kind, outcome)
+
+    def _release(self, lease):
+        # Expire the lease now so waiting workers stop polling
+        self.cache.set(lease, None, 0)
+
+    async def _lead(self, key, fn, kind, lookup, lease_ttl):
+        if self.cache is None or not lease_ttl or lookup is None:
+            self._count(kind, 'led')
+            return await fn()
+
+        lease = f'singleflight:{key}'
+        while True:
+            found = await asyncio.to_thread(lookup)
+            if found is not None:
+                self._count(kind, 'waited')
+                return found
+            if await asyncio.to_thread(self.cache.add, lease, os.getpid(), lease_ttl):
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            # The previous holder may have stored its result just before releasing the lease
+            found = await asyncio.to_thread(lookup)
+            if found is not None:
+                self._count(kind, 'waited')
+                return found
+            self._count(kind, 'led')
+            return await fn()
+        finally:
+            await asyncio.to_thread(self._release, lease)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every waiter was cancelled
+
+    async def do(self, key, fn, kind='', lookup=None, lease_ttl=0):
+        """
+        Await `fn()` (a coroutine function), sharing the call with concurrent callers of
+        the same key. `lookup` reads the result another worker stored, None if absent.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lead(key, fn, kind, lookup, lease_ttl))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._count(kind, 'joined')
+        return await asyncio.shield(task)
+
+    def call(self, key, fn, kind=''):
+        """Blocking counterpart of `do` for calls made from threads (in-process only)"""
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+        if not leader:
+            self._count(kind, 'joined')
+            return future.result()
+
+        self._count(kind, 'led')
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._futures[key]
+        return future.result()
@@ -0,0 +1,89 @@
+"""
+Startup timing.
+
+At runtime `phase()` records how long each startup step took (importing, building each
+agent, warm-up) for the /startup endpoint. Run as a script to see where import time goes:
+
+    python -m utils.startup            # import main, top 25 packages by cumulative time
+    python -m utils.startup agents.data_collector --top 40
+"""
+import argparse
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_STARTED = time.perf_counter()
+_phases = []
+_lock = threading.Lock()
+_ready_at = None
+
+
+@contextmanager
+def phase(name):
+    """Time a startup step"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _phases.append({'phase': name, 'seconds': round(time.perf_counter() - start, 4)})
+
+
+def mark_ready():
+    global _ready_at
+    _ready_at = time.perf_counter()
+
+
+def report():
+    """Recorded phases and time from process start (first import of this module) to ready"""
+    with _lock:
+        phases = list(_phases)
+    return {
+        'ready': _ready_at is not None,
+        'seconds_to_ready': round(_ready_at - _STARTED, 4) if _ready_at is not None else None,
+        'uptime_seconds': round(time.perf_counter() - _STARTED, 4),
+        'phases': phases,
+    }
+
+
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def import_profile(module='main', top=25):
+    """
+    Import `module` in a fresh interpreter under `-X importtime` and total the self time per
+    top-level package. Returns (total_seconds, [(package, seconds), ...] largest first).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    totals = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            totals[match.group(4).split('.')[0]] += int(match.group(1))
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1], file=sys.stderr)
+    ranked = sorted(((package, micros / 1e6) for package, micros in totals.items()), key=lambda item: -item[1])
+    return sum(totals.values()) / 1e6, ranked[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where import time goes")
+    parser.add_argument('module', nargs='?', default='main')
+    parser.add_argument('--top', type=int, default=25)
+    args = parser.parse_args()
+
+    total, ranked = import_profile(args.module, args.top)
+    print(f"import {args.module}: {total * 1e3:.0f} ms")
+    for package, seconds in ranked:
+        print(f"  {package:30s} {seconds * 1e3:9.1f} ms  {100 * seconds / total if total else 0:5.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+import json
+import math
+from collections import deque
+
+
+class StreamingEMA:
+    """EMA with pandas' adjust=False recursion, seeded by the first value"""
+
+    def __init__(self, span, value=None, prev_value=None):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = value
+        self.prev_value = prev_value  # Before the latest price, so it can be revised
+
+    def _next(self, price):
+        return price if self.prev_value is None else self.alpha * price + (1 - self.alpha) * self.prev_value
+
+    def update(self, price):
+        self.prev_value = self.value
+        self.value = self._next(price)
+        return self.value
+
+    def revise(self, price):
+        """Replace the latest price"""
+        if self.value is None:
+            return self.update(price)
+        self.value = self._next(price)
+        return self.value
+
+    def to_dict(self):
+        return {'span': self.span, 'value': self.value, 'prev_value': self.prev_value}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['span'], state['value'], state.get('prev_value'))
+
+
+class StreamingSMA:
+    """
+    Simple moving average over a ring buffer with a running sum. The sum is recomputed
+    from the buffer every `window` changes, so floating-point drift cannot accumulate
+    (still O(1) amortized per update).
+    """
+
+    def __init__(self, window, values=()):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.total = 0.0
+        self.changes = 0
+        for price in values:
+            self.update(price)
+
+    def _changed(self):
+        self.changes += 1
+        if self.changes >= self.window:
+            self.total = math.fsum(self.buffer)
+            self.changes = 0
+
+    def update(self, price):
+        if len(self.buffer) == self.window:
+            self.total -= self.buffer[0]
+        self.buffer.append(price)
+        self.total += price
+        self._changed()
+        return self.value
+
+    def revise(self, price):
+        """Replace the latest price"""
+        if not self.buffer:
+            return self.update(price)
+        self.total += price - self.buffer[-1]
+        self.buffer[-1] = price
+        self._changed()
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.buffer) == self.window else None
+
+    def to_dict(self):
+        return {'window': self.window, 'values': list(self.buffer)}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['window'], state['values'])
+
+
+class StreamingRSI:
+    """
+    RSI from simple moving averages of the gains and losses over the last `window` changes,
+    the formula IndicatorEngine (and so MarketAnalyst.analyze_trends) uses. This is not
+    Wilder's smoothing on purpose: live values have to agree with the batch analysis.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev = None  # The price before the latest one
+        self.last = None
+        self.gains = StreamingSMA(window)
+        self.losses = StreamingSMA(window)
+
+    def _change(self, price):
+        change = price - self.prev
+        return max(change, 0.0), max(-change, 0.0)
+
+    def update(self, price):
+        self.prev, self.last = self.last, price
+        if self.prev is not None:
+            gain, loss = self._change(price)
+            self.gains.update(gain)
+            self.losses.update(loss)
+        return self.value
+
+    def revise(self, price):
+        """Replace the latest price"""
+        if self.prev is None:
+            self.last = price  # No change to revise yet
+            return self.value
+        self.last = price
+        gain, loss = self._change(price)
+        self.gains.revise(gain)
+        self.losses.revise(loss)
+        return self.value
+
+    @property
+    def value(self):
+        avg_gain, avg_loss = self.gains.value, self.losses.value
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def to_dict(self):
+        return {'window': self.window, 'prev': self.prev, 'last': self.last,
+                'gains': self.gains.to_dict(), 'losses': self.losses.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        rsi = cls(state['window'])
+        rsi.prev, rsi.last = state['prev'], state['last']
+        rsi.gains = StreamingSMA.from_dict(state['gains'])
+        rsi.losses = StreamingSMA.from_dict(state['losses'])
+        return rsi
+
+
+class StreamingMACD:
+    """MACD line (fast EMA - slow EMA) and its signal EMA"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.count = 0
+
+    def update(self, price):
+        macd = self.fast.update(price) - self.slow.update(price)
+        self.signal.update(macd)
+        self.count += 1
+        return self.value
+
+    def revise(self, price):
+        """Replace the latest price"""
+        if not self.count:
+            return self.update(price)
+        self.signal.revise(self.fast.revise(price) - self.slow.revise(price))
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.slow.span:
+            return None
+        return {"macd": self.fast.value - self.slow.value, "signal": self.signal.value}
+
+    def to_dict(self):
+        return {'fast': self.fast.to_dict(), 'slow': self.slow.to_dict(),
+                'signal': self.signal.to_dict(), 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, state):
+        macd = cls()
+        macd.fast = StreamingEMA.from_dict(state['fast'])
+        macd.slow = StreamingEMA.from_dict(state['slow'])
+        macd.signal = StreamingEMA.from_dict(state['signal'])
+        macd.count = state['count']
+        return macd
+
+
+class StreamingIndicators:
+    """
+    Per-symbol indicator state updated in O(1) per candle or tick. A tick revises the
+    current (latest) candle; `new_candle=True` closes it and starts the next one.
+
+    snapshot() returns the sma/ema/rsi/macd layout MarketAnalyst produces, so
+    _assess_trend_strength can read it directly. The state round-trips through
+    to_json/from_json so it survives restarts.
+    """
+
+    def __init__(self, symbol, sma_windows=(3, 5), ema_windows=(5, 10), rsi_window=14, macd_spans=(12, 26, 9)):
+        self.symbol = symbol
+        self.sma = {w: StreamingSMA(w) for w in sma_windows}
+        self.ema = {w: StreamingEMA(w) for w in ema_windows}
+        self.rsi = StreamingRSI(rsi_window)
+        self.macd = StreamingMACD(*macd_spans)
+        self.first_close = None
+        self.prev_close = None
+        self.last_close = None
+        self.timestamp = None
+
+    def update(self, close, timestamp=None, new_candle=False):
+        """
+        Push one closing price and return the snapshot: the close of a new candle when
+        `new_candle` is set (or for the first price), otherwise a tick that replaces the
+        current candle's close.
+        """
+        close = float(close)
+        if self.first_close is None:
+            self.first_close = close
+        new_candle = new_candle or self.last_close is None
+        if new_candle:
+            self.prev_close = self.last_close
+        self.last_close = close
+        self.timestamp = timestamp
+        indicators = [*self.sma.values(), *self.ema.values(), self.rsi, self.macd]
+        for indicator in indicators:
+            if new_candle:
+                indicator.update(close)
+            else:
+                indicator.revise(close)
+        return self.snapshot()
+
+    @classmethod
+    def from_series(cls, symbol, series, **kwargs):
+        """Seed state by replaying a HistoricalPriceStore series (or any array of closes)"""
+        indicators = cls(symbol, **kwargs)
+        closes = getattr(series, 'close', series)
+        timestamps = getattr(series, 'timestamp', [None] * len(closes))
+        for close, timestamp in zip(closes, timestamps):
+            indicators.update(close, None if timestamp is None else int(timestamp), new_candle=True)
+        return indicators
+
+    def snapshot(self):
+        macd = self.macd.value
+        rsi = self.rsi.value
+        snapshot = {
+            "current_price": self.last_close,
+            "sma": {w: None if s.value is None else round(s.value, 4) for w, s in self.sma.items()},
+            "ema": {w: None if e.value is None else round(e.value, 4) for w, e in self.ema.items()},
+            "rsi": None if rsi is None else round(rsi, 2),
+            "macd": None if macd is None else {k: round(v, 4) for k, v in macd.items()},
+        }
+        if self.prev_close is not None:
+            snapshot["price_change"] = f"{(self.last_close - self.first_close) / self.first_close * 100:.2f}%"
+            snapshot["recent_trend"] = "up" if self.last_close > self.prev_close else "down"
+        return snapshot
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'sma': [s.to_dict() for s in self.sma.values()],
+            'ema': [e.to_dict() for e in self.ema.values()],
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+            'first_close': self.first_close,
+            'prev_close': self.prev_close,
+            'last_close': self.last_close,
+            'timestamp': self.timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        indicators = cls(state['symbol'])
+        indicators.sma = {s['window']: StreamingSMA.from_dict(s) for s in state['sma']}
+        indicators.ema = {e['span']: StreamingEMA.from_dict(e) for e in state['ema']}
+        indicators.rsi = StreamingRSI.from_dict(state['rsi'])
+        indicators.macd = StreamingMACD.from_dict(state['macd'])
+        indicators.first_close = state['first_close']
+        indicators.prev_close = state['prev_close']
+        indicators.last_close = state['last_close']
+        indicators.timestamp = state['timestamp']
+        return indicators
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls.from_dict(json.loads(payload))
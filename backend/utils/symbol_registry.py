@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+
+class SymbolRegistry:
+    """
+    The token universe, backed by SQLite in WAL mode so every worker sees the same list.
+
+    Each symbol has a name, a market-cap rank and whether goal analysis tracks it. Tracked
+    symbols are seeded from Config.TRACKED_SYMBOLS and symbols with local price history
+    (`with_history`) are added on start; the rest of the universe comes from the listings endpoint
+    (`sync_listings`). `listed_at` is when listings were last synced, by any worker, and
+    `backfilled_at` when each symbol's price history was last backfilled.
+    """
+
+    def __init__(self, filename=Config.SYMBOL_DB, tracked=Config.TRACKED_SYMBOLS, with_history=()):
+        self.filename = filename
+        self._local = threading.local()  # sqlite3 connections are per-thread
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS symbols ("
+                "symbol TEXT PRIMARY KEY, name TEXT, rank INTEGER, tracked INTEGER NOT NULL DEFAULT 0, "
+                "listed_at REAL, backfilled_at REAL)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(symbols)")]
+            if 'backfilled_at' not in columns:
+                conn.execute("ALTER TABLE symbols ADD COLUMN backfilled_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS symbols_rank ON symbols (rank)")
+        self.add(tracked, tracked=True)
+        self.add(with_history)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, symbols, tracked=False):
+        """Register symbols (upper-cased); `tracked` also marks known ones as tracked"""
+        rows = [(symbol.upper(), int(tracked)) for symbol in symbols]
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO symbols (symbol, tracked) VALUES (?, ?)", rows)
+            if tracked:
+                conn.executemany("UPDATE symbols SET tracked = 1 WHERE symbol = ?", [(s,) for s, _ in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def tracked(self):
+        """Symbols analysed for goals, in the order they were registered"""
+        rows = self._connect().execute("SELECT symbol FROM symbols WHERE tracked = 1 ORDER BY rowid")
+        return [symbol for (symbol,) in rows]
+
+    def universe(self, limit=Config.UNIVERSE_SIZE):
+        """Up to `limit` symbols: tracked ones first, then by market-cap rank (unranked last)"""
+        rows = self._connect().execute(
+            "SELECT symbol FROM symbols ORDER BY tracked DESC, rank IS NULL, rank, symbol LIMIT ?", (limit,)
+        )
+        return [symbol for (symbol,) in rows]
+
+    def sync_listings(self, listings):
+        """
+        Upsert names and ranks from CMC listings (dicts with symbol, name and cmc_rank).
+        Symbols that dropped out of the listings lose their rank. Returns the number stored.
+        """
+        now = time.time()
+        rows = {}
+        for listing in listings:
+            symbol = (listing.get('symbol') or '').upper()
+            if symbol and symbol not in rows:  # Tickers are not unique; keep the best ranked
+                rows[symbol] = (symbol, listing.get('name'), listing.get('cmc_rank'), now)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE symbols SET rank = NULL WHERE rank IS NOT NULL")
+            conn.executemany(
+                "INSERT INTO symbols (symbol, name, rank, listed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (symbol) DO UPDATE SET name = excluded.name, rank = excluded.rank, "
+                "listed_at = excluded.listed_at",
+                list(rows.values())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def listed_at(self):
+        """When listings were last synced (epoch seconds), 0 if never"""
+        return self._connect().execute("SELECT MAX(listed_at) FROM symbols").fetchone()[0] or 0
+
+    def backfilled_at(self, symbols):
+        """When each symbol's history was last backfilled (epoch seconds), 0 if never"""
+        placeholders = ','.join('?' * len(symbols))
+        rows = self._connect().execute(
+            f"SELECT symbol, backfilled_at FROM symbols WHERE symbol IN ({placeholders})", list(symbols)
+        ) if symbols else []
+        return {symbol: at or 0 for symbol, at in rows}
+
+    def mark_backfilled(self, symbols, at=None):
+        at = at or time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE symbols SET backfilled_at = ? WHERE symbol = ?", [(at, s) for s in symbols])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def info(self, symbols):
+        """Name and rank per symbol"""
+        placeholders = ','.join('?' * len(symbols))
+        rows = self._connect().execute(
+            f"SELECT symbol, name, rank FROM symbols WHERE symbol IN ({placeholders})", list(symbols)
+        ) if symbols else []
+        return {symbol: {'name': name, 'rank': rank} for symbol, name, rank in rows}
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM symbols").fetchone()[0]